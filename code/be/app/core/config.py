@@ -7,13 +7,28 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440
 
+    # Auth Token Mode: "session" (cookie holds the User ObjectId) or "jwt" (signed token with inline roles)
+    AUTH_TOKEN_MODE: str = "session"
+
+    # Principal Cache (authenticated users kept in memory per access token)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    PRINCIPAL_CACHE_MAX_SIZE: int = 1024
+
     MONGODB_URL: str
     DATABASE_NAME: str
     
-    # Cloudinary Config
-    CLOUD_NAME: str
-    CLOUDINARY_API_KEY: str
-    CLOUDINARY_API_SECRET: str
+    # Storage Config: "cloudinary" or "local" (files on disk, for tests and offline deployments)
+    STORAGE_BACKEND: str = "cloudinary"
+    LOCAL_STORAGE_DIR: str = "storage"
+    LOCAL_STORAGE_URL: str = "/files"
+    STORAGE_MAX_UPLOAD_MB: int = 10
+    STORAGE_MAX_VIDEO_UPLOAD_MB: int = 100
+    STORAGE_UPLOAD_WORKERS: int = 4
+
+    # Cloudinary Config (only required with STORAGE_BACKEND=cloudinary)
+    CLOUD_NAME: str = ""
+    CLOUDINARY_API_KEY: str = ""
+    CLOUDINARY_API_SECRET: str = ""
 
     model_config = SettingsConfigDict(
         env_file=".env", 
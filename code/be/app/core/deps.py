@@ -4,23 +4,40 @@ from fastapi import Cookie, Depends, HTTPException, status, Security
 from fastapi.security import HTTPBearer # Used just for the security header definition/documentation
 from app.models.internal.user import User
 from app.models.enums.role import UserRole # Import the correct Role Enum
+from app.core.config import settings
+from app.core.security import decode_access_token_payload
+from app.core.principal_cache import Principal, PrincipalCache
 
 http_bearer_scheme = HTTPBearer()
 
 # --- LEVEL 1: AUTHENTICATION (Authentication) ---
 
-async def get_current_user(access_token: Optional[str] = Cookie(None)) -> User:
+async def _resolve_principal(access_token: str) -> Principal:
     """
-    Authenticates the user by verifying the access_token (User ObjectId) in the cookie.
-    Fetches the User object from the database for subsequent use.
+    Turns an access token into a Principal (User + role set).
+    Served from the PrincipalCache when possible; otherwise verifies the token,
+    loads the User from the DB and caches the result.
+    Raises 401/403 HTTPException on invalid tokens or inactive accounts.
     """
-    if not access_token:
-        # If the cookie is missing, request authentication (401)
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated (No Cookie)")
-    
+    # 0. Cache hit: zero database calls
+    principal = PrincipalCache.get(access_token)
+    if principal:
+        return principal
+
+    token_roles = None
+    if settings.AUTH_TOKEN_MODE == "jwt":
+        # 1a. Signed token: verify signature/expiry, roles travel inline
+        payload = decode_access_token_payload(access_token)
+        if not payload or not payload.get("sub"):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
+        subject = payload["sub"]
+        token_roles = payload.get("roles")
+    else:
+        subject = access_token
+
     try:
         # 1. Validate format and convert the hex string to MongoDB's ObjectId
-        user_id = PydanticObjectId(access_token)
+        user_id = PydanticObjectId(subject)
     except:
         # If the string is not a valid ObjectId format
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid Token Format")
@@ -34,7 +51,32 @@ async def get_current_user(access_token: Optional[str] = Cookie(None)) -> User:
     if not user.is_active:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Account inactive")
 
-    return user
+    # 4. Role set (precomputed once per cached principal)
+    roles = frozenset(role.value for role in user.roles)
+    if token_roles is not None and frozenset(token_roles) != roles:
+        # Roles changed since the token was issued: force a fresh login
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Roles changed, please log in again")
+
+    principal = Principal(user, roles)
+    PrincipalCache.put(access_token, principal)
+    return principal
+
+async def get_current_principal(access_token: Optional[str] = Cookie(None)) -> Principal:
+    """
+    Authenticates the caller from the access_token cookie (User ObjectId, or a
+    signed token when AUTH_TOKEN_MODE=jwt) and returns the User with its role set.
+    """
+    if not access_token:
+        # If the cookie is missing, request authentication (401)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated (No Cookie)")
+    return await _resolve_principal(access_token)
+
+async def get_current_user(principal: Principal = Depends(get_current_principal)) -> User:
+    """
+    Authenticates the user by verifying the access_token in the cookie.
+    Returns the User object for subsequent use (cached per token for a short TTL).
+    """
+    return principal.user
 
 async def get_current_user_optional(access_token: Optional[str] = Cookie(None)) -> Optional[User]:
     """
@@ -45,15 +87,11 @@ async def get_current_user_optional(access_token: Optional[str] = Cookie(None))
         return None
     
     try:
-        user_id = PydanticObjectId(access_token)
-    except:
+        principal = await _resolve_principal(access_token)
+    except HTTPException:
         return None
 
-    user = await User.get(user_id)
-    if not user or not user.is_active:
-        return None
-
-    return user
+    return principal.user
 
 # --- LEVEL 2: AUTHORIZATION (Authorization) ---
 
@@ -64,15 +102,13 @@ class RoleChecker:
     def __init__(self, allowed_roles: List[UserRole]):
         # Store the list of required roles (e.g., [UserRole.ADMIN, UserRole.TUTOR])
         self.allowed_roles = allowed_roles
+        # Precompute once per route instead of on every request
+        self.allowed_roles_set = frozenset(role.value for role in allowed_roles)
 
-    def __call__(self, user: User = Depends(get_current_user)) -> User:
+    def __call__(self, principal: Principal = Depends(get_current_principal)) -> User:
         # Logic: Check if the intersection of required roles and user's roles is non-empty.
-        
-        # Convert user's roles (List[UserRole]) to a set of strings for intersection
-        user_roles_set = {role.value for role in user.roles}
-        allowed_roles_set = {role.value for role in self.allowed_roles}
-
-        has_permission = bool(allowed_roles_set & user_roles_set)
+        # The principal's role set is computed once when it is cached.
+        has_permission = not self.allowed_roles_set.isdisjoint(principal.roles)
         
         if not has_permission:
             # Raise 403 Forbidden if no required role is found
@@ -82,4 +118,4 @@ class RoleChecker:
             )
         
         # Return the fully authenticated and authorized User object
-        return user
\ No newline at end of file
+        return principal.user
\ No newline at end of file
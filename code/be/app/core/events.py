@@ -0,0 +1,140 @@
+"""
+In-process domain event bus.
+
+Services publish facts after their own write succeeded; subscribers (projections
+such as StatsProjector) are registered once at startup in main.lifespan.
+Delivery is awaited inside the publishing request, so projections are current
+when the response is sent. Handler errors are logged and never fail the
+publisher; the full recalculation endpoints/scripts are the repair path.
+"""
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Awaitable, Callable, Dict, List
+
+from beanie import PydanticObjectId, Link
+from pydantic import BaseModel, Field
+
+from app.models.internal.session import SessionStatus
+from app.models.enums.location import LocationMode
+
+
+class EventType(str, Enum):
+    SESSION_CONFIRMED = "session.confirmed"
+    SESSION_COMPLETED = "session.completed"
+    SESSION_CANCELLED = "session.cancelled"
+    FEEDBACKS_FINALIZED = "feedbacks.finalized"
+    ATTENDANCE_MARKED = "attendance.marked"
+
+
+def _link_id(value) -> PydanticObjectId:
+    """Returns the target id of a Link or an already fetched document."""
+    if isinstance(value, Link):
+        return value.ref.id
+    return value.id
+
+
+# --- EVENTS ---
+
+class DomainEvent(BaseModel):
+    # Deterministic for facts that can only happen once (a session completes once),
+    # so re-publishing the same fact is recognised by idempotent subscribers
+    event_id: str
+    type: EventType
+    occurred_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class SessionEvent(DomainEvent):
+    """A session status transition, with the session facts projections need."""
+    session_id: PydanticObjectId
+    tutor_id: PydanticObjectId
+    student_ids: List[PydanticObjectId]
+    course_id: PydanticObjectId
+    mode: LocationMode
+    start_time: datetime
+    duration_hours: float
+
+    @classmethod
+    def from_session(cls, session):
+        # Each transition happens at most once per session
+        event_type = cls.model_fields["type"].default
+        return cls(
+            event_id=f"{event_type.value}:{session.id}",
+            session_id=session.id,
+            tutor_id=_link_id(session.tutor),
+            student_ids=[_link_id(s) for s in session.students],
+            course_id=_link_id(session.course),
+            mode=session.mode,
+            start_time=session.start_time,
+            duration_hours=(session.end_time - session.start_time).total_seconds() / 3600
+        )
+
+class SessionConfirmed(SessionEvent):
+    type: EventType = EventType.SESSION_CONFIRMED
+
+class SessionCompleted(SessionEvent):
+    type: EventType = EventType.SESSION_COMPLETED
+
+class SessionCancelled(SessionEvent):
+    type: EventType = EventType.SESSION_CANCELLED
+
+class FeedbacksFinalized(DomainEvent):
+    """Feedbacks of one tutor that a finalizer run switched to SUBMITTED."""
+    type: EventType = EventType.FEEDBACKS_FINALIZED
+    tutor_id: PydanticObjectId
+    count: int
+    rating_sum: float
+
+class AttendanceMarked(DomainEvent):
+    type: EventType = EventType.ATTENDANCE_MARKED
+    attendance_id: PydanticObjectId
+    session_id: PydanticObjectId
+    student_id: PydanticObjectId
+    session_completed: bool  # Attendance of sessions still running is counted on completion
+
+    @classmethod
+    def from_log(cls, attendance, session) -> "AttendanceMarked":
+        return cls(
+            event_id=f"{EventType.ATTENDANCE_MARKED.value}:{attendance.id}",
+            attendance_id=attendance.id,
+            session_id=session.id,
+            student_id=_link_id(attendance.student_ref),
+            session_completed=session.status == SessionStatus.COMPLETED
+        )
+
+
+# --- BUS ---
+
+Handler = Callable[[List[DomainEvent]], Awaitable[None]]
+
+
+class EventBus:
+    """
+    Synchronous in-process publish/subscribe.
+    Handlers receive the published events of their type as one list, so batch
+    publishers (background jobs) let projections write in bulk.
+    """
+
+    _handlers: Dict[EventType, List[Handler]] = {}
+
+    @staticmethod
+    def subscribe(event_type: EventType, handler: Handler):
+        handlers = EventBus._handlers.setdefault(event_type, [])
+        if handler not in handlers:
+            handlers.append(handler)
+
+    @staticmethod
+    def clear():
+        EventBus._handlers.clear()
+
+    @staticmethod
+    async def publish(*events: DomainEvent):
+        """Delivers events to their subscribers, grouped by type in publish order."""
+        by_type: Dict[EventType, List[DomainEvent]] = {}
+        for event in events:
+            by_type.setdefault(event.type, []).append(event)
+
+        for event_type, batch in by_type.items():
+            for handler in EventBus._handlers.get(event_type, ()):
+                try:
+                    await handler(batch)
+                except Exception as e:
+                    print(f"Warning: {handler.__qualname__} failed on {len(batch)} {event_type.value} event(s): {str(e)}")
@@ -0,0 +1,109 @@
+"""
+In-process pub/sub hub for live notification streams (SSE).
+
+Each open stream subscribes with a bounded queue keyed by user id; publishing
+never blocks the writer. A stream that cannot keep up is sent a "resync" marker
+and dropped instead of buffering without limit; the client reconnects with
+Last-Event-ID and catches up from the database. The hub is per process: with
+several workers a stream only sees notifications written by its own worker
+live, and picks up the rest on replay.
+"""
+import asyncio
+from typing import Dict, Optional
+
+from beanie import PydanticObjectId
+
+
+# Events buffered per open stream before it is considered too slow
+SUBSCRIBER_QUEUE_SIZE = 100
+
+# Open streams kept per user (browser tabs); the oldest is closed beyond this
+MAX_STREAMS_PER_USER = 10
+
+
+class StreamMessage:
+    """One server-sent event (pre-serialized data)."""
+
+    __slots__ = ("event", "data", "event_id")
+
+    def __init__(self, event: str, data: str, event_id: Optional[str] = None):
+        self.event = event
+        self.data = data
+        self.event_id = event_id
+
+
+class Subscription:
+    """The queue of one open stream."""
+
+    __slots__ = ("user_id", "queue", "closed")
+
+    def __init__(self, user_id: PydanticObjectId):
+        self.user_id = user_id
+        # Bounded by offer(); None ends the stream
+        self.queue: "asyncio.Queue[Optional[StreamMessage]]" = asyncio.Queue()
+        self.closed = False
+
+    def offer(self, message: StreamMessage):
+        """Queues a message; on overflow the stream is closed with a resync marker."""
+        if self.closed:
+            return
+        if self.queue.qsize() >= SUBSCRIBER_QUEUE_SIZE:
+            self.close(StreamMessage("resync", "{}"))
+            return
+        self.queue.put_nowait(message)
+
+    def close(self, last_message: Optional[StreamMessage] = None):
+        """Ends the stream after the optional last message (pending messages are dropped)."""
+        if self.closed:
+            return
+        self.closed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        if last_message is not None:
+            self.queue.put_nowait(last_message)
+        self.queue.put_nowait(None)
+
+
+class NotificationHub:
+    """Per-user fan-out of live notifications to the open streams of this process."""
+
+    # user id -> open streams in subscription order (dict used as an ordered set)
+    _subscriptions: Dict[PydanticObjectId, Dict[Subscription, None]] = {}
+    dropped_streams = 0
+
+    @staticmethod
+    def subscribe(user_id: PydanticObjectId) -> Subscription:
+        subscriptions = NotificationHub._subscriptions.setdefault(user_id, {})
+        if len(subscriptions) >= MAX_STREAMS_PER_USER:
+            oldest = next(iter(subscriptions))
+            NotificationHub.unsubscribe(oldest)
+            oldest.close()
+        subscription = Subscription(user_id)
+        NotificationHub._subscriptions.setdefault(user_id, {})[subscription] = None
+        return subscription
+
+    @staticmethod
+    def unsubscribe(subscription: Subscription):
+        subscriptions = NotificationHub._subscriptions.get(subscription.user_id)
+        if subscriptions is None:
+            return
+        subscriptions.pop(subscription, None)
+        if not subscriptions:
+            del NotificationHub._subscriptions[subscription.user_id]
+
+    @staticmethod
+    def has_subscribers(user_id: PydanticObjectId) -> bool:
+        return user_id in NotificationHub._subscriptions
+
+    @staticmethod
+    def publish(user_id: PydanticObjectId, message: StreamMessage):
+        """Delivers a message to every open stream of the user (never blocks)."""
+        for subscription in list(NotificationHub._subscriptions.get(user_id, ())):
+            subscription.offer(message)
+            if subscription.closed:
+                NotificationHub.unsubscribe(subscription)
+                NotificationHub.dropped_streams += 1
+
+    @staticmethod
+    def stream_count() -> int:
+        return sum(len(s) for s in NotificationHub._subscriptions.values())
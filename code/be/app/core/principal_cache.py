@@ -0,0 +1,95 @@
+import time
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Optional, Set
+
+from beanie import PydanticObjectId
+
+from app.core.config import settings
+
+
+class Principal:
+    """An authenticated caller: the User document plus its precomputed role set."""
+
+    __slots__ = ("user", "roles")
+
+    def __init__(self, user, roles: FrozenSet[str]):
+        self.user = user
+        self.roles = roles
+
+
+class PrincipalCache:
+    """
+    Short-TTL, size-bounded LRU cache of authenticated principals keyed by access token.
+
+    Lets get_current_user skip the User.get() round trip for repeat requests.
+    Entries are evicted when the user document is saved (User after_event hook),
+    on logout, after PRINCIPAL_CACHE_TTL_SECONDS, or as least recently used once
+    PRINCIPAL_CACHE_MAX_SIZE is reached. The cache is per process; writes made by
+    other workers or by bulk update_many calls are picked up when the TTL expires.
+    """
+
+    _entries: "OrderedDict[str, tuple]" = OrderedDict()  # token -> (expires_at, Principal)
+    _tokens_by_user: Dict[PydanticObjectId, Set[str]] = {}
+    hits = 0
+    misses = 0
+
+    @staticmethod
+    def get(token: str) -> Optional[Principal]:
+        """Returns a private copy of the cached principal, or None on miss/expiry."""
+        entry = PrincipalCache._entries.get(token)
+        if entry is None:
+            PrincipalCache.misses += 1
+            return None
+
+        expires_at, principal = entry
+        if expires_at <= time.monotonic():
+            PrincipalCache._discard(token)
+            PrincipalCache.misses += 1
+            return None
+
+        PrincipalCache._entries.move_to_end(token)
+        PrincipalCache.hits += 1
+        # Handlers mutate and save the user; never hand out the shared instance
+        return Principal(principal.user.model_copy(deep=True), principal.roles)
+
+    @staticmethod
+    def put(token: str, principal: Principal):
+        if settings.PRINCIPAL_CACHE_MAX_SIZE <= 0:
+            return
+        PrincipalCache._discard(token)
+        PrincipalCache._entries[token] = (
+            time.monotonic() + settings.PRINCIPAL_CACHE_TTL_SECONDS,
+            Principal(principal.user.model_copy(deep=True), principal.roles)
+        )
+        PrincipalCache._tokens_by_user.setdefault(principal.user.id, set()).add(token)
+
+        while len(PrincipalCache._entries) > settings.PRINCIPAL_CACHE_MAX_SIZE:
+            oldest_token = next(iter(PrincipalCache._entries))
+            PrincipalCache._discard(oldest_token)
+
+    @staticmethod
+    def _discard(token: str):
+        entry = PrincipalCache._entries.pop(token, None)
+        if entry is None:
+            return
+        user_id = entry[1].user.id
+        tokens = PrincipalCache._tokens_by_user.get(user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del PrincipalCache._tokens_by_user[user_id]
+
+    @staticmethod
+    def invalidate_token(token: str):
+        PrincipalCache._discard(token)
+
+    @staticmethod
+    def invalidate_user(user_id: PydanticObjectId):
+        """Drops every cached token of a user (roles/is_active/profile may have changed)."""
+        for token in list(PrincipalCache._tokens_by_user.get(user_id, ())):
+            PrincipalCache._discard(token)
+
+    @staticmethod
+    def clear():
+        PrincipalCache._entries.clear()
+        PrincipalCache._tokens_by_user.clear()
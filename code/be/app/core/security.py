@@ -1,14 +1,19 @@
 from datetime import datetime, timedelta
-from typing import Optional, Any
+from typing import Optional, Any, List
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 from .config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-def create_access_token(subject: str | Any, expires_delta: Optional[timedelta] = None) -> str:
+def create_access_token(
+    subject: str | Any,
+    expires_delta: Optional[timedelta] = None,
+    roles: Optional[List[str]] = None
+) -> str:
     """
     Create Token from User ID (Subject).
+    If roles are given they are carried inline ("roles" claim) for authorization.
     """
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -16,6 +21,8 @@ def create_access_token(subject: str | Any, expires_delta: Optional[timedelta] =
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode = {"exp": expire, "sub": str(subject)}
+    if roles is not None:
+        to_encode["roles"] = list(roles)
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
@@ -31,6 +38,16 @@ def decode_access_token(token: str) -> Optional[str]:
     except JWTError:
         return None
 
+def decode_access_token_payload(token: str) -> Optional[dict]:
+    """
+    Decode Token to gain the full claim set (sub, exp, roles).
+    Return: Claims dict or None if token invalid/expired.
+    """
+    try:
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
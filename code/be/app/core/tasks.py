@@ -28,32 +28,26 @@ async def auto_skip_expired_feedbacks_task():
 async def auto_complete_past_sessions_task():
     """
     Background task to automatically mark CONFIRMED sessions as COMPLETED
-    if their end_time has passed.
+    if their end_time has passed (batched, see ScheduleService.auto_complete_past_sessions),
+    and to refresh tutor search views whose next slot has ended.
     Runs every 30 minutes.
     """
     while True:
         try:
             print(f"[{datetime.now()}] Running auto-complete past sessions task...")
             
-            from app.models.internal.session import TutorSession, SessionStatus
-            from app.services.feedback_service import FeedbackService
+            from app.services.schedule_service import ScheduleService
+            from app.services.tutor_search_view_service import TutorSearchViewService
             
-            now = datetime.now()
+            metrics = await ScheduleService.auto_complete_past_sessions()
+            expired_views = await TutorSearchViewService.refresh_expired_slots()
             
-            # Find all CONFIRMED sessions that have ended
-            past_sessions = await TutorSession.find(
-                TutorSession.status == SessionStatus.CONFIRMED,
-                TutorSession.end_time < now
-            ).to_list()
-            
-            for session in past_sessions:
-                session.status = SessionStatus.COMPLETED
-                await session.save()
-                
-                # Auto-create feedback records
-                await FeedbackService.create_feedback_records_for_session(session)
-            
-            print(f"[{datetime.now()}] Auto-completed {len(past_sessions)} sessions")
+            print(
+                f"[{datetime.now()}] Auto-completed {metrics['sessions_completed']} sessions, "
+                f"created {metrics['feedbacks_created']} feedback record(s) "
+                f"in {metrics['batches']} batch(es), {metrics['elapsed_ms']} ms; "
+                f"refreshed {expired_views} expired search slot(s)"
+            )
             
         except Exception as e:
             print(f"[{datetime.now()}] Error in auto-complete task: {e}")
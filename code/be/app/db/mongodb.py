@@ -14,7 +14,16 @@ from app.models.internal.session import TutorSession
 from app.models.internal.feedback import SessionFeedback
 from app.models.internal.progress import ProgressRecord
 from app.models.internal.notification import Notification
+from app.models.internal.notification_outbox import NotificationIntent
+from app.models.internal.notification_counter import NotificationCounter
 from app.models.internal.availability import AvailabilitySlot
+from app.models.internal.attendance import AttendanceLog
+from app.models.internal.library import LibraryResource
+from app.models.internal.stored_blob import StoredBlob
+from app.models.internal.tutor_search_view import TutorSearchView
+from app.models.internal.tutor_student_pair import TutorStudentPair
+from app.models.internal.applied_event import AppliedEvent
+from app.models.internal.workload_rollup import WorkloadRollup
 
 async def init_db():
     """
@@ -35,8 +44,13 @@ async def init_db():
             TutorProfile, StudentProfile,
             TutorSession,
             SessionFeedback, ProgressRecord,
-            Notification,
-            AvailabilitySlot
+            Notification, NotificationIntent, NotificationCounter,
+            AvailabilitySlot,
+            AttendanceLog,
+            LibraryResource, StoredBlob,
+            TutorSearchView,
+            TutorStudentPair, AppliedEvent,
+            WorkloadRollup
         ]
     )
     print("✅ Database initialized! Connected to MongoDB.")
\ No newline at end of file
@@ -2,17 +2,36 @@ from contextlib import asynccontextmanager
 import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from app.core.config import settings
 from app.db.mongodb import init_db
-from app.routes import auth, users, academic, tutors, students, availability, sessions, feedback, attendance, reports, notifications, library
+from app.routes import auth, users, academic, tutors, students, availability, sessions, feedback, attendance, reports, notifications, library, files
 from app.core.tasks import auto_skip_expired_feedbacks_task, auto_complete_past_sessions_task
+from app.services.tutor_search_view_service import TutorSearchViewService
+from app.services.course_search_index import CourseSearchIndex
+from app.services.library_search_index import LibrarySearchIndex
+from app.services.master_data_cache import MasterDataCache
+from app.services.stats_projector import StatsProjector
+from app.services.workload_rollup_service import WorkloadRollupService
+from app.services.notification_dispatcher import NotificationDispatcher
+from app.services.notification_service import NotificationService
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db()
+    await MasterDataCache.warm()
+    await TutorSearchViewService.ensure_built()
+    await CourseSearchIndex.load()
+    await LibrarySearchIndex.load()
+    StatsProjector.register()
+    await StatsProjector.ensure_pairs()
+    WorkloadRollupService.register()
+    await WorkloadRollupService.ensure_built()
+    await NotificationService.ensure_counters()
     
     # Start background tasks
     asyncio.create_task(auto_skip_expired_feedbacks_task())
     asyncio.create_task(auto_complete_past_sessions_task())
+    asyncio.create_task(NotificationDispatcher.run())
     print("Background tasks started")
     
     yield
@@ -31,6 +50,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Content-Range", "Accept-Ranges"],  # Cursor pagination / conditional polling / range requests
 )
 
 # Include Routers
@@ -47,6 +67,10 @@ app.include_router(reports.router)
 app.include_router(notifications.router)
 app.include_router(library.router)
 
+# Files of the local storage backend
+if settings.STORAGE_BACKEND == "local":
+    app.include_router(files.router)
+
 @app.get("/")
 async def root():
     return {"message": "HCMUT Tutor System is running!"}
\ No newline at end of file
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class ExportFormat(str, Enum):
+    """Output format of the streaming export endpoints."""
+    CSV = "csv"        # text/csv with a header row
+    NDJSON = "ndjson"  # application/x-ndjson, one JSON object per line
@@ -0,0 +1,24 @@
+from datetime import datetime, timezone
+
+from beanie import Document, PydanticObjectId
+from pydantic import Field
+from pymongo import IndexModel
+
+
+class AppliedEvent(Document):
+    """
+    Domain events StatsProjector has applied, one row per (event, profile).
+    The unique index makes the claim atomic: a redelivered or re-published
+    event fails to insert its row again and is skipped, however long after
+    the first delivery it arrives.
+    """
+    event_id: str
+    profile_id: PydanticObjectId  # TutorProfile or StudentProfile the event was applied to
+
+    applied_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    class Settings:
+        name = "applied_events"
+        indexes = [
+            IndexModel([("event_id", 1), ("profile_id", 1)], unique=True),
+        ]
@@ -29,5 +29,7 @@ class AttendanceLog(Document):
             # Index for querying attendance by tutor
             [("tutor_ref", 1), ("attended_at", -1)],
             # Ensure a student can only mark attendance once per session
-            [("session_ref", 1), ("student_ref", 1)]
+            [("session_ref", 1), ("student_ref", 1)],
+            # Period exports (ExportService)
+            [("attended_at", 1)]
         ]
@@ -1,7 +1,9 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional
 from enum import Enum
 from beanie import Document, Link
+from pydantic import Field
+from pymongo import IndexModel
 
 # Import các model liên quan
 from .session import TutorSession
@@ -34,8 +36,17 @@ class SessionFeedback(Document):
     status: FeedbackStatus = FeedbackStatus.PENDING
     feedback_deadline: datetime # Session end_time + 7 days
     
-    created_at: datetime = datetime.now()
-    updated_at: datetime = datetime.now()
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     
     class Settings:
-        name = "session_feedbacks"
\ No newline at end of file
+        name = "session_feedbacks"
+        indexes = [
+            # Key of the bulk upsert in FeedbackService.create_feedback_records_for_sessions
+            [("session", 1), ("student", 1)],
+            # One feedback per (session, student), even when a manual completion races
+            # the auto-complete job; also serves the lookups by session/student id
+            IndexModel([("session.$id", 1), ("student.$id", 1)], unique=True),
+            # Period exports (ExportService)
+            [("created_at", 1)],
+        ]
\ No newline at end of file
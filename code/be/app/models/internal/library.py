@@ -72,8 +72,10 @@ class LibraryResource(Document):
     class Settings:
         name = "library_resources"
         indexes = [
-            # Index for querying by uploader
-            [("uploader", 1), ("created_at", -1)],
+            # Index for querying by uploader (queries filter on the DBRef id)
+            [("uploader.$id", 1), ("created_at", -1)],
+            # Index for the newest-first listing (keyset pagination)
+            [("created_at", -1), ("_id", -1)],
             # Index for public resources
             [("is_public", 1), ("resource_type", 1)],
             # Index for access level queries
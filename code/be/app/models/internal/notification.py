@@ -2,8 +2,9 @@ from typing import Optional, Annotated
 from datetime import datetime
 from enum import Enum
 
-from beanie import Document, Link
+from beanie import Document, Link, PydanticObjectId
 from pydantic import Field
+from pymongo import IndexModel
 
 # Import user table
 from .user import User
@@ -39,11 +40,23 @@ class Notification(Document):
     is_read: bool = False
     is_delivered: bool = False # For email/push status
     
+    # Outbox intent that produced the row (None for rows written directly)
+    outbox_id: Optional[PydanticObjectId] = None
+    
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
     class Settings:
         name = "notifications"
         indexes = [
-            # Index theo receiver để lấy nhanh list thông báo
-            [("receiver", 1)]
+            # Queries filter on the DBRef id ("receiver.$id"), so the indexes key it too
+            # Feed theo receiver, mới nhất trước (keyset pagination)
+            [("receiver.$id", 1), ("created_at", -1), ("_id", -1)],
+            # Đánh dấu đã đọc hàng loạt (mark all / mark many)
+            [("receiver.$id", 1), ("is_read", 1)],
+            # Một intent chỉ tạo một thông báo cho mỗi receiver (dispatcher retry an toàn)
+            IndexModel(
+                [("outbox_id", 1), ("receiver", 1)],
+                unique=True,
+                partialFilterExpression={"outbox_id": {"$type": "objectId"}}
+            )
         ]
\ No newline at end of file
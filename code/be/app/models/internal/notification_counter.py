@@ -0,0 +1,24 @@
+from datetime import datetime, timezone
+
+from beanie import Document, PydanticObjectId
+from pydantic import Field
+from pymongo import IndexModel
+
+
+class NotificationCounter(Document):
+    """
+    Per-user notification feed summary, maintained by NotificationService and
+    NotificationDispatcher whenever notifications are written or read.
+    unread answers the badge count in O(1); version changes on every feed change
+    and is the basis of the feed ETag.
+    """
+    user_id: PydanticObjectId
+    unread: int = 0
+    version: int = 0
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    class Settings:
+        name = "notification_counters"
+        indexes = [
+            IndexModel([("user_id", 1)], unique=True),
+        ]
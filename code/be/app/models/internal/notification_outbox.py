@@ -0,0 +1,58 @@
+from datetime import datetime, timezone
+from enum import Enum
+from typing import List, Optional
+
+from beanie import Document, PydanticObjectId
+from pydantic import Field
+from pymongo import IndexModel
+
+from .notification import NotificationType
+
+
+# Dispatched intents are kept this long for troubleshooting, then expire (TTL index)
+DISPATCHED_RETENTION_SECONDS = 7 * 24 * 3600
+
+
+class OutboxStatus(str, Enum):
+    PENDING = "PENDING"        # Waiting for (or between) dispatch attempts
+    DISPATCHED = "DISPATCHED"  # Notification rows written
+    FAILED = "FAILED"          # Gave up after the max number of attempts
+
+
+class NotificationIntent(Document):
+    """
+    One queued notification fan-out, written by request handlers and turned into
+    Notification rows by NotificationDispatcher.
+    Receivers are stored as ids only (users and/or student/tutor profiles) so
+    enqueueing never reads other collections; the dispatcher resolves them.
+    """
+    type: NotificationType
+    title: str
+    message: str
+    session_id: Optional[PydanticObjectId] = None
+
+    user_ids: List[PydanticObjectId] = []
+    student_profile_ids: List[PydanticObjectId] = []
+    tutor_profile_ids: List[PydanticObjectId] = []
+
+    status: OutboxStatus = OutboxStatus.PENDING
+    attempts: int = 0
+    next_attempt_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    last_error: Optional[str] = None
+
+    # Lease of the dispatcher instance working on the intent
+    claimed_by: Optional[str] = None
+    claimed_until: Optional[datetime] = None
+
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    dispatched_at: Optional[datetime] = None
+
+    class Settings:
+        name = "notification_outbox"
+        indexes = [
+            [("status", 1), ("next_attempt_at", 1)],
+            # Re-read of a round's claimed intents (NotificationDispatcher._claim); the
+            # lease is unset once an intent is dispatched or released
+            IndexModel([("claimed_by", 1)], sparse=True),
+            IndexModel([("dispatched_at", 1)], expireAfterSeconds=DISPATCHED_RETENTION_SECONDS),
+        ]
@@ -107,8 +107,11 @@ class TutorSession(Document):
         name = "tutor_sessions"
         indexes = [
             # Index cho việc tìm kiếm session của Tutor/Student (Timeline)
-            [("tutor", 1), ("start_time", -1)],
-            [("students", 1), ("start_time", -1)],
+            # Queries filter on the DBRef id and sort on (start_time, _id)
+            [("tutor.$id", 1), ("start_time", -1), ("_id", -1)],
+            [("students.$id", 1), ("start_time", -1), ("_id", -1)],
             # Index cho việc tìm kiếm session công khai (Discovery)
-            [("is_public", 1), ("course", 1), ("status", 1)]
+            [("is_public", 1), ("course", 1), ("status", 1)],
+            # Period exports (ExportService)
+            [("start_time", 1)]
         ]
\ No newline at end of file
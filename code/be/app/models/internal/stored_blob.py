@@ -0,0 +1,28 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from beanie import Document
+from pydantic import Field
+from pymongo import IndexModel
+
+
+class StoredBlob(Document):
+    """
+    One file of the local content-addressed store (LocalStorageBackend).
+    The blob is stored once per distinct content under its SHA-256 digest;
+    ref_count is the number of uploads (library resources, avatars) using it.
+    The file is deleted when the last reference is released.
+    """
+    digest: str  # SHA-256 hex of the content, also the public id
+    size: int
+    content_type: str = "application/octet-stream"
+    ref_count: int = 0
+
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    last_referenced_at: Optional[datetime] = None
+
+    class Settings:
+        name = "stored_blobs"
+        indexes = [
+            IndexModel([("digest", 1)], unique=True),
+        ]
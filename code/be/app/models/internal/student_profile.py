@@ -1,4 +1,4 @@
-from typing import List, Optional, Annotated
+from typing import Dict, List, Optional, Annotated
 from datetime import datetime
 from enum import Enum
 
@@ -46,6 +46,7 @@ class StudentStats(BaseModel):
     
     # Chỉ số chuyên cần (để Tutor đánh giá ngược lại Mentee)
     attendance_rate: int = 100        # Tỷ lệ đi học đúng giờ (%)
+    attended_sessions: Optional[int] = None # Completed sessions with a check-in; lets attendance_rate be maintained incrementally
 
 # --- MAIN DOCUMENT ---
 
@@ -73,8 +74,10 @@ class StudentProfile(Document):
     stats: StudentStats = StudentStats()
     
     # 6. Personal Avatar (Student can upload custom avatar separate from university photo)
-    avatar_url: Optional[str] = None
-    avatar_public_id: Optional[str] = None  # Cloudinary public ID for deletion
+    avatar_url: Optional[str] = None  # Profile image (max 512px WebP)
+    avatar_public_id: Optional[str] = None  # Storage public ID for deletion (legacy uploads)
+    avatar_public_ids: List[str] = []  # Storage public IDs of all variants (AvatarService)
+    avatar_variants: Dict[str, str] = {}  # Thumbnail size in px ("64", "128", "256") -> URL
     
     # 7. Metadata
     created_at: datetime = Field(default_factory=datetime.now)
@@ -1,4 +1,4 @@
-from typing import List, Optional, Annotated
+from typing import Dict, List, Optional, Annotated
 from datetime import datetime, timezone
 from enum import Enum
 
@@ -23,6 +23,7 @@ class TutorStats(BaseModel):
     """Key performance and reputation metrics."""
     average_rating: float = 0.0
     total_feedbacks: int = 0
+    rating_sum: Optional[float] = None # Sum of submitted ratings; lets rating deltas be applied incrementally
     total_sessions: int = 0
     total_students: int = 0
     response_rate: int = 100
@@ -62,8 +63,10 @@ class TutorProfile(Document):
     stats: TutorStats = TutorStats()
     
     # 6. Personal Avatar (Tutor can upload custom avatar separate from university photo)
-    avatar_url: Optional[str] = None
-    avatar_public_id: Optional[str] = None  # Cloudinary public ID for deletion
+    avatar_url: Optional[str] = None  # Profile image (max 512px WebP)
+    avatar_public_id: Optional[str] = None  # Storage public ID for deletion (legacy uploads)
+    avatar_public_ids: List[str] = []  # Storage public IDs of all variants (AvatarService)
+    avatar_variants: Dict[str, str] = {}  # Thumbnail size in px ("64", "128", "256") -> URL
     
     # 7. Metadata (Using UTC for consistency)
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
@@ -0,0 +1,77 @@
+from typing import Dict, List, Optional
+from datetime import datetime, timezone
+
+from beanie import Document, PydanticObjectId
+from pydantic import BaseModel, Field
+
+from .tutor_profile import TutorStatus, TutorStats
+from ..enums.location import LocationMode
+
+# --- SUB-MODELS ---
+
+class SearchViewSubject(BaseModel):
+    """Flattened teaching subject (Course resolved to code/name)."""
+    course_id: PydanticObjectId
+    course_code: str
+    course_name: str
+    description: Optional[str] = None
+
+class SearchViewSlot(BaseModel):
+    """
+    Earliest open availability slot at the time the view was refreshed.
+    Goes stale once it ends: search recomputes it at read time and the
+    auto-complete job refreshes expired ones (refresh_expired_slots).
+    """
+    start_time: datetime
+    end_time: datetime
+    allowed_modes: List[LocationMode] = []
+
+# --- MAIN DOCUMENT ---
+
+class TutorSearchView(Document):
+    """
+    Denormalized read model for tutor discovery.
+    One document per TutorProfile (same _id), flattened from User, HCMUT_SSO,
+    Major, Faculty, Course and AvailabilitySlot so search reads a single collection.
+    Maintained by TutorSearchViewService; never edited directly.
+    """
+    # 1. Identity (User + SSO snapshot)
+    user_id: PydanticObjectId
+    full_name: str
+    display_name: str
+    email_edu: str
+    is_lecturer: bool = False
+
+    # 2. Organization (Major/Faculty for students, work_info department for staff)
+    academic_major: Optional[str] = None
+    major_code: Optional[str] = None
+    faculty_code: Optional[str] = None
+    faculty_name: Optional[str] = None
+    department: Optional[str] = None
+
+    # 3. Profile
+    bio: Optional[str] = None
+    tags: List[str] = []
+    status: TutorStatus = TutorStatus.AVAILABLE
+    avatar_url: Optional[str] = None
+    avatar_variants: Dict[str, str] = {}
+
+    # 4. Expertise & Reputation
+    subjects: List[SearchViewSubject] = []
+    stats: TutorStats = TutorStats()
+
+    # 5. Availability
+    next_slot: Optional[SearchViewSlot] = None
+
+    refreshed_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    class Settings:
+        name = "tutor_search_view"
+        indexes = [
+            [("status", 1), ("stats.average_rating", -1), ("stats.total_feedbacks", -1)],
+            [("subjects.course_code", 1)],
+            [("tags", 1)],
+            [("faculty_code", 1)],
+            # Views whose next slot has ended (refresh_expired_slots)
+            [("next_slot.end_time", 1)],
+        ]
@@ -0,0 +1,27 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from beanie import Document, PydanticObjectId
+from pydantic import Field
+from pymongo import IndexModel
+
+
+class TutorStudentPair(Document):
+    """
+    Ledger of (tutor, student) pairs that completed at least one session together.
+    Lets StatsProjector maintain the distinct counters (TutorStats.total_students,
+    StudentStats.total_tutors_met) with $inc: a pair counts only for the event
+    that created its row.
+    """
+    tutor_id: PydanticObjectId
+    student_id: PydanticObjectId
+
+    first_event_id: Optional[str] = None  # None for rows backfilled from history
+    first_met_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    class Settings:
+        name = "tutor_student_pairs"
+        indexes = [
+            IndexModel([("tutor_id", 1), ("student_id", 1)], unique=True),
+            [("first_event_id", 1)],
+        ]
@@ -1,6 +1,6 @@
 from typing import Annotated, List, Optional
 from datetime import datetime, timezone
-from beanie import Document, Link, Indexed
+from beanie import Document, Link, Indexed, after_event, Save, Replace, Update, SaveChanges
 from pydantic import Field
 from app.models.enums.role import UserRole
 
@@ -30,6 +30,12 @@ class User(Document):
     last_login: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+    @after_event(Save, Replace, Update, SaveChanges)
+    def evict_cached_principal(self):
+        """Drops cached auth principals so role/is_active changes apply on the next request."""
+        from app.core.principal_cache import PrincipalCache
+        PrincipalCache.invalidate_user(self.id)
+
     class Settings:
         name = "users"
         indexes = [
@@ -0,0 +1,34 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from beanie import Document, PydanticObjectId
+from pymongo import IndexModel
+
+
+class WorkloadRollup(Document):
+    """
+    Daily teaching workload of one tutor for one course.
+    One row per (tutor, course, UTC day of start_time), counting CONFIRMED and
+    COMPLETED sessions. faculty_id is the course's faculty (Course.department).
+    Maintained by WorkloadRollupService; never edited directly.
+    """
+    tutor_id: PydanticObjectId
+    course_id: PydanticObjectId
+    faculty_id: Optional[PydanticObjectId] = None
+    day: datetime  # 00:00 UTC
+
+    hours: float = 0.0
+    sessions: int = 0
+    mode_sessions: Dict[str, int] = {}  # LocationMode value -> sessions
+
+    # Sessions counted in this row; makes add/remove idempotent
+    session_ids: List[PydanticObjectId] = []
+
+    class Settings:
+        name = "workload_rollups"
+        indexes = [
+            IndexModel([("tutor_id", 1), ("course_id", 1), ("day", 1)], unique=True),
+            [("faculty_id", 1), ("day", 1)],
+            [("day", 1)],
+            [("session_ids", 1)],
+        ]
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 
 class ResourceUploadResponse(BaseModel):
@@ -42,6 +42,20 @@ class ResourceResponse(BaseModel):
     created_at: datetime
 
 
+class ResourceHighlight(BaseModel):
+    """Snippet of a matching field; matches are [start, end) offsets in the snippet."""
+    field: str  # "title", "description", "content" or "author"
+    snippet: str
+    matches: List[List[int]] = []
+
+
+class ResourceSearchResult(BaseModel):
+    """One full-text search hit."""
+    resource: ResourceResponse
+    score: float  # BM25 relevance (higher is better)
+    highlights: List[ResourceHighlight] = []
+
+
 class ResourceAttachResponse(BaseModel):
     """Response model for attaching resource to session."""
     session_id: str
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 
 class NotificationResponse(BaseModel):
@@ -12,3 +12,28 @@ class NotificationResponse(BaseModel):
     session_id: Optional[str] = None
     is_read: bool
     created_at: datetime
+
+
+
+class MarkReadRequest(BaseModel):
+    """Request model for marking several notifications as read."""
+    ids: List[str] = Field(..., max_length=500)
+
+
+
+class UnreadCountResponse(BaseModel):
+    """Unread badge count of the current user's feed."""
+    unread: int
+    version: int  # Changes whenever the feed changes
+
+
+class NotificationOutboxStats(BaseModel):
+    """Health of the notification outbox (see NotificationDispatcher)."""
+    queue_depth: int  # PENDING intents, including ones waiting for a retry
+    due: int  # PENDING intents ready to be dispatched now
+    failed: int  # Intents given up after the max number of attempts
+    oldest_pending_age_seconds: Optional[float] = None
+    last_dispatch_lag_ms: Optional[int] = None  # Enqueue -> delivered, worst of the last round
+    dispatched_total: int  # Since this worker started
+    retries_total: int  # Since this worker started
+    last_round_at: Optional[datetime] = None
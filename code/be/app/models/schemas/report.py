@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
 
 
 class WorkloadReportResponse(BaseModel):
@@ -12,3 +12,46 @@ class WorkloadReportResponse(BaseModel):
     total_hours: float
     total_sessions: int
     average_session_duration: float
+    mode_breakdown: Dict[str, int] = {}  # LocationMode value -> sessions
+
+
+class TutorWorkloadItem(BaseModel):
+    """One tutor's workload within a faculty/university report."""
+    tutor_id: str
+    tutor_name: str
+    total_hours: float
+    total_sessions: int
+    average_session_duration: float
+    mode_breakdown: Dict[str, int] = {}
+
+
+class FacultyWorkloadItem(BaseModel):
+    """Workload totals of one faculty (faculty of the courses taught)."""
+    faculty_id: Optional[str] = None  # None: courses without a faculty
+    faculty_code: Optional[str] = None
+    faculty_name: Optional[str] = None
+    total_hours: float
+    total_sessions: int
+    tutor_count: int
+
+
+class FacultyWorkloadReportResponse(BaseModel):
+    """Response model for the faculty-wide workload report."""
+    faculty_id: str
+    faculty_code: str
+    faculty_name: str
+    start_date: datetime
+    end_date: datetime
+    total_hours: float
+    total_sessions: int
+    tutors: List[TutorWorkloadItem] = []
+
+
+class UniversityWorkloadReportResponse(BaseModel):
+    """Response model for the university-wide workload report."""
+    start_date: datetime
+    end_date: datetime
+    total_hours: float
+    total_sessions: int
+    faculties: List[FacultyWorkloadItem] = []
+    tutors: List[TutorWorkloadItem] = []
@@ -49,6 +49,22 @@ class AvailabilityResponse(BaseModel):
     allowed_modes: List[LocationMode]
     is_booked: bool
 
+class TimeRange(BaseModel):
+    """A candidate time interval."""
+    start_time: datetime
+    end_time: datetime
+
+class OverlapCheckRequest(BaseModel):
+    """Payload for Tutor to check many candidate intervals against their schedule at once."""
+    intervals: List[TimeRange] = Field(..., min_length=1, max_length=200)
+
+class OverlapCheckResult(BaseModel):
+    """Overlap result for one candidate interval."""
+    start_time: datetime
+    end_time: datetime
+    is_free: bool
+    conflict: Optional[str] = None # "slot" or "session" when the interval is taken
+
 # --- SESSION SCHEMAS ---
 
 class BookingRequest(BaseModel):
@@ -90,6 +106,7 @@ class SessionResponse(BaseModel):
     id: str
     tutor_id: str
     tutor_name: str
+    tutor_avatar_url: Optional[str] = None  # Small thumbnail (64px) of the tutor avatar
     student_id: Optional[str] = None # ID of the session initiator (primary student, optional for public sessions)
     student_name: Optional[str] = None # Name of the session initiator, optional for public sessions
     
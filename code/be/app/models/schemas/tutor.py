@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 from app.models.enums.location import LocationMode
 
@@ -114,7 +114,8 @@ class TutorSearchResult(BaseModel):
     bio: Optional[str] = None
     tags: List[str] = []
     status: str
-    avatar_url: Optional[str] = None
+    avatar_url: Optional[str] = None  # Card thumbnail (128px) when available
+    avatar_variants: Dict[str, str] = {}  # All thumbnails, size in px -> URL (for srcset)
     
     # Expertise
     subjects: List[TeachingSubjectResponse] = []
@@ -1,3 +1,3 @@
-from . import academic, attendance, auth, availability, feedback, library, notifications, reports, sessions, students, tutors, users
+from . import academic, attendance, auth, availability, feedback, files, library, notifications, reports, sessions, students, tutors, users
 
-__all__ = ["academic", "attendance", "auth", "availability", "feedback", "library", "notifications", "reports", "sessions", "students", "tutors", "users"]
+__all__ = ["academic", "attendance", "auth", "availability", "feedback", "files", "library", "notifications", "reports", "sessions", "students", "tutors", "users"]
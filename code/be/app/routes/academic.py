@@ -1,19 +1,19 @@
 from fastapi import APIRouter, Depends
 from typing import List
-from beanie import Link
+from beanie import PydanticObjectId
 
-from app.models.external.faculty import Faculty
-from app.models.external.major import Major
-from app.models.external.course import Course
+from app.models.enums.role import UserRole
 from app.models.schemas.academic import FacultyResponse, MajorResponse, CourseResponse
-from app.core.deps import get_current_user
+from app.core.deps import get_current_user, RoleChecker
+from app.services.master_data_cache import MasterDataCache
+from app.services.course_search_index import CourseSearchIndex
 
 router = APIRouter(prefix="/academic", tags=["Academic Data"])
 
 @router.get("/faculties", response_model=List[FacultyResponse])
 async def get_faculties(user=Depends(get_current_user)):
     """Lấy danh sách tất cả Khoa"""
-    faculties = await Faculty.find_all().to_list()
+    faculties = await MasterDataCache.list_faculties()
     return [
         FacultyResponse(id=str(f.id), name=f.name, code=f.code)
         for f in faculties
@@ -22,19 +22,17 @@ async def get_faculties(user=Depends(get_current_user)):
 @router.get("/majors", response_model=List[MajorResponse])
 async def get_majors(faculty_id: str = None, user=Depends(get_current_user)):
     """Lấy danh sách Ngành (Filter theo Khoa)"""
-    query = Major.find_all()
-    if faculty_id:
-        query = Major.find(Major.faculty.id == faculty_id)
-    
-    # Fetch links để lấy code của Faculty
-    majors = await query.fetch_links().to_list()
+    if faculty_id and not PydanticObjectId.is_valid(faculty_id):
+        return []
+    majors = await MasterDataCache.list_majors(faculty_id)
     
     results = []
     for m in majors:
         # Xử lý an toàn link faculty
         fac_code = "UNKNOWN"
-        if m.faculty and not isinstance(m.faculty, Link):
-            fac_code = m.faculty.code
+        faculty = await MasterDataCache.get_faculty(m.faculty_id)
+        if faculty:
+            fac_code = faculty.code
             
         results.append(MajorResponse(
             id=str(m.id),
@@ -46,18 +44,17 @@ async def get_majors(faculty_id: str = None, user=Depends(get_current_user)):
 
 @router.get("/courses", response_model=List[CourseResponse])
 async def get_courses(search: str = None, limit: int = 50, user=Depends(get_current_user)):
-    """Tìm kiếm Môn học"""
-    query = Course.find_all()
+    """Tìm kiếm Môn học (không dấu, theo tiền tố mã môn, có xếp hạng)"""
     if search:
-        query = Course.find(
-            {"$or": [
-                {"name": {"$regex": search, "$options": "i"}},
-                {"code": {"$regex": search, "$options": "i"}}
-            ]}
-        )
+        return await CourseSearchIndex.search(search, limit)
     
-    courses = await query.limit(limit).to_list()
+    courses = (await MasterDataCache.list_courses())[:limit]
     return [
         CourseResponse(id=str(c.id), name=c.name, code=c.code, credits=c.credits)
         for c in courses
-    ]
\ No newline at end of file
+    ]
+
+@router.get("/cache-stats")
+async def get_master_data_cache_stats(user=Depends(RoleChecker([UserRole.ADMIN]))):
+    """Hit/miss counters of the master data cache (Faculty, Major, Course)"""
+    return MasterDataCache.stats()
@@ -1,4 +1,6 @@
-from fastapi import APIRouter, Response, status
+from typing import Optional
+from fastapi import APIRouter, Cookie, Response, status
+from app.core.principal_cache import PrincipalCache
 from app.models.schemas.auth import LoginRequest
 from app.services.auth_service import AuthService
 
@@ -23,6 +25,8 @@ async def login(data: LoginRequest, response: Response):
     return {"message": "Login successful"}
 
 @router.post("/logout")
-async def logout(response: Response):
+async def logout(response: Response, access_token: Optional[str] = Cookie(None)):
+    if access_token:
+        PrincipalCache.invalidate_token(access_token)
     response.delete_cookie("access_token")
     return {"message": "Logout successful"}
\ No newline at end of file
@@ -4,7 +4,7 @@ from typing import List
 from app.core.deps import get_current_user, RoleChecker
 from app.models.internal.user import User
 from app.models.enums.role import UserRole
-from app.models.schemas.schedule import AvailabilityCreateRequest, AvailabilityResponse
+from app.models.schemas.schedule import AvailabilityCreateRequest, AvailabilityResponse, OverlapCheckRequest, OverlapCheckResult
 from app.services.schedule_service import ScheduleService
 
 router = APIRouter(prefix="/availability", tags=["Availability"])
@@ -21,6 +21,18 @@ async def create_availability_slot(
     """
     return await ScheduleService.create_slot(current_user, payload)
 
+@router.post("/check", response_model=List[OverlapCheckResult])
+async def check_availability_overlaps(
+    payload: OverlapCheckRequest,
+    current_user: User = Depends(RoleChecker([UserRole.TUTOR]))
+):
+    """
+    [Tutor Action] Checks many candidate intervals against existing slots and active sessions.
+    Returns, per interval, whether it is free or which kind of entry it overlaps.
+    Requires: Tutor Role.
+    """
+    return await ScheduleService.check_overlaps(current_user, payload)
+
 @router.get("/{tutor_id}", response_model=List[AvailabilityResponse])
 async def get_tutor_availability(
     tutor_id: str,
@@ -0,0 +1,62 @@
+from fastapi import APIRouter, Header, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from typing import Optional
+
+from app.core.config import settings
+from app.services.storage_backends import iter_file_range
+from app.services.storage_service import StorageService
+
+router = APIRouter(prefix=settings.LOCAL_STORAGE_URL, tags=["Files"])
+
+
+@router.api_route("/{public_id}", methods=["GET", "HEAD"])
+async def get_file(
+    public_id: str,
+    request: Request,
+    range: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    [Public] Serves a file of the local storage backend (STORAGE_BACKEND=local).
+
+    Files are addressed by content (SHA-256), so they never change: responses
+    carry a long-lived immutable Cache-Control and the digest as ETag.
+    Single byte ranges (`Range: bytes=start-end`) are answered with 206 Partial
+    Content, for resumed downloads and video seeking.
+    Only raster images and videos are served inline; any other type (the stored
+    type is guessed from an uploader's filename) is sent as an attachment with
+    a sandboxing CSP, so uploaded SVG/HTML never runs on the API origin.
+    """
+    located = await StorageService.backend().locate(public_id)
+    if located is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
+    path, blob = located
+
+    headers = {
+        "ETag": f'"{public_id}"',
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "Accept-Ranges": "bytes",
+        "X-Content-Type-Options": "nosniff"
+    }
+    if not StorageService.is_inline_safe(blob["content_type"]):
+        headers["Content-Disposition"] = "attachment"
+        headers["Content-Security-Policy"] = "default-src 'none'; sandbox"
+    if if_none_match == headers["ETag"]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    size = blob["size"]
+    byte_range = StorageService.parse_range(range, size)
+    start, end = byte_range if byte_range else (0, size - 1)
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1 if size else 0)
+    status_code = status.HTTP_206_PARTIAL_CONTENT if byte_range else status.HTTP_200_OK
+
+    if request.method == "HEAD" or size == 0:
+        return Response(status_code=status_code, headers=headers, media_type=blob["content_type"])
+    return StreamingResponse(
+        iter_file_range(path, start, end),
+        status_code=status_code,
+        headers=headers,
+        media_type=blob["content_type"]
+    )
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, UploadFile, File, Form, status, Query
+from fastapi import APIRouter, Depends, UploadFile, File, Form, status, Query, Response
 from typing import List, Optional
 
 from app.core.deps import get_current_user
@@ -7,7 +7,8 @@ from app.models.internal.library import ResourceType, AccessLevel
 from app.models.schemas.library import (
     ResourceUploadResponse,
     ResourceResponse,
-    ResourceAttachResponse
+    ResourceAttachResponse,
+    ResourceSearchResult
 )
 from app.services.library_service import LibraryService
 
@@ -67,8 +68,11 @@ async def upload_resource(
 
 @router.get("/", response_model=List[ResourceResponse])
 async def list_resources(
+    response: Response,
     resource_type: Optional[ResourceType] = Query(None, description="Filter by resource type"),
     department: Optional[str] = Query(None, description="Filter by department"),
+    limit: Optional[int] = Query(None, ge=1, le=200, description="Maximum number of resources per page (omit with no cursor for the full list)"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -83,18 +87,60 @@ async def list_resources(
     - resource_type: Optional filter by resource type (PDF, VIDEO, QUESTION_BANK, etc.)
     - department: Optional filter by department name
     
-    Resources are sorted by creation date (newest first).
+    Resources are sorted by creation date (newest first). Pagination is opt-in:
+    without `limit` or `cursor` every accessible resource is returned; with
+    them, the X-Next-Cursor response header holds the cursor of the next page
+    while more resources are available.
     
     Frontend Compatibility:
     - Includes 'access' field: "ALLOWED" or "RESTRICTED"
     - Includes 'link' field (alias for external_url)
     - Converts enum values to frontend-friendly formats
     """
-    return await LibraryService.get_resource_list(
+    resources, next_cursor = await LibraryService.get_resource_list(
         user=current_user,
         resource_type=resource_type,
-        department=department
+        department=department,
+        limit=limit,
+        cursor=cursor
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return resources
+
+
+@router.get("/search", response_model=List[ResourceSearchResult])
+async def search_resources(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description="Search text (title, author, description, question-bank content)"),
+    resource_type: Optional[ResourceType] = Query(None, description="Filter by resource type"),
+    department: Optional[str] = Query(None, description="Filter by department"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of results per page"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    [All Users] Full-text search over the library resources the user can access.
+    
+    Matches title, author, description and the text content of question banks,
+    ignoring case and Vietnamese diacritics ("cau truc du lieu" finds
+    "Cấu trúc dữ liệu"). Results are ranked by relevance (best first) and carry
+    highlight snippets with the offsets of the matched words.
+    
+    When more results are available, the X-Next-Cursor response header holds
+    the cursor to pass for the next page.
+    """
+    results, next_cursor = await LibraryService.search_resources(
+        user=current_user,
+        query=q,
+        resource_type=resource_type,
+        department=department,
+        limit=limit,
+        cursor=cursor
     )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return results
 
 
 @router.put("/sessions/{session_id}/resource/{resource_id}", response_model=ResourceAttachResponse)
@@ -1,24 +1,92 @@
-from fastapi import APIRouter, Depends, status
-from typing import List
+from fastapi import APIRouter, Depends, Header, Query, Response, status
+from fastapi.responses import StreamingResponse
+from datetime import datetime
+from typing import List, Optional
 
-from app.core.deps import get_current_user
+from app.core.deps import get_current_user, RoleChecker
 from app.models.internal.user import User
-from app.models.schemas.notification import NotificationResponse
+from app.models.enums.role import UserRole
+from app.models.schemas.notification import NotificationResponse, NotificationOutboxStats, UnreadCountResponse, MarkReadRequest
 from app.services.notification_service import NotificationService
+from app.services.notification_dispatcher import NotificationDispatcher
 
 router = APIRouter(prefix="/notifications", tags=["Notifications"])
 
 
 @router.get("/", response_model=List[NotificationResponse])
 async def get_notifications(
+    response: Response,
+    limit: int = Query(50, ge=1, le=200, description="Maximum number of notifications per page"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    since: Optional[datetime] = Query(None, description="Only notifications created after this time"),
+    if_none_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_user)
 ):
     """
-    [All Users] Retrieve all notifications for the current user.
+    [All Users] Retrieve a page of notifications for the current user.
     
-    Returns notifications sorted by date (newest first).
+    Notifications are sorted by date (newest first) and paginated by cursor;
+    the X-Next-Cursor response header holds the cursor of the next page.
+    
+    Polling: send back the ETag of the previous response in If-None-Match to get
+    304 Not Modified while nothing changed, or pass `since` (created_at of the
+    newest notification already shown) to receive only the new ones.
+    """
+    etag = await NotificationService.get_feed_etag(current_user, limit, cursor, since)
+    if if_none_match == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    
+    notifications, next_cursor = await NotificationService.get_user_notifications(
+        current_user, limit=limit, cursor=cursor, since=since
+    )
+    response.headers["ETag"] = etag
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return notifications
+
+
+@router.get("/stream")
+async def stream_notifications(
+    last_event_id: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    [All Users] Live notification stream (Server-Sent Events).
+    
+    Use with EventSource: each new notification arrives as a `notification`
+    event whose id is the notification id. The browser resends it as
+    Last-Event-ID when reconnecting, and the missed notifications are replayed.
+    A `resync` event means the stream fell behind and was closed.
+    """
+    return StreamingResponse(
+        NotificationService.stream_events(current_user, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/unread-count", response_model=UnreadCountResponse)
+async def get_unread_count(
+    current_user: User = Depends(get_current_user)
+):
+    """
+    [All Users] Number of unread notifications (badge), read from a maintained counter.
     """
-    return await NotificationService.get_user_notifications(current_user)
+    unread, version = await NotificationService.get_unread_count(current_user)
+    return UnreadCountResponse(unread=unread, version=version)
+
+
+@router.get("/outbox/stats", response_model=NotificationOutboxStats)
+async def get_outbox_stats(
+    current_user: User = Depends(RoleChecker([UserRole.ADMIN]))
+):
+    """
+    [ADMIN] Notification outbox health.
+    
+    Queue depth, due/failed intents, age of the oldest pending intent and the
+    enqueue-to-delivery lag of the last dispatch round.
+    """
+    return await NotificationDispatcher.stats()
 
 
 @router.put("/{notification_id}/read", response_model=NotificationResponse)
@@ -46,3 +114,18 @@ async def mark_all_notifications_read(
     count = await NotificationService.mark_all_as_read(current_user)
     return {"message": f"Marked {count} notifications as read", "count": count}
 
+
+@router.put("/read", status_code=status.HTTP_200_OK)
+async def mark_notifications_read(
+    payload: MarkReadRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    [All Users] Mark several notifications as read (up to 500 ids).
+    
+    Ids of notifications that belong to other users or are already read are
+    ignored. Returns the number of notifications marked as read.
+    """
+    count = await NotificationService.mark_many_as_read(payload.ids, current_user)
+    return {"message": f"Marked {count} notifications as read", "count": count}
+
@@ -1,10 +1,18 @@
 from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import StreamingResponse
 from datetime import datetime
+from typing import List, Optional
 from app.core.deps import RoleChecker
 from app.models.internal.user import User
 from app.models.enums.role import UserRole
-from app.models.schemas.report import WorkloadReportResponse
+from app.models.enums.export_format import ExportFormat
+from app.models.internal.session import SessionStatus
+from app.models.internal.feedback import FeedbackStatus
+from app.models.schemas.report import WorkloadReportResponse, FacultyWorkloadReportResponse, UniversityWorkloadReportResponse
 from app.services.report_service import ReportService
+from app.services.export_service import (
+    ExportService, SESSION_COLUMNS, ATTENDANCE_COLUMNS, FEEDBACK_COLUMNS, WORKLOAD_COLUMNS
+)
 
 router = APIRouter(prefix="/reports", tags=["Reports & Analytics"])
 
@@ -23,13 +31,124 @@ async def get_tutor_workload(
     - Total hours taught in the period
     - Total sessions completed
     - Average session duration
+    - Sessions per location mode
     
-    This report uses MongoDB aggregation for efficient calculation
-    based on TutorSession data (COMPLETED/CONFIRMED sessions only).
+    This report is summed from the daily workload rollups
+    (COMPLETED/CONFIRMED sessions only).
     
     Query Parameters:
     - tutor_id: ID of the tutor to generate report for
-    - start_date: Start of reporting period (inclusive)
-    - end_date: End of reporting period (inclusive)
+    - start_date: Start of reporting period (whole UTC day, inclusive)
+    - end_date: End of reporting period (whole UTC day, inclusive)
+    
+    Date window: sessions count on the UTC day of their start time, and the
+    time of day of start_date/end_date is ignored (aware values are converted
+    to UTC first). Before the rollups, the bounds were exact instants on
+    start_time. An end_date of midnight therefore now includes that whole day.
     """
     return await ReportService.get_tutor_workload(tutor_id, start_date, end_date)
+
+
+@router.get("/workload/faculties/{faculty_id}", response_model=FacultyWorkloadReportResponse, status_code=status.HTTP_200_OK)
+async def get_faculty_workload(
+    faculty_id: str,
+    start_date: datetime = Query(..., description="Start date of the reporting period (ISO format)"),
+    end_date: datetime = Query(..., description="End date of the reporting period (ISO format)"),
+    current_user: User = Depends(RoleChecker([UserRole.STAFF_AA]))
+):
+    """
+    [STAFF_AA] Workload of every tutor teaching courses of a faculty.
+    
+    Returns faculty totals and one entry per tutor (most hours first).
+    Sessions count toward the faculty of their course. start_date and end_date
+    select whole UTC days, both inclusive (see /reports/workload).
+    """
+    return await ReportService.get_faculty_workload(faculty_id, start_date, end_date)
+
+
+@router.get("/workload/university", response_model=UniversityWorkloadReportResponse, status_code=status.HTTP_200_OK)
+async def get_university_workload(
+    start_date: datetime = Query(..., description="Start date of the reporting period (ISO format)"),
+    end_date: datetime = Query(..., description="End date of the reporting period (ISO format)"),
+    current_user: User = Depends(RoleChecker([UserRole.STAFF_AA]))
+):
+    """
+    [STAFF_AA] University-wide workload: totals per faculty and one entry per tutor.
+    start_date and end_date select whole UTC days, both inclusive (see /reports/workload).
+    """
+    return await ReportService.get_university_workload(start_date, end_date)
+
+
+
+# ==========================================
+# STREAMING EXPORTS (CSV / NDJSON)
+# ==========================================
+EXPORT_ROLES = [UserRole.STAFF_AA, UserRole.STAFF_SA]
+
+
+def _export_response(rows, columns: List[str], fmt: ExportFormat, name: str, start_date: datetime, end_date: datetime) -> StreamingResponse:
+    """Wraps a row source in a streamed file download."""
+    filename = f"{name}_{start_date:%Y%m%d}_{end_date:%Y%m%d}.{fmt.value}"
+    return StreamingResponse(
+        ExportService.stream(rows, columns, fmt),
+        media_type="text/csv; charset=utf-8" if fmt == ExportFormat.CSV else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get("/exports/sessions")
+async def export_sessions(
+    start_date: datetime = Query(..., description="Sessions starting from (ISO format)"),
+    end_date: datetime = Query(..., description="Sessions starting until, inclusive (ISO format)"),
+    status: Optional[List[SessionStatus]] = Query(None, description="Filter by one or more session statuses"),
+    format: ExportFormat = Query(ExportFormat.CSV, description="csv or ndjson"),
+    current_user: User = Depends(RoleChecker(EXPORT_ROLES))
+):
+    """
+    [STAFF_AA/STAFF_SA] Streams every session of the period, oldest first.
+    """
+    rows = ExportService.session_rows(start_date, end_date, status)
+    return _export_response(rows, SESSION_COLUMNS, format, "sessions", start_date, end_date)
+
+
+@router.get("/exports/attendance")
+async def export_attendance(
+    start_date: datetime = Query(..., description="Check-ins from (ISO format)"),
+    end_date: datetime = Query(..., description="Check-ins until, inclusive (ISO format)"),
+    format: ExportFormat = Query(ExportFormat.CSV, description="csv or ndjson"),
+    current_user: User = Depends(RoleChecker(EXPORT_ROLES))
+):
+    """
+    [STAFF_AA/STAFF_SA] Streams every attendance check-in of the period, oldest first.
+    """
+    rows = ExportService.attendance_rows(start_date, end_date)
+    return _export_response(rows, ATTENDANCE_COLUMNS, format, "attendance", start_date, end_date)
+
+
+@router.get("/exports/feedback")
+async def export_feedback(
+    start_date: datetime = Query(..., description="Feedback records created from (ISO format)"),
+    end_date: datetime = Query(..., description="Feedback records created until, inclusive (ISO format)"),
+    status: Optional[List[FeedbackStatus]] = Query(None, description="Filter by one or more feedback statuses"),
+    format: ExportFormat = Query(ExportFormat.CSV, description="csv or ndjson"),
+    current_user: User = Depends(RoleChecker(EXPORT_ROLES))
+):
+    """
+    [STAFF_AA/STAFF_SA] Streams every feedback record of the period, oldest first.
+    """
+    rows = ExportService.feedback_rows(start_date, end_date, status)
+    return _export_response(rows, FEEDBACK_COLUMNS, format, "feedback", start_date, end_date)
+
+
+@router.get("/exports/workload")
+async def export_workload(
+    start_date: datetime = Query(..., description="First day (ISO format, whole UTC day)"),
+    end_date: datetime = Query(..., description="Last day, inclusive (ISO format, whole UTC day)"),
+    format: ExportFormat = Query(ExportFormat.CSV, description="csv or ndjson"),
+    current_user: User = Depends(RoleChecker(EXPORT_ROLES))
+):
+    """
+    [STAFF_AA/STAFF_SA] Streams the daily workload rollups (one row per tutor, course and day).
+    """
+    rows = ExportService.workload_rows(start_date, end_date)
+    return _export_response(rows, WORKLOAD_COLUMNS, format, "workload", start_date, end_date)
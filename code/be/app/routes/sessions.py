@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, Body, status
+from fastapi import APIRouter, Depends, HTTPException, Body, Query, Response, status
+from datetime import datetime
 from typing import List, Optional
 
 from app.core.deps import RoleChecker, get_current_user, get_current_user_optional
@@ -10,6 +11,7 @@ from app.models.schemas.schedule import (
     NegotiationCreateRequest, 
     SessionConfirmRequest # Import schema confirm
 )
+from app.models.internal.session import SessionStatus
 from app.services.schedule_service import ScheduleService
 from app.models.enums.role import UserRole
 
@@ -30,17 +32,41 @@ async def request_booking(
 
 @router.get("/", response_model=List[SessionResponse])
 async def get_my_sessions(
+    response: Response,
     role: Optional[str] = None,  # "student" or "tutor" to specify which view
+    status: Optional[List[SessionStatus]] = Query(None, description="Filter by one or more session statuses"),
+    start_from: Optional[datetime] = Query(None, description="Only sessions starting at or after this time"),
+    start_to: Optional[datetime] = Query(None, description="Only sessions starting before this time"),
+    course_code: Optional[str] = Query(None, description="Filter by course code (e.g., CO3005)"),
+    limit: Optional[int] = Query(None, ge=1, le=200, description="Maximum number of sessions per page (omit with no cursor for the newest 1000)"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
     current_user: User = Depends(get_current_user)
 ):
-    """[Tutor/Student] Retrieves the list of sessions relevant to the current user.
+    """[Tutor/Student] Retrieves a page of sessions relevant to the current user.
     
     Optional query parameter 'role' can be used to specify which perspective:
     - role=student: Only sessions where user is a student
     - role=tutor: Only sessions where user is a tutor
     - If not specified, defaults to student view if student profile exists, otherwise tutor view
+    
+    Sessions are sorted by start time (newest first). Pagination is opt-in:
+    without `limit` or `cursor` the unpaginated list is still returned, capped at
+    the newest 1000 sessions (SESSION_LIST_MAX); with them, pages hold `limit`
+    sessions (100 by default). Whenever more sessions are available, the
+    X-Next-Cursor response header holds the cursor of the next page.
     """
-    return await ScheduleService.get_user_sessions(current_user, role)
+    sessions, next_cursor = await ScheduleService.get_user_sessions(
+        current_user, role,
+        statuses=status,
+        start_from=start_from,
+        start_to=start_to,
+        course_code=course_code,
+        limit=limit,
+        cursor=cursor
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return sessions
 
 @router.get("/public", response_model=List[SessionResponse])
 async def get_public_sessions(
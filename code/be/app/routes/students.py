@@ -37,10 +37,10 @@ async def recalculate_all_student_stats(
     - Counts COMPLETED sessions for each student
     - Calculates total learning hours from session durations
     - Counts unique tutors worked with
-    - Updates attendance rate (currently 100%, can be enhanced)
+    - Derives attendance rate from attendance logs
     
     Returns:
-        Number of student profiles updated
+        Number of student profiles whose stats changed
     """
     updated_count = await StudentService.recalculate_student_stats()
     return {"message": f"Successfully recalculated stats for {updated_count} students", "updated_count": updated_count}
@@ -123,7 +123,8 @@ async def upload_tutor_avatar(
     current_user: User = Depends(RoleChecker([UserRole.TUTOR]))
 ):
     """
-    [Tutor Only] Upload a custom avatar image (JPG, PNG) to Cloudinary.
+    [Tutor Only] Upload a custom avatar image (JPG, PNG, GIF, WEBP, max 5MB).
+    Stored as WebP without metadata, with 64/128/256px thumbnails.
     Deletes the old avatar if it exists to save storage space.
     """
     # Validate file type
@@ -142,6 +143,7 @@ async def upload_tutor_avatar(
 
 @router.post("/stats/recalculate", response_model=dict)
 async def recalculate_all_tutor_stats(
+    dry_run: bool = Query(False, description="Only report which tutors would change"),
     current_user: User = Depends(RoleChecker([UserRole.ADMIN, UserRole.DEPT_CHAIR]))
 ):
     """
@@ -157,5 +159,7 @@ async def recalculate_all_tutor_stats(
     - Total unique students taught
     - Total submitted feedbacks
     - Average rating from submitted feedbacks
+    
+    With dry_run=true nothing is written; the response lists the per-tutor diff.
     """
-    return await TutorService.recalculate_tutor_stats()
+    return await TutorService.recalculate_tutor_stats(dry_run=dry_run)
@@ -4,7 +4,7 @@ from beanie import Link
 from app.models.internal.user import User
 from app.core.deps import get_current_user
 from app.models.schemas.user import UserShortResponse, UserDetailResponse, UserAcademicInfo, UserProfileUpdateRequest
-from app.services.storage_service import StorageService
+from app.services.avatar_service import AvatarService, CARD_AVATAR_SIZE
 from app.models.internal.student_profile import StudentProfile
 from datetime import datetime
 
@@ -141,8 +141,10 @@ async def upload_student_avatar(
     current_user: User = Depends(get_current_user)
 ):
     """
-    Upload a custom avatar image (JPG, PNG) to Cloudinary for student.
-    Deletes the old avatar if it exists to save storage space.
+    Upload a custom avatar image (JPG, PNG, GIF, WEBP, max 5MB) for student.
+    Stored as WebP without metadata, with 64/128/256px thumbnails.
+    The old avatar is released after the new one is stored; shared content is
+    only deleted when nothing else uses it.
     """
     # Validate file type
     if not file.content_type or not file.content_type.startswith("image/"):
@@ -156,33 +158,27 @@ async def upload_student_avatar(
     if not profile:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Student profile not found")
     
-    # Delete old avatar from Cloudinary if exists
-    if profile.avatar_public_id:
-        try:
-            await StorageService.delete_resource(
-                public_id=profile.avatar_public_id,
-                resource_type="image"
-            )
-        except Exception as e:
-            print(f"Warning: Failed to delete old avatar {profile.avatar_public_id}: {str(e)}")
+    # Process and upload new avatar
+    avatar = await AvatarService.process_upload(file, folder="tutor-system/student-avatars")
+    old_public_ids = profile.avatar_public_ids or ([profile.avatar_public_id] if profile.avatar_public_id else [])
     
-    # Upload new avatar to Cloudinary
-    upload_result = await StorageService.upload_document(
-        file=file,
-        folder="tutor-system/student-avatars"
-    )
-    
-    # Update profile with new avatar URL and public_id
-    profile.avatar_url = upload_result["secure_url"]
-    profile.avatar_public_id = upload_result["public_id"]
+    # Update profile with new avatar URLs and public_ids
+    profile.avatar_url = avatar["avatar_url"]
+    profile.avatar_public_id = None
+    profile.avatar_public_ids = avatar["avatar_public_ids"]
+    profile.avatar_variants = avatar["avatar_variants"]
     profile.updated_at = datetime.now()
     await profile.save()
     
-    # Also update User model avatar_url for navbar display
-    current_user.avatar_url = upload_result["secure_url"]
+    # Also update User model avatar_url for navbar display (thumbnail)
+    current_user.avatar_url = AvatarService.variant_url(avatar["avatar_variants"], avatar["avatar_url"], CARD_AVATAR_SIZE)
     await current_user.save()
     
+    # Release old avatar if exists (deleted once nothing else uses it)
+    await AvatarService.release(old_public_ids)
+    
     return {
-        "avatar_url": upload_result["secure_url"],
+        "avatar_url": avatar["avatar_url"],
+        "avatar_variants": avatar["avatar_variants"],
         "message": "Avatar uploaded successfully"
     }
\ No newline at end of file
@@ -10,6 +10,9 @@ from app.models.internal.student_profile import StudentProfile
 # Schemas
 from app.models.schemas.attendance import AttendanceResponse
 
+# Events
+from app.core.events import EventBus, AttendanceMarked
+
 
 class AttendanceService:
     """
@@ -100,9 +103,8 @@ class AttendanceService:
         )
         await attendance.save()
 
-        # 6. Update student statistics (optional enhancement)
-        student_profile.stats.total_sessions += 1
-        await student_profile.save()
+        # 6. Update student statistics (StatsProjector; total_sessions counts completed sessions only)
+        await EventBus.publish(AttendanceMarked.from_log(attendance, session))
 
         # 7. Return response
         return AttendanceResponse(
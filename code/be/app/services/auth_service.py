@@ -3,9 +3,11 @@ from app.models.external.hcmut_sso import HCMUT_SSO
 from app.models.internal.user import User
 from app.models.internal.tutor_profile import TutorProfile
 from app.models.internal.student_profile import StudentProfile
-from app.core.security import verify_password
+from app.core.config import settings
+from app.core.security import verify_password, create_access_token
 from app.models.enums.role import UserRole
 from app.models.enums.university_identities import UniversityIdentity
+from app.services.tutor_search_view_service import TutorSearchViewService
 
 class AuthService:
     @staticmethod
@@ -61,12 +63,14 @@ class AuthService:
             # CASE A: LECTURER -> Auto Tutor Role + Tutor Profile
             if sso_record.identity_type == UniversityIdentity.LECTURER:
                 app_user.roles.append(UserRole.TUTOR)
-                await TutorProfile(
+                tutor_profile = TutorProfile(
                     user=app_user,
                     display_name=f"GV. {sso_record.full_name}",
                     bio="Official HCMUT Faculty member.",
                     is_certified_by_faculty=True # Implicitly certified
-                ).save()
+                )
+                await tutor_profile.save()
+                await TutorSearchViewService.refresh_tutor(tutor_profile.id)
 
             # CASE B: STUDENT -> Auto Student Role + Student Profile
             elif sso_record.identity_type == UniversityIdentity.STUDENT:
@@ -104,4 +108,7 @@ class AuthService:
                 await app_user.save() 
 
         # --- STEP 3: RETURN TOKEN ---
+        if settings.AUTH_TOKEN_MODE == "jwt":
+            # Signed token carrying the roles inline
+            return create_access_token(app_user.id, roles=[role.value for role in app_user.roles])
         return str(app_user.id) # Internal User ObjectId used as the access token
\ No newline at end of file
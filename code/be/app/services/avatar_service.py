@@ -0,0 +1,147 @@
+import asyncio
+import io
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import UploadFile, HTTPException, status
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+# Services
+from app.services.storage_backends import run_blocking
+from app.services.storage_service import StorageService
+
+
+# Square thumbnails generated for every avatar (px)
+AVATAR_SIZES = (64, 128, 256)
+
+# Profile-page image; the uploaded original is not kept
+AVATAR_MAX_SIZE = 512
+
+# Variant used by list cards (tutor search) and small chips (session lists)
+CARD_AVATAR_SIZE = 128
+CHIP_AVATAR_SIZE = 64
+
+MAX_AVATAR_BYTES = 5 * 1024 * 1024
+
+# Rejects decompression bombs (a small file declaring a huge canvas)
+MAX_AVATAR_PIXELS = 40_000_000
+
+ALLOWED_FORMATS = {"JPEG", "PNG", "GIF", "WEBP"}
+
+WEBP_QUALITY = 82
+
+
+class AvatarService:
+    """
+    Avatar processing on upload: validates the image, strips its metadata
+    (EXIF, GPS, ICC) by re-encoding, and stores square WebP variants
+    (AVATAR_SIZES plus an AVATAR_MAX_SIZE profile image). Profiles keep the
+    variant URLs so list pages can send a thumbnail instead of the full image.
+    """
+
+    # ==========================================
+    # PROCESSING
+    # ==========================================
+    @staticmethod
+    def _encode(image: Image.Image, size: int) -> bytes:
+        square = ImageOps.fit(image, (size, size), method=Image.Resampling.LANCZOS)
+        out = io.BytesIO()
+        # Saved without exif/icc_profile: no metadata is carried over
+        square.save(out, format="WEBP", quality=WEBP_QUALITY, method=4)
+        return out.getvalue()
+
+    @staticmethod
+    def _render(data: bytes) -> Tuple[bytes, Dict[int, bytes]]:
+        """
+        Decodes the upload and encodes the profile image and every thumbnail
+        (blocking, CPU bound).
+
+        Raises:
+            HTTPException: 400 if the data is not a supported image
+        """
+        try:
+            with Image.open(io.BytesIO(data)) as probe:
+                image_format = probe.format
+                width, height = probe.size
+                probe.verify()
+        except (UnidentifiedImageError, OSError, SyntaxError, Image.DecompressionBombError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File is not a valid image")
+        if image_format not in ALLOWED_FORMATS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Only image files (JPG, PNG, GIF, WEBP) are allowed"
+            )
+        if width * height > MAX_AVATAR_PIXELS:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Image dimensions are too large")
+
+        # verify() leaves the image unusable; decode again (first frame of animations)
+        with Image.open(io.BytesIO(data)) as image:
+            image = ImageOps.exif_transpose(image)
+            image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+
+        profile_image = AvatarService._encode(image, min(image.width, image.height, AVATAR_MAX_SIZE))
+        return profile_image, {size: AvatarService._encode(image, size) for size in AVATAR_SIZES}
+
+    @staticmethod
+    async def process_upload(file: UploadFile, folder: str) -> dict:
+        """
+        Validates and stores an uploaded avatar.
+
+        Returns:
+            Dictionary containing:
+                - avatar_url: URL of the profile image (at most AVATAR_MAX_SIZE px)
+                - avatar_public_ids: Storage ids of all stored variants
+                - avatar_variants: {"64": url, "128": url, "256": url}
+
+        Raises:
+            HTTPException: 400 if the file is not a supported image, 413 if too large
+        """
+        if not file.content_type or not file.content_type.startswith("image/"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Only image files (JPG, PNG, GIF, WEBP) are allowed"
+            )
+        too_large = HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Avatar size exceeds maximum allowed size of {MAX_AVATAR_BYTES // 1024 // 1024}MB"
+        )
+        if file.size is not None and file.size > MAX_AVATAR_BYTES:
+            raise too_large
+        data = await file.read(MAX_AVATAR_BYTES + 1)
+        await file.seek(0)
+        if len(data) > MAX_AVATAR_BYTES:
+            raise too_large
+
+        profile_image, thumbnails = await run_blocking(AvatarService._render, data)
+        uploads = await asyncio.gather(
+            StorageService.upload_bytes(profile_image, "avatar.webp", folder),
+            *(StorageService.upload_bytes(thumbnails[size], f"avatar-{size}.webp", folder) for size in AVATAR_SIZES)
+        )
+        return {
+            "avatar_url": uploads[0]["secure_url"],
+            "avatar_public_ids": [upload["public_id"] for upload in uploads],
+            "avatar_variants": {str(size): upload["secure_url"] for size, upload in zip(AVATAR_SIZES, uploads[1:])}
+        }
+
+    @staticmethod
+    async def release(public_ids: Iterable[str]):
+        """Deletes replaced avatar files (logs but never fails the request)."""
+        for public_id in public_ids:
+            try:
+                await StorageService.delete_resource(public_id=public_id, resource_type="image")
+            except Exception as e:
+                print(f"Warning: Failed to delete old avatar {public_id}: {str(e)}")
+
+    # ==========================================
+    # DISPLAY
+    # ==========================================
+    @staticmethod
+    def variant_url(variants: Optional[Dict[str, str]], fallback: Optional[str], size: int) -> Optional[str]:
+        """
+        Smallest stored variant at least `size` px (else the largest one);
+        `fallback` (the full avatar_url) for avatars uploaded before variants existed.
+        """
+        if not variants:
+            return fallback
+        available: List[int] = sorted(int(s) for s in variants)
+        chosen = next((s for s in available if s >= size), available[-1])
+        return variants[str(chosen)]
@@ -0,0 +1,148 @@
+import asyncio
+import heapq
+import re
+import time
+import unicodedata
+from bisect import bisect_left
+from typing import Dict, List, Optional, Set, Tuple
+
+# Schemas
+from app.models.schemas.academic import CourseResponse
+
+# Services
+from app.services.master_data_cache import MasterDataCache
+
+
+# Rebuild the index when it is older than this (catalog is edited out-of-process
+# by the seed scripts, so there is no write path to hook)
+REFRESH_INTERVAL_SECONDS = 600
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercases and strips Vietnamese diacritics ("Công nghệ" -> "cong nghe")."""
+    text = unicodedata.normalize("NFD", text.replace("đ", "d").replace("Đ", "D"))
+    text = "".join(ch for ch in text if unicodedata.category(ch) != "Mn")
+    return _NON_ALNUM.sub(" ", text.lower()).strip()
+
+
+def _prefix_range(keys: List[Tuple[str, int]], prefix: str) -> Set[int]:
+    """Returns the entry positions of all keys starting with `prefix` (keys sorted)."""
+    result = set()
+    i = bisect_left(keys, (prefix, -1))
+    while i < len(keys) and keys[i][0].startswith(prefix):
+        result.add(keys[i][1])
+        i += 1
+    return result
+
+
+class _CourseEntry:
+    __slots__ = ("response", "code", "name")
+
+    def __init__(self, response: CourseResponse):
+        self.response = response
+        self.code = response.code.lower()
+        self.name = normalize_text(response.name)
+
+
+class CourseSearchIndex:
+    """
+    In-memory search index over the course catalog (a few thousand rows).
+
+    Built once at startup (lifespan) and rebuilt when older than
+    REFRESH_INTERVAL_SECONDS. Lookups are binary searches over sorted code and
+    name-token arrays, so /academic/courses autocomplete never scans the
+    collection.
+
+    The app has no course write path: the catalog is written out of process by
+    scripts/seed/seed_master.py. The index reads through MasterDataCache, so a
+    new or renamed course reaches search once both have reloaded, at most
+    CACHE_TTL_SECONDS + REFRESH_INTERVAL_SECONDS later. Restart the server
+    after seeding to see it at once.
+
+    Ranking (best first):
+        0. exact code            ("CO3005")
+        1. code prefix           ("CO30")
+        2. name starts with query ("cong nghe" -> "Công nghệ phần mềm")
+        3. every query word prefixes a name word ("nghe mem")
+        4. substring of name or code (fallback, only when 0-3 find nothing)
+    Ties are broken by shorter name, then code.
+    """
+
+    _entries: List[_CourseEntry] = []
+    _codes: List[Tuple[str, int]] = []
+    _tokens: List[Tuple[str, int]] = []
+    _loaded_at: Optional[float] = None
+    _lock = asyncio.Lock()
+
+    # ==========================================
+    # LOADING
+    # ==========================================
+    @staticmethod
+    async def load():
+        """(Re)builds the index from the course catalog (master data cache)."""
+        courses = await MasterDataCache.list_courses()
+
+        entries = [
+            _CourseEntry(CourseResponse(id=str(c.id), name=c.name, code=c.code, credits=c.credits))
+            for c in courses
+        ]
+        codes = sorted((e.code, i) for i, e in enumerate(entries))
+        tokens = sorted({(token, i) for i, e in enumerate(entries) for token in e.name.split()})
+
+        # Swap in one step so concurrent searches see either the old or the new index
+        CourseSearchIndex._entries, CourseSearchIndex._codes, CourseSearchIndex._tokens = entries, codes, tokens
+        CourseSearchIndex._loaded_at = time.monotonic()
+
+    @staticmethod
+    async def _ensure_fresh():
+        loaded_at = CourseSearchIndex._loaded_at
+        if loaded_at is not None and time.monotonic() - loaded_at < REFRESH_INTERVAL_SECONDS:
+            return
+        async with CourseSearchIndex._lock:
+            # Another request may have rebuilt it while we waited
+            loaded_at = CourseSearchIndex._loaded_at
+            if loaded_at is None or time.monotonic() - loaded_at >= REFRESH_INTERVAL_SECONDS:
+                await CourseSearchIndex.load()
+
+    # ==========================================
+    # SEARCH
+    # ==========================================
+    @staticmethod
+    async def search(query: str, limit: int = 50) -> List[CourseResponse]:
+        """Returns up to `limit` courses matching `query`, best matches first."""
+        await CourseSearchIndex._ensure_fresh()
+
+        normalized = normalize_text(query)
+        if not normalized:
+            return []
+        compact = normalized.replace(" ", "")
+        words = normalized.split()
+        entries = CourseSearchIndex._entries
+
+        ranks: Dict[int, int] = {}
+
+        # Tier 0/1: code prefix (codes have no spaces: "co 30" == "co30")
+        for i in _prefix_range(CourseSearchIndex._codes, compact):
+            ranks[i] = 0 if entries[i].code == compact else 1
+
+        # Tier 2/3: every query word is a prefix of some word of the name
+        candidates: Optional[Set[int]] = None
+        for word in words:
+            matches = _prefix_range(CourseSearchIndex._tokens, word)
+            candidates = matches if candidates is None else candidates & matches
+            if not candidates:
+                break
+        for i in candidates or ():
+            if i not in ranks:
+                ranks[i] = 2 if entries[i].name.startswith(normalized) else 3
+
+        # Tier 4: unanchored substring (legacy behaviour), only when nothing else matched
+        if not ranks:
+            for i, entry in enumerate(entries):
+                if i not in ranks and (normalized in entry.name or compact in entry.code):
+                    ranks[i] = 4
+
+        best = heapq.nsmallest(limit, ranks, key=lambda i: (ranks[i], len(entries[i].name), entries[i].code))
+        return [entries[i].response for i in best]
@@ -0,0 +1,297 @@
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from enum import Enum
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+
+from beanie import PydanticObjectId
+from bson import ObjectId
+
+# Models
+from app.models.internal.session import TutorSession, SessionStatus
+from app.models.internal.attendance import AttendanceLog
+from app.models.internal.feedback import SessionFeedback, FeedbackStatus
+from app.models.internal.student_profile import StudentProfile
+from app.models.internal.user import User
+from app.models.internal.tutor_search_view import TutorSearchView
+from app.models.internal.workload_rollup import WorkloadRollup
+from app.models.enums.location import LocationMode
+from app.models.enums.export_format import ExportFormat
+
+# Services
+from app.services.master_data_cache import MasterDataCache
+from app.services.workload_rollup_service import utc_day
+
+
+# Documents pulled per cursor round trip; also the unit of name resolution and
+# of each chunk written to the response
+EXPORT_BATCH_SIZE = 500
+
+# Resolved names kept per export before the memo is reset (keeps memory flat)
+NAME_CACHE_SIZE = 20000
+
+
+SESSION_COLUMNS = [
+    "session_id", "start_time", "end_time", "duration_hours", "status", "mode",
+    "course_code", "course_name", "tutor_id", "tutor_name", "student_count",
+    "is_public", "topic", "cancelled_by"
+]
+ATTENDANCE_COLUMNS = [
+    "attendance_id", "attended_at", "session_id", "session_start", "course_code",
+    "student_id", "student_name", "student_email", "tutor_id", "tutor_name"
+]
+FEEDBACK_COLUMNS = [
+    "feedback_id", "created_at", "updated_at", "status", "rating", "comment",
+    "session_id", "student_id", "student_name", "tutor_id", "tutor_name"
+]
+WORKLOAD_COLUMNS = [
+    "day", "tutor_id", "tutor_name", "course_code", "faculty_code", "hours", "sessions"
+] + [f"sessions_{mode.value.lower()}" for mode in LocationMode]
+
+
+def _cell(value):
+    """Export representation of one value (ids as strings, datetimes as ISO 8601 UTC)."""
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.isoformat()
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+async def _batches(cursor, size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[List[dict]]:
+    """Groups a Motor cursor into lists of `size` documents."""
+    batch = []
+    async for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class _NameResolver:
+    """Per-export memo of tutor/student display data, filled one batch at a time."""
+
+    def __init__(self):
+        self.tutors: Dict[PydanticObjectId, str] = {}
+        self.students: Dict[PydanticObjectId, dict] = {}
+
+    async def load_tutors(self, ids: Iterable[PydanticObjectId]):
+        if len(self.tutors) > NAME_CACHE_SIZE:
+            self.tutors.clear()
+        missing = list({i for i in ids if i not in self.tutors})
+        if not missing:
+            return
+        async for doc in TutorSearchView.get_motor_collection().find({"_id": {"$in": missing}}, {"full_name": 1}):
+            self.tutors[doc["_id"]] = doc["full_name"]
+
+    async def load_students(self, ids: Iterable[PydanticObjectId]):
+        if len(self.students) > NAME_CACHE_SIZE:
+            self.students.clear()
+        missing = list({i for i in ids if i not in self.students})
+        if not missing:
+            return
+        user_by_student = {
+            doc["_id"]: doc["user"].id
+            async for doc in StudentProfile.get_motor_collection().find({"_id": {"$in": missing}}, {"user": 1})
+        }
+        users = {
+            doc["_id"]: doc
+            async for doc in User.get_motor_collection().find(
+                {"_id": {"$in": list(user_by_student.values())}},
+                {"full_name": 1, "email_edu": 1}
+            )
+        }
+        for student_id, user_id in user_by_student.items():
+            user = users.get(user_id, {})
+            self.students[student_id] = {"name": user.get("full_name"), "email": user.get("email_edu")}
+
+
+class ExportService:
+    """
+    Streaming exports for staff (full-semester sessions, attendance, feedback,
+    workload).
+
+    Rows are read from a Motor cursor EXPORT_BATCH_SIZE documents at a time,
+    enriched with one name lookup per batch and written to the response right
+    away. Nothing holds the whole result, so memory stays flat and the first
+    rows arrive before the query has finished.
+    """
+
+    # ==========================================
+    # SERIALIZATION
+    # ==========================================
+    @staticmethod
+    async def stream(rows: AsyncIterator[List[dict]], columns: List[str], fmt: ExportFormat) -> AsyncIterator[str]:
+        """Serializes batches of row dicts as CSV (with header) or NDJSON, one chunk per batch."""
+        if fmt == ExportFormat.CSV:
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+            writer.writeheader()
+            yield buffer.getvalue()
+            async for batch in rows:
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows({k: _cell(v) for k, v in row.items()} for row in batch)
+                yield buffer.getvalue()
+        else:
+            async for batch in rows:
+                yield "".join(
+                    json.dumps({column: _cell(row.get(column)) for column in columns}, ensure_ascii=False) + "\n"
+                    for row in batch
+                )
+
+    # ==========================================
+    # ROW SOURCES
+    # ==========================================
+    @staticmethod
+    async def session_rows(
+        start_date: datetime,
+        end_date: datetime,
+        statuses: Optional[List[SessionStatus]] = None
+    ) -> AsyncIterator[List[dict]]:
+        """Sessions starting in [start_date, end_date], oldest first."""
+        query = {"start_time": {"$gte": start_date, "$lte": end_date}}
+        if statuses:
+            query["status"] = {"$in": [s.value for s in statuses]}
+        cursor = TutorSession.get_motor_collection().find(
+            query,
+            {
+                "tutor": 1, "students": 1, "course": 1, "start_time": 1, "end_time": 1,
+                "status": 1, "mode": 1, "is_public": 1, "topic": 1, "cancelled_by": 1
+            }
+        ).sort([("start_time", 1), ("_id", 1)]).batch_size(EXPORT_BATCH_SIZE)
+
+        names = _NameResolver()
+        async for batch in _batches(cursor):
+            await names.load_tutors(doc["tutor"].id for doc in batch)
+            courses = await MasterDataCache.get_courses({doc["course"].id for doc in batch})
+            rows = []
+            for doc in batch:
+                course = courses.get(doc["course"].id)
+                rows.append({
+                    "session_id": doc["_id"],
+                    "start_time": doc["start_time"],
+                    "end_time": doc["end_time"],
+                    "duration_hours": round((doc["end_time"] - doc["start_time"]).total_seconds() / 3600, 2),
+                    "status": doc["status"],
+                    "mode": doc.get("mode"),
+                    "course_code": course.code if course else None,
+                    "course_name": course.name if course else None,
+                    "tutor_id": doc["tutor"].id,
+                    "tutor_name": names.tutors.get(doc["tutor"].id),
+                    "student_count": len(doc.get("students") or []),
+                    "is_public": doc.get("is_public", False),
+                    "topic": doc.get("topic"),
+                    "cancelled_by": doc.get("cancelled_by")
+                })
+            yield rows
+
+    @staticmethod
+    async def attendance_rows(start_date: datetime, end_date: datetime) -> AsyncIterator[List[dict]]:
+        """Check-ins recorded in [start_date, end_date], oldest first."""
+        cursor = AttendanceLog.get_motor_collection().find(
+            {"attended_at": {"$gte": start_date, "$lte": end_date}}
+        ).sort([("attended_at", 1), ("_id", 1)]).batch_size(EXPORT_BATCH_SIZE)
+
+        names = _NameResolver()
+        async for batch in _batches(cursor):
+            await names.load_tutors(doc["tutor_ref"].id for doc in batch)
+            await names.load_students(doc["student_ref"].id for doc in batch)
+            sessions = {
+                doc["_id"]: doc
+                async for doc in TutorSession.get_motor_collection().find(
+                    {"_id": {"$in": list({d["session_ref"].id for d in batch})}},
+                    {"start_time": 1, "course": 1}
+                )
+            }
+            courses = await MasterDataCache.get_courses({s["course"].id for s in sessions.values()})
+            rows = []
+            for doc in batch:
+                session = sessions.get(doc["session_ref"].id, {})
+                course = courses.get(session["course"].id) if session else None
+                student = names.students.get(doc["student_ref"].id, {})
+                rows.append({
+                    "attendance_id": doc["_id"],
+                    "attended_at": doc["attended_at"],
+                    "session_id": doc["session_ref"].id,
+                    "session_start": session.get("start_time"),
+                    "course_code": course.code if course else None,
+                    "student_id": doc["student_ref"].id,
+                    "student_name": student.get("name"),
+                    "student_email": student.get("email"),
+                    "tutor_id": doc["tutor_ref"].id,
+                    "tutor_name": names.tutors.get(doc["tutor_ref"].id)
+                })
+            yield rows
+
+    @staticmethod
+    async def feedback_rows(
+        start_date: datetime,
+        end_date: datetime,
+        statuses: Optional[List[FeedbackStatus]] = None
+    ) -> AsyncIterator[List[dict]]:
+        """Feedback records created in [start_date, end_date], oldest first."""
+        query = {"created_at": {"$gte": start_date, "$lte": end_date}}
+        if statuses:
+            query["status"] = {"$in": [s.value for s in statuses]}
+        cursor = SessionFeedback.get_motor_collection().find(query).sort(
+            [("created_at", 1), ("_id", 1)]
+        ).batch_size(EXPORT_BATCH_SIZE)
+
+        names = _NameResolver()
+        async for batch in _batches(cursor):
+            await names.load_tutors(doc["tutor"].id for doc in batch)
+            await names.load_students(doc["student"].id for doc in batch)
+            yield [
+                {
+                    "feedback_id": doc["_id"],
+                    "created_at": doc.get("created_at"),
+                    "updated_at": doc.get("updated_at"),
+                    "status": doc.get("status"),
+                    "rating": doc.get("rating"),
+                    "comment": doc.get("comment"),
+                    "session_id": doc["session"].id,
+                    "student_id": doc["student"].id,
+                    "student_name": names.students.get(doc["student"].id, {}).get("name"),
+                    "tutor_id": doc["tutor"].id,
+                    "tutor_name": names.tutors.get(doc["tutor"].id)
+                }
+                for doc in batch
+            ]
+
+    @staticmethod
+    async def workload_rows(start_date: datetime, end_date: datetime) -> AsyncIterator[List[dict]]:
+        """Daily workload rollup rows for the UTC days of [start_date, end_date]."""
+        cursor = WorkloadRollup.get_motor_collection().find(
+            {"day": {"$gte": utc_day(start_date), "$lte": utc_day(end_date)}, "sessions": {"$gt": 0}},
+            {"session_ids": 0}
+        ).sort([("day", 1), ("tutor_id", 1), ("course_id", 1)]).batch_size(EXPORT_BATCH_SIZE)
+
+        names = _NameResolver()
+        async for batch in _batches(cursor):
+            await names.load_tutors(doc["tutor_id"] for doc in batch)
+            courses = await MasterDataCache.get_courses({doc["course_id"] for doc in batch})
+            rows = []
+            for doc in batch:
+                course = courses.get(doc["course_id"])
+                faculty = await MasterDataCache.get_faculty(doc["faculty_id"]) if doc.get("faculty_id") else None
+                row = {
+                    "day": doc["day"].date().isoformat(),
+                    "tutor_id": doc["tutor_id"],
+                    "tutor_name": names.tutors.get(doc["tutor_id"]),
+                    "course_code": course.code if course else None,
+                    "faculty_code": faculty.code if faculty else None,
+                    "hours": round(doc.get("hours", 0.0), 2),
+                    "sessions": doc.get("sessions", 0)
+                }
+                for mode in LocationMode:
+                    row[f"sessions_{mode.value.lower()}"] = (doc.get("mode_sessions") or {}).get(mode.value, 0)
+                rows.append(row)
+            yield rows
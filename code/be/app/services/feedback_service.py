@@ -1,6 +1,10 @@
 from fastapi import HTTPException, status
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import List
+from beanie import Link
+from bson.dbref import DBRef
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 
 # Models
 from app.models.internal.user import User
@@ -16,6 +20,23 @@ from app.models.schemas.feedback import (
     ProgressCreateRequest, ProgressResponse
 )
 
+# Events
+from app.core.events import EventBus, EventType, FeedbacksFinalized
+
+# Services
+from app.services.master_data_cache import MasterDataCache
+
+# Max expired feedbacks finalized per round trip by the hourly job
+FINALIZE_BATCH_SIZE = 1000
+
+_DUPLICATE_KEY = 11000
+
+
+def _as_utc(value: datetime) -> datetime:
+    """MongoDB returns naive UTC datetimes; make them comparable with now(timezone.utc)."""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
 class FeedbackService:
 
     # ==========================================
@@ -24,16 +45,16 @@ class FeedbackService:
     @staticmethod
     async def _build_session_info(session: TutorSession) -> dict:
         """Build session info dict for response"""
-        await session.fetch_all_links()
-        
-        # After fetch_all_links, session.tutor is already TutorProfile, not Link
-        # But we need to fetch the nested user link
+        # Tutor -> User (callers may already have fetched the links)
         tutor_profile = session.tutor
-        await tutor_profile.fetch_link(tutor_profile.__class__.user)
+        if isinstance(tutor_profile, Link):
+            tutor_profile = await tutor_profile.fetch()
         tutor_user = tutor_profile.user
+        if isinstance(tutor_user, Link):
+            tutor_user = await tutor_user.fetch()
         
-        # Course is already fetched by fetch_all_links
-        course = session.course
+        # Course is master data: served from the process cache
+        course = await MasterDataCache.get_course(session.course)
         
         return {
             "id": str(session.id),
@@ -162,8 +183,8 @@ class FeedbackService:
             raise HTTPException(status.HTTP_404_NOT_FOUND, "Feedback not found")
         
         session_info = await FeedbackService._build_session_info(session)
-        now = datetime.now()
-        can_edit = feedback.status == FeedbackStatus.PENDING and now < feedback.feedback_deadline
+        now = datetime.now(timezone.utc)
+        can_edit = feedback.status == FeedbackStatus.PENDING and now < _as_utc(feedback.feedback_deadline)
         
         return FeedbackResponse(
             id=str(feedback.id),
@@ -213,8 +234,8 @@ class FeedbackService:
             raise HTTPException(status.HTTP_404_NOT_FOUND, "Feedback record not found. Should be auto-created when session completed.")
         
         # 3. Check deadline
-        now = datetime.now()
-        if now > feedback.feedback_deadline:
+        now = datetime.now(timezone.utc)
+        if now > _as_utc(feedback.feedback_deadline):
             raise HTTPException(status.HTTP_400_BAD_REQUEST, "Feedback deadline has passed (1 week after session end).")
         
         # 4. Update feedback (save changes, status remains PENDING until deadline)
@@ -225,11 +246,11 @@ class FeedbackService:
             feedback.comment = payload.comment
         
         # Keep status as PENDING - user can edit until deadline
-        feedback.updated_at = datetime.now()
+        feedback.updated_at = datetime.now(timezone.utc)
         await feedback.save()
 
         session_info = await FeedbackService._build_session_info(session)
-        can_edit = now < feedback.feedback_deadline
+        can_edit = now < _as_utc(feedback.feedback_deadline)
         
         return FeedbackResponse(
             id=str(feedback.id),
@@ -252,71 +273,126 @@ class FeedbackService:
         Auto-create feedback records when session becomes COMPLETED.
         Called by session service when marking session as completed.
         """
-        # Create one feedback record per student
-        for student_link in session.students:
-            student = await student_link.fetch()
-            
-            # Check if feedback already exists
-            existing = await SessionFeedback.find_one(
-                SessionFeedback.session.id == session.id,
-                SessionFeedback.student.id == student.id
-            )
-            
-            if not existing:
-                feedback = SessionFeedback(
-                    session=session,
-                    student=student,
-                    tutor=session.tutor,
-                    status=FeedbackStatus.PENDING,
-                    feedback_deadline=session.end_time + timedelta(days=7)
-                )
-                await feedback.save()
+        await FeedbackService.create_feedback_records_for_sessions([session])
+
+    @staticmethod
+    def _as_dbref(value, model) -> DBRef:
+        """DBRef for a Link or an already fetched Document (the stored form of Link fields)."""
+        if isinstance(value, Link):
+            return value.ref
+        return DBRef(model.Settings.name, value.id)
+
+    @staticmethod
+    async def create_feedback_records_for_sessions(sessions: List[TutorSession]) -> int:
+        """
+        Bulk variant: one PENDING feedback per (session, student) for many sessions.
+        Uses a single unordered bulk upsert keyed by (session, student), so existing
+        records are left untouched and re-running is safe. A concurrent run (manual
+        completion vs. the auto-complete job) that inserts the same pair first makes
+        the upsert hit the unique index; that pair is already done.
+
+        Returns:
+            Number of feedback records created
+        """
+        now = datetime.now(timezone.utc)
+        operations = []
+        for session in sessions:
+            session_ref = DBRef(TutorSession.Settings.name, session.id)
+            tutor_ref = FeedbackService._as_dbref(session.tutor, TutorProfile)
+            for student in session.students:
+                operations.append(UpdateOne(
+                    {"session": session_ref, "student": FeedbackService._as_dbref(student, StudentProfile)},
+                    {"$setOnInsert": {
+                        "tutor": tutor_ref,
+                        "rating": None,
+                        "comment": None,
+                        "status": FeedbackStatus.PENDING.value,
+                        "feedback_deadline": session.end_time + timedelta(days=7),
+                        "created_at": now,
+                        "updated_at": now
+                    }},
+                    upsert=True
+                ))
+
+        if not operations:
+            return 0
+        try:
+            result = await SessionFeedback.get_motor_collection().bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            if any(error["code"] != _DUPLICATE_KEY for error in e.details.get("writeErrors", [])):
+                raise
+            return e.details.get("nUpserted", 0)
+        return result.upserted_count
 
     # ==========================================
     # 5. AUTO-FINALIZE EXPIRED FEEDBACKS (Cron Job)
     # ==========================================
     @staticmethod
-    async def auto_skip_expired_feedbacks():
+    async def auto_skip_expired_feedbacks(batch_size: int = FINALIZE_BATCH_SIZE) -> int:
         """
         Finalize all PENDING feedbacks when deadline passed:
         - If has rating: Mark as SUBMITTED
         - If no rating: Mark as SKIPPED
-        - Recalculates stats for affected tutors
+        - Publishes the new ratings per tutor as FeedbacksFinalized events
+          (StatsProjector applies them to the tutors' stats)
         Should be called by a cron job hourly.
+
+        Set-based: per batch one id query, two update_many calls and one aggregation
+        over the rows this run finalized. Cost is proportional to the batch, not to
+        the tutors' history.
         """
-        now = datetime.now()
-        
-        expired_feedbacks = await SessionFeedback.find(
-            SessionFeedback.status == FeedbackStatus.PENDING,
-            SessionFeedback.feedback_deadline < now
-        ).to_list()
-        
-        if not expired_feedbacks:
-            return 0
-        
-        # Track tutors that need stats update
-        affected_tutors = set()
-        
+        # Run marker: rows finalized by this run carry exactly this updated_at
+        # (truncated to ms, the precision MongoDB stores)
+        now = datetime.now(timezone.utc)
+        now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+        collection = SessionFeedback.get_motor_collection()
+
         finalized_count = 0
-        for feedback in expired_feedbacks:
-            await feedback.fetch_all_links()
-            
-            # Mark as SUBMITTED or SKIPPED based on whether rating was provided
-            if feedback.rating is not None:
-                feedback.status = FeedbackStatus.SUBMITTED
-                affected_tutors.add(feedback.tutor.id)
-            else:
-                feedback.status = FeedbackStatus.SKIPPED
-            
-            feedback.updated_at = now
-            await feedback.save()
-            finalized_count += 1
-        
-        # Recalculate stats for all affected tutors
-        from app.services.tutor_service import TutorService
-        for tutor_id in affected_tutors:
-            await TutorService.recalculate_tutor_stats(tutor_id)
-        
+        batch_number = 0
+        while True:
+            # 1. Next batch of expired PENDING ids
+            ids = [doc["_id"] async for doc in collection.find(
+                {"status": FeedbackStatus.PENDING.value, "feedback_deadline": {"$lt": now}},
+                {"_id": 1}
+            ).limit(batch_size)]
+            if not ids:
+                break
+
+            # 2. Two set-based transitions (guarded on PENDING)
+            submitted = await collection.update_many(
+                {"_id": {"$in": ids}, "status": FeedbackStatus.PENDING.value, "rating": {"$ne": None}},
+                {"$set": {"status": FeedbackStatus.SUBMITTED.value, "updated_at": now}}
+            )
+            skipped = await collection.update_many(
+                {"_id": {"$in": ids}, "status": FeedbackStatus.PENDING.value, "rating": None},
+                {"$set": {"status": FeedbackStatus.SKIPPED.value, "updated_at": now}}
+            )
+            finalized_count += submitted.modified_count + skipped.modified_count
+            batch_number += 1
+
+            # 3. Per-tutor deltas over the rows this run just submitted
+            if submitted.modified_count:
+                deltas = await collection.aggregate([
+                    {"$match": {
+                        "_id": {"$in": ids},
+                        "status": FeedbackStatus.SUBMITTED.value,
+                        "updated_at": now
+                    }},
+                    {"$group": {"_id": "$tutor", "count": {"$sum": 1}, "rating_sum": {"$sum": "$rating"}}}
+                ]).to_list(None)
+                await EventBus.publish(*[
+                    FeedbacksFinalized(
+                        event_id=f"{EventType.FEEDBACKS_FINALIZED.value}:{delta['_id'].id}:{now.isoformat()}:{batch_number}",
+                        tutor_id=delta["_id"].id,
+                        count=delta["count"],
+                        rating_sum=delta["rating_sum"]
+                    )
+                    for delta in deltas
+                ])
+
+            if len(ids) < batch_size:
+                break
+
         return finalized_count
 
     # ==========================================
@@ -410,13 +486,7 @@ class FeedbackService:
             attachment_urls=payload.attachment_urls
         )
         await progress.save()
-        
-        # 4. Update Stats (Count total sessions taught - FR-RPT)
-        tutor_profile.stats.total_sessions = tutor_profile.stats.total_sessions + 1
-        num_students_in_session = len(session.students)
-        tutor_profile.stats.total_students = tutor_profile.stats.total_students + num_students_in_session
-        
-        await tutor_profile.save()
+        # Tutor stats were already counted when the session completed (SessionCompleted event)
 
         return ProgressResponse(
             id=str(progress.id),
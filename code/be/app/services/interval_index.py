@@ -0,0 +1,303 @@
+import asyncio
+import time
+from bisect import bisect_left
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set, Tuple
+
+from beanie import PydanticObjectId
+
+# Models
+from app.models.internal.availability import AvailabilitySlot
+from app.models.internal.session import TutorSession, SessionStatus
+
+
+# Session states that block a tutor's time (same set used by the overlap check)
+ACTIVE_SESSION_STATUSES = [
+    SessionStatus.CONFIRMED,
+    SessionStatus.WAITING_FOR_TUTOR,
+    SessionStatus.WAITING_FOR_STUDENT
+]
+
+
+# A timeline is reloaded from MongoDB when older than this, so writes that bypass
+# this process (other workers, scripts) are picked up within the interval
+REFRESH_INTERVAL_SECONDS = 60
+
+# Timelines kept in memory; the least recently loaded one is dropped beyond this
+MAX_TIMELINES = 5000
+
+
+def _to_naive_utc(value: datetime) -> datetime:
+    """MongoDB returns naive UTC datetimes; normalize aware payload values to the same form."""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class _IntervalSet:
+    """
+    Static interval tree over a sorted array.
+    Intervals are kept sorted by start time, with a max-heap-shaped segment tree
+    holding the maximum end time of every range. An overlap query bisects to
+    the intervals starting before `end` and descends the tree, skipping every
+    subtree whose maximum end is not after `start`: O(log n) to decide whether
+    anything overlaps, O(log n + k) to report k overlaps. Writes only mark the
+    set dirty; the first query after one rebuilds the arrays and the tree in
+    O(n log n), so a write followed by a check is not logarithmic. n is a
+    single tutor's slots or active sessions, and checks (check_many, booking
+    retries) far outnumber writes.
+    """
+
+    def __init__(self):
+        self._items: Dict[PydanticObjectId, Tuple[datetime, datetime]] = {}
+        self._dirty = True
+        self._starts: List[datetime] = []
+        self._entries: List[Tuple[datetime, datetime, PydanticObjectId]] = []
+        self._size = 1
+        self._max_end: List[Optional[datetime]] = [None]
+
+    def __contains__(self, item_id: PydanticObjectId) -> bool:
+        return item_id in self._items
+
+    def put(self, item_id: PydanticObjectId, start: datetime, end: datetime):
+        self._items[item_id] = (_to_naive_utc(start), _to_naive_utc(end))
+        self._dirty = True
+
+    def discard(self, item_id: PydanticObjectId):
+        if self._items.pop(item_id, None) is not None:
+            self._dirty = True
+
+    def _rebuild(self):
+        self._entries = sorted((s, e, i) for i, (s, e) in self._items.items())
+        self._starts = [s for s, _, _ in self._entries]
+
+        # Leaves at [size, size + n); node j covers its children 2j and 2j + 1
+        size = 1
+        while size < len(self._entries):
+            size *= 2
+        tree: List[Optional[datetime]] = [None] * (2 * size)
+        for index, (_, e, _) in enumerate(self._entries):
+            tree[size + index] = e
+        for j in range(size - 1, 0, -1):
+            left, right = tree[2 * j], tree[2 * j + 1]
+            tree[j] = left if right is None or (left is not None and left > right) else right
+        self._size, self._max_end = size, tree
+        self._dirty = False
+
+    def overlapping(
+        self,
+        start: datetime,
+        end: datetime,
+        exclude_id: Optional[PydanticObjectId] = None
+    ) -> List[PydanticObjectId]:
+        """Returns ids of intervals with item.start < end and item.end > start."""
+        if self._dirty:
+            self._rebuild()
+
+        start, end = _to_naive_utc(start), _to_naive_utc(end)
+
+        # Only intervals starting before `end` (leaves [0, k)) can overlap
+        k = bisect_left(self._starts, end)
+        if k == 0:
+            return []
+
+        size, tree = self._size, self._max_end
+        result = []
+        # (node, first leaf, one past last leaf) of subtrees intersecting [0, k)
+        stack = [(1, 0, size)]
+        while stack:
+            node, lo, hi = stack.pop()
+            max_end = tree[node]
+            if max_end is None or max_end <= start:
+                continue  # Nothing in this subtree reaches past `start`
+            if node >= size:
+                item_id = self._entries[lo][2]
+                if item_id != exclude_id:
+                    result.append(item_id)
+                continue
+            # Only the subtrees on the path to leaf k straddle the boundary
+            mid = (lo + hi) // 2
+            if mid < k:
+                stack.append((2 * node + 1, mid, hi))
+            stack.append((2 * node, lo, mid))
+        return result
+
+
+class _TutorTimeline:
+    """Availability slots and active sessions of one tutor."""
+
+    def __init__(self):
+        self.slots = _IntervalSet()
+        self.sessions = _IntervalSet()
+        self.loaded = asyncio.Event()
+        self.loaded_at: Optional[float] = None
+        # Set when the initial load failed; re-raised to every waiter
+        self.load_error: Optional[BaseException] = None
+        # Ids removed while the initial load was in flight (must not be resurrected by it)
+        self.tombstones: Set[PydanticObjectId] = set()
+
+
+class TutorIntervalIndex:
+    """
+    In-process per-tutor index of busy time (availability slots + active sessions).
+
+    A tutor's timeline is loaded from MongoDB on first use (two queries) and then
+    kept coherent by ScheduleService on every slot create/split/delete and every
+    session status or time change, so overlap checks are answered from memory.
+    The index is per process: writes made by other workers or scripts are only
+    seen after the timeline is reloaded, at most REFRESH_INTERVAL_SECONDS after
+    its last load (call invalidate() after out-of-band writes to reload at once).
+    At most MAX_TIMELINES tutors are kept; the least recently loaded is dropped.
+    """
+
+    _timelines: Dict[PydanticObjectId, _TutorTimeline] = {}
+
+    # ==========================================
+    # LOADING & INVALIDATION
+    # ==========================================
+    @staticmethod
+    async def _get_timeline(tutor_id: PydanticObjectId) -> _TutorTimeline:
+        """
+        Returns the tutor's timeline, loading it from the database the first time
+        (and again once it is older than REFRESH_INTERVAL_SECONDS).
+
+        Raises:
+            The database error of a failed load, to the loader and every waiter
+        """
+        timelines = TutorIntervalIndex._timelines
+        while True:
+            timeline = timelines.get(tutor_id)
+            if timeline is None:
+                break
+            if timeline.loaded.is_set() and time.monotonic() - timeline.loaded_at >= REFRESH_INTERVAL_SECONDS:
+                timelines.pop(tutor_id, None)
+                break
+
+            await timeline.loaded.wait()
+            if timeline.load_error is not None:
+                raise timeline.load_error
+            if timelines.get(tutor_id) is timeline:
+                return timeline
+            # Invalidated while loading: its content may be stale, use a fresh one
+
+        # Register before querying so concurrent writes land in the same timeline
+        if len(timelines) >= MAX_TIMELINES:
+            timelines.pop(next(iter(timelines)))
+        timeline = _TutorTimeline()
+        timelines[tutor_id] = timeline
+        try:
+            slots = await AvailabilitySlot.find(
+                AvailabilitySlot.tutor.id == tutor_id
+            ).to_list()
+            sessions = await TutorSession.find(
+                {"tutor.$id": tutor_id, "status": {"$in": [s.value for s in ACTIVE_SESSION_STATUSES]}}
+            ).to_list()
+        except Exception as e:
+            if timelines.get(tutor_id) is timeline:
+                del timelines[tutor_id]
+            timeline.load_error = e
+            timeline.loaded.set()
+            raise
+
+        # Writes applied during the load are newer than what the queries returned
+        for slot in slots:
+            if slot.id not in timeline.slots and slot.id not in timeline.tombstones:
+                timeline.slots.put(slot.id, slot.start_time, slot.end_time)
+        for session in sessions:
+            if session.id not in timeline.sessions and session.id not in timeline.tombstones:
+                timeline.sessions.put(session.id, session.start_time, session.end_time)
+        timeline.tombstones.clear()
+        timeline.loaded_at = time.monotonic()
+        timeline.loaded.set()
+        return timeline
+
+    @staticmethod
+    def invalidate(tutor_id: Optional[PydanticObjectId] = None):
+        """Drops one tutor's timeline (or all of them) so it is reloaded on next use."""
+        if tutor_id is None:
+            TutorIntervalIndex._timelines.clear()
+        else:
+            TutorIntervalIndex._timelines.pop(tutor_id, None)
+
+    # ==========================================
+    # WRITE-THROUGH MAINTENANCE
+    # ==========================================
+    @staticmethod
+    def add_slot(tutor_id: PydanticObjectId, slot: AvailabilitySlot):
+        timeline = TutorIntervalIndex._timelines.get(tutor_id)
+        if timeline is not None:
+            timeline.slots.put(slot.id, slot.start_time, slot.end_time)
+
+    @staticmethod
+    def remove_slot(tutor_id: PydanticObjectId, slot_id: PydanticObjectId):
+        timeline = TutorIntervalIndex._timelines.get(tutor_id)
+        if timeline is not None:
+            timeline.slots.discard(slot_id)
+            if not timeline.loaded.is_set():
+                timeline.tombstones.add(slot_id)
+
+    @staticmethod
+    def sync_session(tutor_id: PydanticObjectId, session: TutorSession):
+        """Adds/updates the session if it blocks the tutor's time, removes it otherwise."""
+        if session.status not in ACTIVE_SESSION_STATUSES:
+            TutorIntervalIndex.remove_session(tutor_id, session.id)
+            return
+        timeline = TutorIntervalIndex._timelines.get(tutor_id)
+        if timeline is not None:
+            timeline.sessions.put(session.id, session.start_time, session.end_time)
+
+    @staticmethod
+    def remove_session(tutor_id: PydanticObjectId, session_id: PydanticObjectId):
+        """Removes a session that no longer blocks time (e.g. bulk status updates)."""
+        timeline = TutorIntervalIndex._timelines.get(tutor_id)
+        if timeline is not None:
+            timeline.sessions.discard(session_id)
+            if not timeline.loaded.is_set():
+                timeline.tombstones.add(session_id)
+
+    # ==========================================
+    # QUERIES
+    # ==========================================
+    @staticmethod
+    async def find_overlapping_slots(
+        tutor_id: PydanticObjectId,
+        start: datetime,
+        end: datetime,
+        exclude_slot_id: Optional[PydanticObjectId] = None
+    ) -> List[PydanticObjectId]:
+        """Returns ids of the tutor's availability slots overlapping [start, end)."""
+        timeline = await TutorIntervalIndex._get_timeline(tutor_id)
+        return timeline.slots.overlapping(start, end, exclude_slot_id)
+
+    @staticmethod
+    async def find_overlapping_sessions(
+        tutor_id: PydanticObjectId,
+        start: datetime,
+        end: datetime,
+        exclude_session_id: Optional[PydanticObjectId] = None
+    ) -> List[PydanticObjectId]:
+        """Returns ids of the tutor's active sessions overlapping [start, end)."""
+        timeline = await TutorIntervalIndex._get_timeline(tutor_id)
+        return timeline.sessions.overlapping(start, end, exclude_session_id)
+
+    @staticmethod
+    async def check_many(
+        tutor_id: PydanticObjectId,
+        intervals: List[Tuple[datetime, datetime]]
+    ) -> List[Optional[str]]:
+        """
+        Checks many candidate intervals against the tutor's timeline at once.
+
+        Returns:
+            One entry per interval: "slot", "session" or None if the interval is free
+        """
+        timeline = await TutorIntervalIndex._get_timeline(tutor_id)
+        results = []
+        for start, end in intervals:
+            if timeline.slots.overlapping(start, end):
+                results.append("slot")
+            elif timeline.sessions.overlapping(start, end):
+                results.append("session")
+            else:
+                results.append(None)
+        return results
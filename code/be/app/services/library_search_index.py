@@ -0,0 +1,274 @@
+import asyncio
+import heapq
+import math
+import re
+import time
+import unicodedata
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from beanie import PydanticObjectId, Link
+
+# Models
+from app.models.internal.library import LibraryResource, AccessLevel, ResourceType
+
+# Services
+from app.services.course_search_index import normalize_text
+
+
+# Rebuild the index when it is older than this, so resources written by other
+# workers become searchable (this worker's writes are applied immediately)
+REFRESH_INTERVAL_SECONDS = 300
+
+# Searchable fields and their weight in the term frequency (BM25F-style)
+FIELD_WEIGHTS = {"title": 3.0, "author": 2.0, "description": 1.0, "content": 1.0}
+
+# BM25 parameters (usual defaults)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Characters of context on each side of the first match in a highlight snippet
+SNIPPET_RADIUS = 60
+
+# Highlights returned per hit
+MAX_HIGHLIGHTS = 2
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def fold_aligned(text: str) -> str:
+    """
+    Diacritic-folded, lowercased copy of `text` with the same length, so match
+    positions in the folded text are positions in the original
+    ("Câu hỏi" -> "cau hoi"). Same folding as normalize_text, char by char.
+    """
+    folded = []
+    for ch in text:
+        if ch in ("đ", "Đ"):
+            folded.append("d")
+            continue
+        base = "".join(c for c in unicodedata.normalize("NFD", ch) if unicodedata.category(c) != "Mn").lower()
+        folded.append(base[0] if len(base) == 1 and base.isascii() and base.isalnum() else " ")
+    return "".join(folded)
+
+
+class _ResourceEntry:
+    __slots__ = (
+        "id", "uploader_id", "is_public", "access_level", "resource_type",
+        "department", "created_at", "fields", "term_freqs", "length"
+    )
+
+    def __init__(
+        self,
+        resource_id: PydanticObjectId,
+        uploader_id: PydanticObjectId,
+        is_public: bool,
+        access_level: AccessLevel,
+        resource_type: ResourceType,
+        department: Optional[str],
+        created_at: Optional[datetime],
+        fields: Dict[str, Optional[str]]
+    ):
+        self.id = resource_id
+        self.uploader_id = uploader_id
+        self.is_public = is_public
+        self.access_level = access_level
+        self.resource_type = resource_type
+        self.department = department
+        # MongoDB returns naive UTC datetimes, new documents carry aware ones
+        if created_at is not None and created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        self.created_at = created_at
+        self.fields: Dict[str, str] = {f: fields.get(f) or "" for f in FIELD_WEIGHTS}
+
+        # Weighted term frequencies over all fields; length is the weighted token count
+        self.term_freqs: Dict[str, float] = {}
+        self.length = 0.0
+        for field, weight in FIELD_WEIGHTS.items():
+            counts = Counter(_TOKEN.findall(fold_aligned(self.fields[field])))
+            for term, count in counts.items():
+                self.term_freqs[term] = self.term_freqs.get(term, 0.0) + weight * count
+            self.length += weight * sum(counts.values())
+
+    @classmethod
+    def from_raw(cls, doc: dict) -> "_ResourceEntry":
+        """Entry from a raw library_resources document (uploader stored as DBRef)."""
+        return cls(
+            doc["_id"],
+            doc["uploader"].id,
+            doc.get("is_public", False),
+            AccessLevel(doc.get("access_level", AccessLevel.PUBLIC.value)),
+            ResourceType(doc["resource_type"]),
+            doc.get("department"),
+            doc.get("created_at"),
+            doc
+        )
+
+    @classmethod
+    def from_resource(cls, resource: LibraryResource) -> "_ResourceEntry":
+        return cls(
+            resource.id,
+            resource.uploader.ref.id if isinstance(resource.uploader, Link) else resource.uploader.id,
+            resource.is_public,
+            resource.access_level,
+            resource.resource_type,
+            resource.department,
+            resource.created_at,
+            {f: getattr(resource, f) for f in FIELD_WEIGHTS}
+        )
+
+
+class LibrarySearchIndex:
+    """
+    In-memory BM25 full-text index over library resources (title, author,
+    description and the text content of question banks).
+
+    Built once at startup (lifespan); create_resource/delete_resource update it
+    incrementally, and it is rebuilt when older than REFRESH_INTERVAL_SECONDS.
+    Text is diacritic-folded on both sides ("cau truc du lieu" finds
+    "Cấu trúc dữ liệu"). The caller passes an access predicate, so hits are
+    filtered before ranking and pages only contain readable resources.
+    """
+
+    _entries: Dict[PydanticObjectId, _ResourceEntry] = {}
+    _postings: Dict[str, Dict[PydanticObjectId, float]] = {}
+    _total_length = 0.0
+    _loaded_at: Optional[float] = None
+    _lock = asyncio.Lock()
+
+    # ==========================================
+    # LOADING & UPDATES
+    # ==========================================
+    @staticmethod
+    async def load():
+        """(Re)builds the index from the library_resources collection."""
+        projection = {"uploader": 1, "is_public": 1, "access_level": 1, "resource_type": 1,
+                      "department": 1, "created_at": 1, **{f: 1 for f in FIELD_WEIGHTS}}
+        entries: Dict[PydanticObjectId, _ResourceEntry] = {}
+        async for doc in LibraryResource.get_motor_collection().find({}, projection):
+            entries[doc["_id"]] = _ResourceEntry.from_raw(doc)
+
+        postings: Dict[str, Dict[PydanticObjectId, float]] = {}
+        for entry in entries.values():
+            for term, tf in entry.term_freqs.items():
+                postings.setdefault(term, {})[entry.id] = tf
+
+        # Swap in one step so concurrent searches see either the old or the new index
+        LibrarySearchIndex._entries, LibrarySearchIndex._postings = entries, postings
+        LibrarySearchIndex._total_length = sum(e.length for e in entries.values())
+        LibrarySearchIndex._loaded_at = time.monotonic()
+
+    @staticmethod
+    def add(resource: LibraryResource):
+        """Indexes a new or changed resource (call after it was saved)."""
+        LibrarySearchIndex.remove(resource.id)
+        entry = _ResourceEntry.from_resource(resource)
+        LibrarySearchIndex._entries[entry.id] = entry
+        for term, tf in entry.term_freqs.items():
+            LibrarySearchIndex._postings.setdefault(term, {})[entry.id] = tf
+        LibrarySearchIndex._total_length += entry.length
+
+    @staticmethod
+    def remove(resource_id: PydanticObjectId):
+        """Drops a resource from the index (no-op if it is not indexed)."""
+        entry = LibrarySearchIndex._entries.pop(resource_id, None)
+        if entry is None:
+            return
+        for term in entry.term_freqs:
+            posting = LibrarySearchIndex._postings.get(term)
+            if posting is not None:
+                posting.pop(resource_id, None)
+                if not posting:
+                    del LibrarySearchIndex._postings[term]
+        LibrarySearchIndex._total_length -= entry.length
+
+    @staticmethod
+    async def _ensure_fresh():
+        loaded_at = LibrarySearchIndex._loaded_at
+        if loaded_at is not None and time.monotonic() - loaded_at < REFRESH_INTERVAL_SECONDS:
+            return
+        async with LibrarySearchIndex._lock:
+            # Another request may have rebuilt it while we waited
+            loaded_at = LibrarySearchIndex._loaded_at
+            if loaded_at is None or time.monotonic() - loaded_at >= REFRESH_INTERVAL_SECONDS:
+                await LibrarySearchIndex.load()
+
+    # ==========================================
+    # SEARCH
+    # ==========================================
+    @staticmethod
+    async def search(
+        query: str,
+        accept: Callable[[_ResourceEntry], bool],
+        limit: int = 20,
+        offset: int = 0
+    ) -> Tuple[List[Tuple[PydanticObjectId, float, List[dict]]], int]:
+        """
+        Ranks the accepted resources matching any query term by BM25 score
+        (ties: newest first).
+
+        Returns:
+            Tuple of ([(resource_id, score, highlights)] for the requested page,
+            total number of accepted matches)
+        """
+        await LibrarySearchIndex._ensure_fresh()
+
+        terms = list(dict.fromkeys(normalize_text(query).split()))
+        entries = LibrarySearchIndex._entries
+        if not terms or not entries:
+            return [], 0
+
+        doc_count = len(entries)
+        avg_length = (LibrarySearchIndex._total_length / doc_count) or 1.0
+        scores: Dict[PydanticObjectId, float] = {}
+        for term in terms:
+            posting = LibrarySearchIndex._postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + (doc_count - len(posting) + 0.5) / (len(posting) + 0.5))
+            for resource_id, tf in posting.items():
+                entry = entries[resource_id]
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * entry.length / avg_length)
+                scores[resource_id] = scores.get(resource_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        accepted = [resource_id for resource_id in scores if accept(entries[resource_id])]
+        page = heapq.nsmallest(
+            offset + limit,
+            accepted,
+            key=lambda i: (-scores[i], -entries[i].created_at.timestamp() if entries[i].created_at else 0)
+        )[offset:]
+        return [
+            (resource_id, round(scores[resource_id], 4), LibrarySearchIndex._highlights(entries[resource_id], terms))
+            for resource_id in page
+        ], len(accepted)
+
+    @staticmethod
+    def _highlights(entry: _ResourceEntry, terms: List[str]) -> List[dict]:
+        """
+        Snippets of the original text around the first match of each matching
+        field, with the [start, end) offsets of every matched word in the snippet.
+        """
+        wanted = set(terms)
+        highlights = []
+        for field in ("title", "description", "content", "author"):
+            text = entry.fields[field]
+            if not text:
+                continue
+            matches = [m.span() for m in _TOKEN.finditer(fold_aligned(text)) if m.group() in wanted]
+            if not matches:
+                continue
+
+            start = max(0, matches[0][0] - SNIPPET_RADIUS)
+            end = min(len(text), matches[0][1] + SNIPPET_RADIUS)
+            highlights.append({
+                "field": field,
+                "snippet": ("…" if start > 0 else "") + text[start:end] + ("…" if end < len(text) else ""),
+                "matches": [
+                    [s - start + (1 if start > 0 else 0), e - start + (1 if start > 0 else 0)]
+                    for s, e in matches if s >= start and e <= end
+                ]
+            })
+            if len(highlights) >= MAX_HIGHLIGHTS:
+                break
+        return highlights
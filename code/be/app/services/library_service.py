@@ -1,5 +1,8 @@
-from typing import List, Optional
+import base64
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
 from fastapi import UploadFile, HTTPException, status
+from beanie import PydanticObjectId
 
 # Models
 from app.models.internal.user import User
@@ -11,13 +14,18 @@ from app.models.enums.role import UserRole
 from app.models.schemas.library import (
     ResourceUploadResponse,
     ResourceResponse,
-    ResourceAttachResponse
+    ResourceAttachResponse,
+    ResourceSearchResult
 )
 
 # Services
 from app.services.storage_service import StorageService
+from app.services.library_search_index import LibrarySearchIndex
 
 
+# Page size of get_resource_list when a cursor is passed without a limit
+RESOURCE_PAGE_SIZE = 50
+
 class LibraryService:
     """
     Service for managing library resources.
@@ -113,6 +121,7 @@ class LibraryService:
             source=source
         )
         await resource.save()
+        LibrarySearchIndex.add(resource)
         
         # 6. Return response
         return ResourceUploadResponse(
@@ -143,6 +152,68 @@ class LibraryService:
             return "ALLOWED"
         return "RESTRICTED"
 
+    @staticmethod
+    def _access_filter(user: User) -> dict:
+        """
+        MongoDB filter matching the resources a user can access; the query-side
+        form of _can_user_access_resource (keep both in sync).
+        Each $or branch is served by its own index: uploader -> (uploader.$id,
+        created_at), is_public -> (is_public, resource_type), access_level ->
+        (access_level, department).
+        """
+        # Admin always has access
+        if UserRole.ADMIN in user.roles:
+            return {}
+        
+        # Owner and public resources for everyone; department/tutor-only for tutors and dept chairs
+        levels = [AccessLevel.PUBLIC.value]
+        if UserRole.TUTOR in user.roles or UserRole.DEPT_CHAIR in user.roles:
+            levels += [AccessLevel.DEPARTMENT_ONLY.value, AccessLevel.TUTOR_ONLY.value]
+        
+        return {"$or": [
+            {"uploader.$id": user.id},
+            {"is_public": True},
+            {"access_level": {"$in": levels}}
+        ]}
+
+    @staticmethod
+    def _access_predicate(user: User) -> Callable:
+        """
+        In-memory form of _access_filter for search index entries (entries carry
+        uploader_id, is_public and access_level).
+        """
+        if UserRole.ADMIN in user.roles:
+            return lambda entry: True
+        
+        levels = {AccessLevel.PUBLIC}
+        if UserRole.TUTOR in user.roles or UserRole.DEPT_CHAIR in user.roles:
+            levels |= {AccessLevel.DEPARTMENT_ONLY, AccessLevel.TUTOR_ONLY}
+        return lambda entry: entry.uploader_id == user.id or entry.is_public or entry.access_level in levels
+
+    @staticmethod
+    def _encode_resource_cursor(resource: LibraryResource) -> str:
+        """Encodes the (created_at, _id) keyset position of a resource as an opaque cursor."""
+        raw = f"{resource.created_at.isoformat()}|{resource.id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def _decode_resource_cursor(cursor: str) -> Tuple[datetime, PydanticObjectId]:
+        """
+        Decodes a cursor produced by _encode_resource_cursor.
+        
+        Raises:
+            HTTPException: If the cursor is malformed
+        """
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            created_raw, id_raw = base64.urlsafe_b64decode(padded.encode()).decode().split("|", 1)
+            return datetime.fromisoformat(created_raw), PydanticObjectId(id_raw)
+        except Exception:
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST,
+                "Invalid pagination cursor"
+            )
+
     @staticmethod
     def _can_user_access_resource(resource: LibraryResource, user: User) -> bool:
         """
@@ -186,87 +257,213 @@ class LibraryService:
     async def get_resource_list(
         user: User,
         resource_type: Optional[ResourceType] = None,
-        department: Optional[str] = None
-    ) -> List[ResourceResponse]:
+        department: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[ResourceResponse], Optional[str]]:
         """
-        Retrieves all resources accessible to the user.
-        Implements access control based on access_level.
+        Retrieves one page of the resources accessible to the user, newest first.
+        Access control is part of the query (_access_filter), pagination is
+        keyset on (created_at, _id), and uploaders are resolved with one $in
+        query per page.
         
         Args:
             user: The authenticated user
             resource_type: Optional filter by resource type
             department: Optional filter by department
+            limit: Maximum number of resources in the page (None: all resources,
+                or RESOURCE_PAGE_SIZE when a cursor is given)
+            cursor: Opaque cursor returned by the previous page
             
         Returns:
-            List of ResourceResponse objects (filtered by access control)
+            Tuple of (ResourceResponse objects, next page cursor or None)
         """
-        # Build query
-        query_filter = {}
+        # Build query: access control first, then the optional filters
+        conditions = []
+        access_filter = LibraryService._access_filter(user)
+        if access_filter:
+            conditions.append(access_filter)
         
         if resource_type:
-            query_filter["resource_type"] = resource_type
+            conditions.append({"resource_type": resource_type.value})
         
         if department:
-            query_filter["department"] = department
-        
-        # Fetch all resources matching the filter
-        resources = await LibraryResource.find(query_filter).sort("-created_at").to_list()
+            conditions.append({"department": department})
+        
+        # Keyset condition: strictly after the cursor position in (-created_at, -_id) order
+        if cursor:
+            cursor_created, cursor_id = LibraryService._decode_resource_cursor(cursor)
+            conditions.append({"$or": [
+                {"created_at": {"$lt": cursor_created}},
+                {"created_at": cursor_created, "_id": {"$lt": cursor_id}}
+            ]})
+        
+        query_filter = {"$and": conditions} if conditions else {}
+        
+        next_cursor = None
+        if limit is None and not cursor:
+            # Unpaginated (legacy callers): every accessible resource in one response
+            resources = await LibraryResource.find(query_filter).sort(
+                [("created_at", -1), ("_id", -1)]
+            ).to_list()
+        else:
+            limit = limit or RESOURCE_PAGE_SIZE
+            # Fetch one extra row to know whether another page exists
+            resources = await LibraryResource.find(query_filter).sort(
+                [("created_at", -1), ("_id", -1)]
+            ).limit(limit + 1).to_list()
+        
+        if limit is not None and len(resources) > limit:
+            resources = resources[:limit]
+            next_cursor = LibraryService._encode_resource_cursor(resources[-1])
+        
+        # Uploader names for the whole page (one query)
+        uploader_names = await LibraryService._uploader_names(resources)
+        
+        # Map to response objects (every resource in the page is accessible)
+        response_list = [
+            LibraryService._to_response(resource, uploader_names.get(resource.uploader.ref.id, ""))
+            for resource in resources
+        ]
+        
+        return response_list, next_cursor
+
+    @staticmethod
+    async def search_resources(
+        user: User,
+        query: str,
+        resource_type: Optional[ResourceType] = None,
+        department: Optional[str] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[ResourceSearchResult], Optional[str]]:
+        """
+        Full-text search over title, author, description and question-bank
+        content (LibrarySearchIndex, BM25 ranking, Vietnamese diacritics folded).
+        Only resources the user can access are ranked and returned.
         
-        # Map to response objects with access control
-        response_list = []
-        for resource in resources:
-            # Fetch uploader info
-            await resource.fetch_link(LibraryResource.uploader)
-            
-            # Check if user has access to this resource
-            has_access = LibraryService._can_user_access_resource(resource, user)
-            
-            # Determine frontend access status
-            access_status = LibraryService._map_access_level_to_frontend(
-                resource.access_level, 
-                resource.is_public
-            )
-            
-            # Map resource type for frontend compatibility
-            # Convert "QUESTION_BANK" to "Question Bank"
-            display_type = resource.resource_type.value
-            if display_type == "QUESTION_BANK":
-                display_type = "Question Bank"
-            elif display_type == "VIDEO":
-                display_type = "Video"
+        Args:
+            user: The authenticated user
+            query: Search text
+            resource_type: Optional filter by resource type
+            department: Optional filter by department
+            limit: Maximum number of results in the page
+            cursor: Opaque cursor returned by the previous page
             
-            # Map source for frontend compatibility
-            display_source = resource.source.value
-            if display_source == "TUTOR_UPLOADED":
-                display_source = "Tutor Uploaded"
-            elif display_source == "HCMUT_LIBRARY":
-                display_source = "HCMUT_LIBRARY"
-            elif display_source == "ADMIN_UPLOADED":
-                display_source = "Tutor Uploaded"  # Show as tutor uploaded
+        Returns:
+            Tuple of (results best first, next page cursor or None)
             
-            response_list.append(
-                ResourceResponse(
-                    id=str(resource.id),
-                    title=resource.title,
-                    description=resource.description,
-                    resource_type=display_type,
-                    external_url=resource.external_url,
-                    link=resource.external_url if has_access else None,  # Only provide link if accessible
-                    uploader_id=str(resource.uploader.id),
-                    uploader_name=resource.uploader.full_name,
-                    author=resource.author,
-                    is_public=resource.is_public,
-                    access_level=resource.access_level.value,
-                    access=access_status,
-                    department=resource.department,
-                    source=display_source,
-                    file_size=resource.file_size,
-                    content=resource.content if has_access else None,
-                    created_at=resource.created_at
+        Raises:
+            HTTPException: If the cursor is malformed
+        """
+        offset = 0
+        if cursor:
+            try:
+                offset = int(cursor)
+                if offset < 0:
+                    raise ValueError(cursor)
+            except ValueError:
+                raise HTTPException(
+                    status.HTTP_400_BAD_REQUEST,
+                    "Invalid pagination cursor"
                 )
+        
+        can_access = LibraryService._access_predicate(user)
+        
+        def accept(entry) -> bool:
+            if resource_type and entry.resource_type != resource_type:
+                return False
+            if department and entry.department != department:
+                return False
+            return can_access(entry)
+        
+        hits, total = await LibrarySearchIndex.search(query, accept, limit=limit, offset=offset)
+        next_cursor = str(offset + limit) if offset + limit < total else None
+        if not hits:
+            return [], next_cursor
+        
+        # Resource documents and uploader names for the page (one query each)
+        resources = {
+            resource.id: resource
+            for resource in await LibraryResource.find(
+                {"_id": {"$in": [resource_id for resource_id, _, _ in hits]}}
+            ).to_list()
+        }
+        uploader_names = await LibraryService._uploader_names(resources.values())
+        
+        results = []
+        for resource_id, score, highlights in hits:
+            resource = resources.get(resource_id)
+            if resource is None:
+                # Deleted by another worker since the index was built
+                continue
+            results.append(ResourceSearchResult(
+                resource=LibraryService._to_response(
+                    resource, uploader_names.get(resource.uploader.ref.id, "")
+                ),
+                score=score,
+                highlights=highlights
+            ))
+        return results, next_cursor
+
+    @staticmethod
+    async def _uploader_names(resources) -> dict:
+        """Resolves the uploader names of the given resources with one $in query."""
+        uploader_ids = list({resource.uploader.ref.id for resource in resources})
+        if not uploader_ids:
+            return {}
+        return {
+            doc["_id"]: doc.get("full_name", "")
+            async for doc in User.get_motor_collection().find(
+                {"_id": {"$in": uploader_ids}}, {"full_name": 1}
             )
+        }
+
+    @staticmethod
+    def _to_response(resource: LibraryResource, uploader_name: str) -> ResourceResponse:
+        """Maps an accessible LibraryResource to the frontend ResourceResponse."""
+        # Determine frontend access status
+        access_status = LibraryService._map_access_level_to_frontend(
+            resource.access_level, 
+            resource.is_public
+        )
         
-        return response_list
+        # Map resource type for frontend compatibility
+        # Convert "QUESTION_BANK" to "Question Bank"
+        display_type = resource.resource_type.value
+        if display_type == "QUESTION_BANK":
+            display_type = "Question Bank"
+        elif display_type == "VIDEO":
+            display_type = "Video"
+        
+        # Map source for frontend compatibility
+        display_source = resource.source.value
+        if display_source == "TUTOR_UPLOADED":
+            display_source = "Tutor Uploaded"
+        elif display_source == "HCMUT_LIBRARY":
+            display_source = "HCMUT_LIBRARY"
+        elif display_source == "ADMIN_UPLOADED":
+            display_source = "Tutor Uploaded"  # Show as tutor uploaded
+        
+        return ResourceResponse(
+            id=str(resource.id),
+            title=resource.title,
+            description=resource.description,
+            resource_type=display_type,
+            external_url=resource.external_url,
+            link=resource.external_url,
+            uploader_id=str(resource.uploader.ref.id),
+            uploader_name=uploader_name,
+            author=resource.author,
+            is_public=resource.is_public,
+            access_level=resource.access_level.value,
+            access=access_status,
+            department=resource.department,
+            source=display_source,
+            file_size=resource.file_size,
+            content=resource.content,
+            created_at=resource.created_at
+        )
 
     @staticmethod
     async def attach_resource_to_session(
@@ -373,7 +570,8 @@ class LibraryService:
                 detail="Only the resource owner or admin can delete it"
             )
         
-        # 3. Delete from Cloudinary
+        # 3. Delete from storage (the local content-addressed store only removes
+        #    the file once no other resource or avatar references the same content)
         cloudinary_deleted = await StorageService.delete_resource(
             public_id=resource.cloudinary_public_id,
             resource_type="raw"  # Adjust based on actual resource type if needed
@@ -381,5 +579,6 @@ class LibraryService:
         
         # 4. Delete from database
         await resource.delete()
+        LibrarySearchIndex.remove(resource.id)
         
         return True
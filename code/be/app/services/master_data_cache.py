@@ -0,0 +1,264 @@
+import asyncio
+import time
+from typing import Dict, Generic, List, Optional, Type, TypeVar
+
+from beanie import Document, PydanticObjectId, Link
+from pydantic import BaseModel, ConfigDict
+
+# Models
+from app.models.external.faculty import Faculty
+from app.models.external.major import Major
+from app.models.external.course import Course
+
+
+# Master data only changes through scripts/seed/seed_master.py; reload periodically
+# anyway so out-of-process edits show up without a restart
+CACHE_TTL_SECONDS = 1800
+
+# Unknown ids/codes are remembered this long, so repeated lookups of a code
+# that does not exist (e.g. a course filter typo) do not query MongoDB each time
+NEGATIVE_TTL_SECONDS = 60
+
+# Remembered misses per table; the set is emptied when full
+MAX_NEGATIVE_ENTRIES = 1024
+
+
+# --- SNAPSHOTS (immutable, safe to share between requests) ---
+
+class FacultySnapshot(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    id: PydanticObjectId
+    name: str
+    code: str
+
+class MajorSnapshot(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    id: PydanticObjectId
+    name: str
+    code: str
+    faculty_id: Optional[PydanticObjectId] = None
+
+class CourseSnapshot(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    id: PydanticObjectId
+    name: str
+    code: str
+    credits: int
+    department_id: Optional[PydanticObjectId] = None
+
+
+S = TypeVar("S", bound=BaseModel)
+
+
+def _ref_id(value) -> Optional[PydanticObjectId]:
+    """Accepts a Link, a fetched Document or a raw id and returns the id."""
+    if value is None:
+        return None
+    if isinstance(value, Link):
+        return value.ref.id
+    if isinstance(value, Document):
+        return value.id
+    return PydanticObjectId(value)
+
+
+class _Table(Generic[S]):
+    """One cached collection: snapshots by id and by code, plus counters."""
+
+    def __init__(self, model: Type[Document], to_snapshot):
+        self.model = model
+        self.to_snapshot = to_snapshot
+        self.by_id: Dict[PydanticObjectId, S] = {}
+        self.by_code: Dict[str, S] = {}
+        self.loaded_at: Optional[float] = None
+        # Unknown id / code -> monotonic time of the lookup that found nothing
+        self.missing: Dict[object, float] = {}
+        self.lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def is_fresh(self) -> bool:
+        return self.loaded_at is not None and time.monotonic() - self.loaded_at < CACHE_TTL_SECONDS
+
+    async def load(self):
+        docs = await self.model.find_all().to_list()
+        snapshots = [self.to_snapshot(doc) for doc in docs]
+        # Swap whole maps so readers never see a half-built table
+        self.by_id = {s.id: s for s in snapshots}
+        self.by_code = {s.code: s for s in snapshots}
+        self.missing = {}
+        self.loaded_at = time.monotonic()
+
+    def _known_missing(self, key) -> bool:
+        missed_at = self.missing.get(key)
+        return missed_at is not None and time.monotonic() - missed_at < NEGATIVE_TTL_SECONDS
+
+    def _remember_missing(self, key):
+        if len(self.missing) >= MAX_NEGATIVE_ENTRIES:
+            self.missing = {}
+        self.missing[key] = time.monotonic()
+
+    def _remember(self, doc) -> S:
+        snapshot = self.to_snapshot(doc)
+        self.by_id[snapshot.id] = snapshot
+        self.by_code[snapshot.code] = snapshot
+        return snapshot
+
+    async def ensure_fresh(self):
+        if self.is_fresh():
+            return
+        async with self.lock:
+            if not self.is_fresh():
+                await self.load()
+
+    async def get(self, item_id) -> Optional[S]:
+        item_id = _ref_id(item_id)
+        if item_id is None:
+            return None
+        await self.ensure_fresh()
+        snapshot = self.by_id.get(item_id)
+        if snapshot is not None:
+            self.hits += 1
+            return snapshot
+
+        # Created after the last load: read through and remember it
+        self.misses += 1
+        if self._known_missing(item_id):
+            return None
+        doc = await self.model.get(item_id)
+        if not doc:
+            self._remember_missing(item_id)
+            return None
+        return self._remember(doc)
+
+    async def get_by_code(self, code: str) -> Optional[S]:
+        await self.ensure_fresh()
+        snapshot = self.by_code.get(code)
+        if snapshot is not None:
+            self.hits += 1
+            return snapshot
+
+        self.misses += 1
+        if self._known_missing(code):
+            return None
+        doc = await self.model.find_one({"code": code})
+        if not doc:
+            self._remember_missing(code)
+            return None
+        return self._remember(doc)
+
+    async def get_many(self, ids) -> Dict[PydanticObjectId, S]:
+        """Returns {id: snapshot} for the given ids (unknown ids are omitted)."""
+        result = {}
+        for item_id in ids:
+            snapshot = await self.get(item_id)
+            if snapshot is not None:
+                result[snapshot.id] = snapshot
+        return result
+
+    async def all(self) -> List[S]:
+        await self.ensure_fresh()
+        self.hits += 1
+        return list(self.by_id.values())
+
+
+class MasterDataCache:
+    """
+    Process-local read-through cache for master data (Faculty, Major, Course).
+
+    Each collection is loaded whole (warmed in lifespan), served as immutable
+    snapshots keyed by id and by code, and reloaded after CACHE_TTL_SECONDS.
+    The app has no master data write path (scripts/seed/seed_master.py writes
+    it out of process), so edits show up within CACHE_TTL_SECONDS. Ids and
+    codes missing from a loaded table are read through from MongoDB; misses
+    are remembered for NEGATIVE_TTL_SECONDS.
+    Use it instead of Link.fetch() on these three collections.
+    """
+
+    _faculties: _Table[FacultySnapshot] = _Table(
+        Faculty,
+        lambda f: FacultySnapshot(id=f.id, name=f.name, code=f.code)
+    )
+    _majors: _Table[MajorSnapshot] = _Table(
+        Major,
+        lambda m: MajorSnapshot(id=m.id, name=m.name, code=m.code, faculty_id=_ref_id(m.faculty))
+    )
+    _courses: _Table[CourseSnapshot] = _Table(
+        Course,
+        lambda c: CourseSnapshot(
+            id=c.id, name=c.name, code=c.code, credits=c.credits,
+            department_id=_ref_id(c.department)
+        )
+    )
+
+    # ==========================================
+    # LIFECYCLE
+    # ==========================================
+    @staticmethod
+    def _tables() -> Dict[str, _Table]:
+        return {
+            "faculties": MasterDataCache._faculties,
+            "majors": MasterDataCache._majors,
+            "courses": MasterDataCache._courses,
+        }
+
+    @staticmethod
+    async def warm():
+        """Loads all master data tables (called once at startup)."""
+        for table in MasterDataCache._tables().values():
+            await table.load()
+
+    @staticmethod
+    def stats() -> Dict[str, dict]:
+        """Hit/miss counters and size per table."""
+        return {
+            name: {
+                "size": len(table.by_id),
+                "hits": table.hits,
+                "misses": table.misses,
+                "known_missing": len(table.missing),
+                "fresh": table.is_fresh(),
+            }
+            for name, table in MasterDataCache._tables().items()
+        }
+
+    # ==========================================
+    # LOOKUPS
+    # ==========================================
+    @staticmethod
+    async def get_faculty(faculty_id) -> Optional[FacultySnapshot]:
+        return await MasterDataCache._faculties.get(faculty_id)
+
+    @staticmethod
+    async def list_faculties() -> List[FacultySnapshot]:
+        return await MasterDataCache._faculties.all()
+
+    @staticmethod
+    async def get_major(major_id) -> Optional[MajorSnapshot]:
+        return await MasterDataCache._majors.get(major_id)
+
+    @staticmethod
+    async def list_majors(faculty_id=None) -> List[MajorSnapshot]:
+        majors = await MasterDataCache._majors.all()
+        if faculty_id is not None:
+            faculty_id = _ref_id(faculty_id)
+            majors = [m for m in majors if m.faculty_id == faculty_id]
+        return majors
+
+    @staticmethod
+    async def get_course(course_id) -> Optional[CourseSnapshot]:
+        return await MasterDataCache._courses.get(course_id)
+
+    @staticmethod
+    async def get_course_by_code(code: str) -> Optional[CourseSnapshot]:
+        return await MasterDataCache._courses.get_by_code(code)
+
+    @staticmethod
+    async def get_courses(course_ids) -> Dict[PydanticObjectId, CourseSnapshot]:
+        return await MasterDataCache._courses.get_many(course_ids)
+
+    @staticmethod
+    async def list_courses() -> List[CourseSnapshot]:
+        return await MasterDataCache._courses.all()
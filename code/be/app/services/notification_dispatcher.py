@@ -0,0 +1,246 @@
+import asyncio
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+# Models
+from app.models.internal.notification import Notification
+from app.models.internal.notification_outbox import NotificationIntent, OutboxStatus
+from app.models.internal.student_profile import StudentProfile
+from app.models.internal.tutor_profile import TutorProfile
+
+# Services
+from app.services.notification_service import NotificationService
+
+
+# Intents claimed and written per round (one insert_many of their notifications)
+DISPATCH_BATCH_SIZE = 200
+
+# A claim expires after this long, so intents of a crashed worker are picked up again
+CLAIM_LEASE_SECONDS = 60
+
+# Retry schedule: RETRY_BASE_SECONDS * 2^(attempts-1), capped; FAILED after MAX_ATTEMPTS
+MAX_ATTEMPTS = 8
+RETRY_BASE_SECONDS = 5
+RETRY_MAX_SECONDS = 15 * 60
+
+# Sleep between polls when nobody wakes the dispatcher (other workers' intents, retries)
+IDLE_POLL_SECONDS = 5
+
+_DUPLICATE_KEY = 11000
+
+
+def _aware(value: datetime) -> datetime:
+    """MongoDB returns naive UTC datetimes; make them comparable with now()."""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+class NotificationDispatcher:
+    """
+    Background drain of the notification outbox (NotificationIntent).
+
+    Request handlers only insert an intent (NotificationService.enqueue) and wake
+    the dispatcher. Each round claims up to DISPATCH_BATCH_SIZE due intents with a
+    lease, resolves all their receivers with one query per profile collection,
+    writes every notification row with one insert_many (is_delivered=True) and
+    marks the intents DISPATCHED. Rows carry their outbox_id and are unique per
+    (outbox_id, receiver), so a round retried after a partial write never
+    duplicates a notification. Failed rounds are retried with exponential backoff.
+    """
+
+    _instance_id = uuid.uuid4().hex
+    _wakeup: Optional[asyncio.Event] = None
+
+    # Process-local counters (see stats())
+    dispatched_total = 0
+    retries_total = 0
+    last_dispatch_lag_ms: Optional[int] = None
+    last_round_at: Optional[datetime] = None
+
+    # ==========================================
+    # LOOP
+    # ==========================================
+    @staticmethod
+    def wake():
+        """Signals that new intents are waiting (no-op before the dispatcher started)."""
+        if NotificationDispatcher._wakeup is not None:
+            NotificationDispatcher._wakeup.set()
+
+    @staticmethod
+    async def run():
+        """
+        Drains the outbox until cancelled (started once from lifespan).
+        Rounds follow each other while there is work; when idle it sleeps until
+        woken or IDLE_POLL_SECONDS have passed.
+        """
+        NotificationDispatcher._wakeup = asyncio.Event()
+        while True:
+            NotificationDispatcher._wakeup.clear()
+            try:
+                claimed = await NotificationDispatcher.dispatch_pending()
+            except Exception as e:
+                print(f"[{datetime.now()}] Error in notification dispatcher: {e}")
+                claimed = 0
+
+            if claimed:
+                await asyncio.sleep(0)
+                continue
+            try:
+                await asyncio.wait_for(NotificationDispatcher._wakeup.wait(), IDLE_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    @staticmethod
+    async def dispatch_pending(batch_size: int = DISPATCH_BATCH_SIZE) -> int:
+        """
+        Runs one round: claims due intents and writes their notifications.
+
+        Returns:
+            Number of intents claimed (0 when the outbox has nothing due)
+        """
+        intents = await NotificationDispatcher._claim(batch_size)
+        NotificationDispatcher.last_round_at = datetime.now(timezone.utc)
+        if not intents:
+            return 0
+
+        try:
+            await NotificationDispatcher._deliver(intents)
+        except Exception as e:
+            print(f"Warning: notification dispatch of {len(intents)} intent(s) failed: {str(e)}")
+            await NotificationDispatcher._schedule_retry(intents, str(e))
+        return len(intents)
+
+    # ==========================================
+    # MONITORING
+    # ==========================================
+    @staticmethod
+    async def stats() -> dict:
+        """Queue depth and dispatch lag of the outbox (plus this process' counters)."""
+        collection = NotificationIntent.get_motor_collection()
+        now = datetime.now(timezone.utc)
+
+        oldest = await collection.find_one(
+            {"status": OutboxStatus.PENDING.value}, {"created_at": 1}, sort=[("created_at", 1)]
+        )
+        return {
+            "queue_depth": await collection.count_documents({"status": OutboxStatus.PENDING.value}),
+            "due": await collection.count_documents(
+                {"status": OutboxStatus.PENDING.value, "next_attempt_at": {"$lte": now}}
+            ),
+            "failed": await collection.count_documents({"status": OutboxStatus.FAILED.value}),
+            "oldest_pending_age_seconds": (
+                round((now - _aware(oldest["created_at"])).total_seconds(), 1) if oldest else None
+            ),
+            "last_dispatch_lag_ms": NotificationDispatcher.last_dispatch_lag_ms,
+            "dispatched_total": NotificationDispatcher.dispatched_total,
+            "retries_total": NotificationDispatcher.retries_total,
+            "last_round_at": NotificationDispatcher.last_round_at
+        }
+
+    # ==========================================
+    # INTERNAL HELPERS
+    # ==========================================
+    @staticmethod
+    async def _claim(batch_size: int) -> List[dict]:
+        """Leases up to batch_size due intents to this round (safe with several workers)."""
+        collection = NotificationIntent.get_motor_collection()
+        now = datetime.now(timezone.utc)
+        claimable = {
+            "status": OutboxStatus.PENDING.value,
+            "next_attempt_at": {"$lte": now},
+            "$or": [{"claimed_until": None}, {"claimed_until": {"$lt": now}}]
+        }
+
+        candidate_ids = [
+            doc["_id"]
+            async for doc in collection.find(claimable, {"_id": 1}).sort("next_attempt_at", 1).limit(batch_size)
+        ]
+        if not candidate_ids:
+            return []
+
+        token = f"{NotificationDispatcher._instance_id}:{uuid.uuid4().hex}"
+        await collection.update_many(
+            {"_id": {"$in": candidate_ids}, **claimable},
+            {"$set": {"claimed_by": token, "claimed_until": now + timedelta(seconds=CLAIM_LEASE_SECONDS)}}
+        )
+        return await collection.find({"claimed_by": token}).to_list(None)
+
+    @staticmethod
+    async def _deliver(intents: List[dict]):
+        """Writes the notification rows of the claimed intents and marks them DISPATCHED."""
+        student_users = await NotificationService.profile_user_map(
+            StudentProfile, [i for intent in intents for i in intent.get("student_profile_ids", [])]
+        )
+        tutor_users = await NotificationService.profile_user_map(
+            TutorProfile, [i for intent in intents for i in intent.get("tutor_profile_ids", [])]
+        )
+
+        notifications = []
+        for intent in intents:
+            receiver_ids = list(dict.fromkeys(
+                list(intent.get("user_ids", []))
+                + [student_users[i] for i in intent.get("student_profile_ids", []) if i in student_users]
+                + [tutor_users[i] for i in intent.get("tutor_profile_ids", []) if i in tutor_users]
+            ))
+            notifications.extend(NotificationService.build_notifications(
+                receiver_ids,
+                intent["type"],
+                intent["title"],
+                intent["message"],
+                session_id=intent.get("session_id"),
+                outbox_id=intent["_id"],
+                is_delivered=True,
+                created_at=intent["created_at"]
+            ))
+
+        if notifications:
+            duplicates = set()
+            try:
+                await Notification.insert_many(notifications, ordered=False)
+            except BulkWriteError as e:
+                # Rows already written by an earlier, interrupted round
+                errors = e.details.get("writeErrors", [])
+                if any(error["code"] != _DUPLICATE_KEY for error in errors):
+                    raise
+                duplicates = {error["index"] for error in errors}
+            # Unread counters and live streams: only rows this round actually inserted
+            inserted = [n for index, n in enumerate(notifications) if index not in duplicates]
+            await NotificationService.bump_counters(Counter(n.receiver.ref.id for n in inserted))
+            NotificationService.publish_live(inserted)
+
+        now = datetime.now(timezone.utc)
+        await NotificationIntent.get_motor_collection().update_many(
+            {"_id": {"$in": [intent["_id"] for intent in intents]}},
+            {
+                "$set": {"status": OutboxStatus.DISPATCHED.value, "dispatched_at": now, "last_error": None},
+                "$unset": {"claimed_by": "", "claimed_until": ""}
+            }
+        )
+        NotificationDispatcher.dispatched_total += len(intents)
+        NotificationDispatcher.last_dispatch_lag_ms = int(max(
+            (now - _aware(intent["created_at"])).total_seconds() * 1000 for intent in intents
+        ))
+
+    @staticmethod
+    async def _schedule_retry(intents: List[dict], error: str):
+        """Releases the claim with a backoff delay, or gives up after MAX_ATTEMPTS."""
+        now = datetime.now(timezone.utc)
+        operations = []
+        for intent in intents:
+            attempts = intent.get("attempts", 0) + 1
+            update = {"attempts": attempts, "last_error": error[:500]}
+            if attempts >= MAX_ATTEMPTS:
+                update["status"] = OutboxStatus.FAILED.value
+            else:
+                delay = min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS)
+                update["next_attempt_at"] = now + timedelta(seconds=delay)
+            operations.append(UpdateOne(
+                {"_id": intent["_id"]},
+                {"$set": update, "$unset": {"claimed_by": "", "claimed_until": ""}}
+            ))
+        await NotificationIntent.get_motor_collection().bulk_write(operations, ordered=False)
+        NotificationDispatcher.retries_total += len(intents)
@@ -1,22 +1,88 @@
-from typing import List, Optional
+import asyncio
+import base64
+import hashlib
+from collections import Counter
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
 from datetime import datetime, timezone
 from fastapi import HTTPException, status
+from beanie import Document, PydanticObjectId, Link
+from pymongo import UpdateOne
 
 # Models
 from app.models.internal.user import User
 from app.models.internal.notification import Notification, NotificationType
+from app.models.internal.notification_outbox import NotificationIntent
+from app.models.internal.notification_counter import NotificationCounter
 from app.models.internal.session import TutorSession
 
 # Schemas
 from app.models.schemas.notification import NotificationResponse
 
+# Live streams
+from app.core.notification_hub import NotificationHub, StreamMessage
+
+
+# Seconds between keep-alive comments on an idle stream (below common proxy timeouts)
+STREAM_HEARTBEAT_SECONDS = 15
+
+# Max notifications replayed to a reconnecting stream (older ones: use the feed)
+STREAM_REPLAY_LIMIT = 100
+
+# Reconnect delay suggested to EventSource clients
+STREAM_RETRY_MS = 5000
+
 
 class NotificationService:
     """
     Service for managing user notifications.
     Handles creation and retrieval of system notifications for session events.
+    Request handlers use enqueue(); the rows are written by NotificationDispatcher.
     """
 
+    @staticmethod
+    async def enqueue(
+        n_type: NotificationType,
+        session: Optional[TutorSession] = None,
+        extra_message: str = "",
+        users: Iterable = (),
+        students: Iterable = (),
+        tutors: Iterable = ()
+    ) -> NotificationIntent:
+        """
+        Queues a notification for background delivery (one insert, no reads).
+        
+        Args:
+            n_type: The type of notification
+            session: Optional session reference (document or link)
+            extra_message: Additional context message
+            users: Receiving users (ids, links or documents)
+            students: Receiving StudentProfiles (ids, links or documents)
+            tutors: Receiving TutorProfiles (ids, links or documents)
+            
+        Returns:
+            The queued NotificationIntent
+        """
+        from app.services.notification_dispatcher import NotificationDispatcher
+        
+        title, message = NotificationService._generate_notification_content(
+            n_type, 
+            session, 
+            extra_message
+        )
+        ref_id = NotificationService._ref_id
+        intent = NotificationIntent(
+            type=n_type,
+            title=title,
+            message=message,
+            session_id=ref_id(session) if session is not None else None,
+            user_ids=list(dict.fromkeys(ref_id(u) for u in users)),
+            student_profile_ids=list(dict.fromkeys(ref_id(s) for s in students)),
+            tutor_profile_ids=list(dict.fromkeys(ref_id(t) for t in tutors))
+        )
+        await intent.insert()
+        NotificationDispatcher.wake()
+        return intent
+
     @staticmethod
     async def create_system_notification(
         receiver_user: User,
@@ -36,6 +102,37 @@ class NotificationService:
         Returns:
             The created Notification document
         """
+        notifications = await NotificationService.create_bulk_notifications(
+            [receiver_user], n_type, session, extra_message
+        )
+        return notifications[0]
+
+    @staticmethod
+    async def create_bulk_notifications(
+        receivers: Iterable,
+        n_type: NotificationType,
+        session: Optional[TutorSession] = None,
+        extra_message: str = ""
+    ) -> List[Notification]:
+        """
+        Creates the same system notification for many users with one insert_many.
+        
+        Receivers may be user ids, User links or User documents; nothing is fetched.
+        Duplicate receivers get a single notification.
+        
+        Args:
+            receivers: The users who will receive the notification
+            n_type: The type of notification
+            session: Optional session reference (document or link)
+            extra_message: Additional context message
+            
+        Returns:
+            The created Notification documents, in receiver order
+        """
+        receiver_ids = list(dict.fromkeys(NotificationService._ref_id(r) for r in receivers))
+        if not receiver_ids:
+            return []
+        
         # Generate title and message based on notification type
         title, message = NotificationService._generate_notification_content(
             n_type, 
@@ -43,20 +140,80 @@ class NotificationService:
             extra_message
         )
         
-        # Create notification
-        notification = Notification(
-            receiver=receiver_user,
-            type=n_type,
-            title=title,
-            message=message,
-            session=session,
-            is_read=False,
-            is_delivered=False,
-            created_at=datetime.now(timezone.utc)
+        notifications = NotificationService.build_notifications(
+            receiver_ids,
+            n_type,
+            title,
+            message,
+            session_id=NotificationService._ref_id(session) if session is not None else None
         )
         
-        await notification.save()
-        return notification
+        await Notification.insert_many(notifications)
+        await NotificationService.bump_counters(Counter(receiver_ids))
+        NotificationService.publish_live(notifications)
+        return notifications
+
+    @staticmethod
+    def build_notifications(
+        receiver_ids: List[PydanticObjectId],
+        n_type: NotificationType,
+        title: str,
+        message: str,
+        session_id: Optional[PydanticObjectId] = None,
+        outbox_id: Optional[PydanticObjectId] = None,
+        is_delivered: bool = False,
+        created_at: Optional[datetime] = None
+    ) -> List[Notification]:
+        """
+        Builds (unsaved) Notification documents for the given receivers. Ids are
+        assigned here, so they are known after an insert_many (live stream ids).
+        """
+        created_at = created_at or datetime.now(timezone.utc)
+        session_link = TutorSession.link_from_id(session_id) if session_id is not None else None
+        return [
+            Notification(
+                id=PydanticObjectId(),
+                receiver=User.link_from_id(receiver_id),
+                type=n_type,
+                title=title,
+                message=message,
+                session=session_link,
+                is_read=False,
+                is_delivered=is_delivered,
+                outbox_id=outbox_id,
+                created_at=created_at
+            )
+            for receiver_id in receiver_ids
+        ]
+
+    @staticmethod
+    async def profile_user_map(profile_model: type, profiles: Iterable) -> Dict[PydanticObjectId, PydanticObjectId]:
+        """
+        Resolves StudentProfile/TutorProfile ids, links or documents to their
+        User ids with one projected query, so a whole roster can be notified
+        without fetching every profile and user.
+        
+        Returns:
+            Dict of profile id -> user id (unknown profiles are left out)
+        """
+        profile_ids = list(dict.fromkeys(NotificationService._ref_id(p) for p in profiles))
+        if not profile_ids:
+            return {}
+        return {
+            doc["_id"]: doc["user"].id
+            async for doc in profile_model.get_motor_collection().find(
+                {"_id": {"$in": profile_ids}}, {"user": 1}
+            )
+        }
+
+    @staticmethod
+    def _ref_id(value) -> PydanticObjectId:
+        """Returns the id behind a Link, a document or a plain id."""
+        if isinstance(value, Link):
+            return value.ref.id
+        if isinstance(value, Document):
+            return value.id
+        return PydanticObjectId(value)
 
     @staticmethod
     def _generate_notification_content(
@@ -109,33 +266,247 @@ class NotificationService:
             
         return title, message
 
+    # ==========================================
+    # FEED COUNTERS
+    # ==========================================
+    @staticmethod
+    async def bump_counters(unread_deltas: Dict[PydanticObjectId, int]):
+        """
+        Applies unread deltas (new rows: +n, reads: -n) to the users' counters
+        and advances their feed version, one bulk_write for all users.
+        """
+        now = datetime.now(timezone.utc)
+        operations = [
+            UpdateOne(
+                {"user_id": user_id},
+                {"$inc": {"unread": delta, "version": 1}, "$set": {"updated_at": now}},
+                upsert=True
+            )
+            for user_id, delta in unread_deltas.items()
+        ]
+        if operations:
+            await NotificationCounter.get_motor_collection().bulk_write(operations, ordered=False)
+
+    @staticmethod
+    async def ensure_counters():
+        """Builds the counters on first start (empty collection), otherwise does nothing."""
+        if await NotificationCounter.find_one() is None:
+            count = await NotificationService.rebuild_counters()
+            if count:
+                print(f"✅ Built notification counters for {count} user(s)")
+
     @staticmethod
-    async def get_user_notifications(user: User) -> List[NotificationResponse]:
+    async def rebuild_counters() -> int:
+        """
+        Recounts every user's unread notifications (one aggregation) and resets
+        their counters. Repair path if counters drifted; bumps every version so
+        polling clients refetch.
         """
-        Retrieves all notifications for a user, sorted by date (newest first).
+        rows = await Notification.aggregate([
+            {"$group": {
+                "_id": "$receiver",
+                "unread": {"$sum": {"$cond": [{"$eq": ["$is_read", False]}, 1, 0]}}
+            }}
+        ]).to_list()
+        
+        now = datetime.now(timezone.utc)
+        operations = [
+            UpdateOne(
+                {"user_id": row["_id"].id},
+                {"$set": {"unread": row["unread"], "updated_at": now}, "$inc": {"version": 1}},
+                upsert=True
+            )
+            for row in rows
+        ]
+        if operations:
+            await NotificationCounter.get_motor_collection().bulk_write(operations, ordered=False)
+        return len(operations)
+
+    @staticmethod
+    async def get_unread_count(user: User) -> Tuple[int, int]:
+        """
+        Returns (unread, version) of the user's feed from the counter (one
+        indexed read, no counting).
+        """
+        counter = await NotificationCounter.get_motor_collection().find_one(
+            {"user_id": user.id}, {"unread": 1, "version": 1}
+        )
+        if counter is None:
+            return 0, 0
+        return max(0, counter.get("unread", 0)), counter.get("version", 0)
+
+    # ==========================================
+    # FEED
+    # ==========================================
+    @staticmethod
+    async def get_feed_etag(
+        user: User,
+        limit: int,
+        cursor: Optional[str] = None,
+        since: Optional[datetime] = None
+    ) -> str:
+        """
+        ETag of one feed page: the feed version plus the page parameters, so it
+        changes whenever a notification is added to or read in the user's feed.
+        """
+        _, version = await NotificationService.get_unread_count(user)
+        raw = f"{user.id}|{version}|{limit}|{cursor or ''}|{since.isoformat() if since else ''}"
+        return f'"{hashlib.sha1(raw.encode()).hexdigest()[:20]}"'
+
+    @staticmethod
+    def _encode_feed_cursor(notification: Notification) -> str:
+        """Encodes the (created_at, _id) keyset position of a notification as an opaque cursor."""
+        raw = f"{notification.created_at.isoformat()}|{notification.id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def _decode_feed_cursor(cursor: str) -> Tuple[datetime, PydanticObjectId]:
+        """
+        Decodes a cursor produced by _encode_feed_cursor.
+        
+        Raises:
+            HTTPException: If the cursor is malformed
+        """
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            created_raw, id_raw = base64.urlsafe_b64decode(padded.encode()).decode().split("|", 1)
+            return datetime.fromisoformat(created_raw), PydanticObjectId(id_raw)
+        except Exception:
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST,
+                "Invalid pagination cursor"
+            )
+
+    @staticmethod
+    async def get_user_notifications(
+        user: User,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        since: Optional[datetime] = None
+    ) -> Tuple[List[NotificationResponse], Optional[str]]:
+        """
+        Retrieves one page of the user's notifications, newest first.
+        Keyset pagination on (created_at, _id) served by the
+        (receiver.$id, created_at, _id) index, so page cost does not grow with history.
         
         Args:
             user: The authenticated user
+            limit: Maximum number of notifications in the page
+            cursor: Opaque cursor returned by the previous page
+            since: Only notifications created after this time (polling delta)
             
         Returns:
-            List of notifications as NotificationResponse objects
+            Tuple of (notifications, next page cursor or None)
         """
-        notifications = await Notification.find(
-            Notification.receiver.id == user.id
-        ).sort("-created_at").to_list()
+        query = {"receiver.$id": user.id}
+        if since:
+            query["created_at"] = {"$gt": since}
         
-        return [
-            NotificationResponse(
-                id=str(n.id),
-                type=n.type.value,
-                title=n.title,
-                message=n.message,
-                session_id=str(n.session.ref.id) if n.session else None,
-                is_read=n.is_read,
-                created_at=n.created_at
-            )
-            for n in notifications
-        ]
+        # Keyset condition: strictly after the cursor position in (-created_at, -_id) order
+        if cursor:
+            cursor_created, cursor_id = NotificationService._decode_feed_cursor(cursor)
+            query["$or"] = [
+                {"created_at": {"$lt": cursor_created}},
+                {"created_at": cursor_created, "_id": {"$lt": cursor_id}}
+            ]
+        
+        # Fetch one extra row to know whether another page exists
+        notifications = await Notification.find(query).sort(
+            [("created_at", -1), ("_id", -1)]
+        ).limit(limit + 1).to_list()
+        
+        next_cursor = None
+        if len(notifications) > limit:
+            notifications = notifications[:limit]
+            next_cursor = NotificationService._encode_feed_cursor(notifications[-1])
+        
+        return [NotificationService._to_response(n) for n in notifications], next_cursor
+
+    # ==========================================
+    # LIVE STREAM (SSE)
+    # ==========================================
+    @staticmethod
+    def publish_live(notifications: List[Notification]):
+        """Pushes freshly inserted notifications to their receivers' open streams."""
+        for notification in notifications:
+            receiver_id = notification.receiver.ref.id
+            if not NotificationHub.has_subscribers(receiver_id):
+                continue
+            NotificationHub.publish(receiver_id, StreamMessage(
+                "notification",
+                NotificationService._to_response(notification).model_dump_json(),
+                str(notification.id)
+            ))
+
+    @staticmethod
+    async def stream_events(user: User, last_event_id: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Server-sent event stream of the user's new notifications.
+        
+        The event id is the notification id. On reconnect (Last-Event-ID) the
+        notifications inserted after that id are replayed from the database
+        first. A comment line is sent every STREAM_HEARTBEAT_SECONDS to keep
+        proxies from closing idle streams. A "resync" event means the stream fell
+        behind and was closed; the client reconnects and replays.
+        """
+        # Subscribe before replaying so nothing inserted meanwhile is missed
+        subscription = NotificationHub.subscribe(user.id)
+        try:
+            yield f"retry: {STREAM_RETRY_MS}\n\n"
+            
+            replayed = set()
+            if last_event_id:
+                try:
+                    after_id = PydanticObjectId(last_event_id)
+                except Exception:
+                    after_id = None
+                if after_id is not None:
+                    missed = await Notification.find(
+                        {"receiver.$id": user.id, "_id": {"$gt": after_id}}
+                    ).sort([("_id", 1)]).limit(STREAM_REPLAY_LIMIT).to_list()
+                    for notification in missed:
+                        replayed.add(str(notification.id))
+                        yield NotificationService._format_event(StreamMessage(
+                            "notification",
+                            NotificationService._to_response(notification).model_dump_json(),
+                            str(notification.id)
+                        ))
+            
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscription.queue.get(), STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                if message is None:
+                    break
+                if message.event_id in replayed:
+                    continue
+                yield NotificationService._format_event(message)
+        finally:
+            NotificationHub.unsubscribe(subscription)
+
+    @staticmethod
+    def _format_event(message: StreamMessage) -> str:
+        """Serializes one message in the text/event-stream format."""
+        lines = []
+        if message.event_id:
+            lines.append(f"id: {message.event_id}")
+        lines.append(f"event: {message.event}")
+        lines.append(f"data: {message.data}")
+        return "\n".join(lines) + "\n\n"
+
+    @staticmethod
+    def _to_response(n: Notification) -> NotificationResponse:
+        return NotificationResponse(
+            id=str(n.id),
+            type=n.type.value,
+            title=n.title,
+            message=n.message,
+            session_id=str(n.session.ref.id) if n.session else None,
+            is_read=n.is_read,
+            created_at=n.created_at
+        )
 
     @staticmethod
     async def mark_as_read(notification_id: str, user: User) -> NotificationResponse:
@@ -166,24 +537,23 @@ class NotificationService:
                 detail="You can only mark your own notifications as read"
             )
         
-        # Update notification
+        # Update notification (the counter only moves if it was still unread)
+        result = await Notification.get_motor_collection().update_one(
+            {"_id": notification.id, "is_read": False},
+            {"$set": {"is_read": True}}
+        )
         notification.is_read = True
-        await notification.save()
+        if result.modified_count:
+            await NotificationService.bump_counters({user.id: -1})
         
-        return NotificationResponse(
-            id=str(notification.id),
-            type=notification.type.value,
-            title=notification.title,
-            message=notification.message,
-            session_id=str(notification.session.ref.id) if notification.session else None,
-            is_read=notification.is_read,
-            created_at=notification.created_at
-        )
+        return NotificationService._to_response(notification)
 
     @staticmethod
     async def mark_all_as_read(user: User) -> int:
         """
         Marks all unread notifications for a user as read.
+        One update_many on the (receiver, is_read) index plus one counter update,
+        however many notifications are unread.
         
         Args:
             user: The authenticated user
@@ -191,15 +561,46 @@ class NotificationService:
         Returns:
             Number of notifications marked as read
         """
-        notifications = await Notification.find(
-            Notification.receiver.id == user.id,
-            Notification.is_read == False
-        ).to_list()
+        result = await Notification.get_motor_collection().update_many(
+            {"receiver.$id": user.id, "is_read": False},
+            {"$set": {"is_read": True}}
+        )
         
-        count = 0
-        for notification in notifications:
-            notification.is_read = True
-            await notification.save()
-            count += 1
+        if result.modified_count:
+            await NotificationService.bump_counters({user.id: -result.modified_count})
+        return result.modified_count
+
+    @staticmethod
+    async def mark_many_as_read(notification_ids: List[str], user: User) -> int:
+        """
+        Marks the given notifications of the user as read (one update_many).
+        Ids of other users' or already read notifications are ignored.
+        
+        Args:
+            notification_ids: The notification IDs
+            user: The authenticated user
+            
+        Returns:
+            Number of notifications marked as read
+            
+        Raises:
+            HTTPException: If an ID is malformed
+        """
+        try:
+            ids = list({PydanticObjectId(i) for i in notification_ids})
+        except Exception:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid notification ID"
+            )
+        if not ids:
+            return 0
+        
+        result = await Notification.get_motor_collection().update_many(
+            {"_id": {"$in": ids}, "receiver.$id": user.id, "is_read": False},
+            {"$set": {"is_read": True}}
+        )
         
-        return count
+        if result.modified_count:
+            await NotificationService.bump_counters({user.id: -result.modified_count})
+        return result.modified_count
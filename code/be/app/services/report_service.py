@@ -1,20 +1,74 @@
 from fastapi import HTTPException, status
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List
+
+from beanie import PydanticObjectId
+from beanie.operators import In
 
 # Models
 from app.models.internal.tutor_profile import TutorProfile
-from app.models.internal.session import TutorSession, SessionStatus
+from app.models.internal.tutor_search_view import TutorSearchView
 
 # Schemas
-from app.models.schemas.report import WorkloadReportResponse
+from app.models.schemas.report import (
+    WorkloadReportResponse,
+    TutorWorkloadItem,
+    FacultyWorkloadItem,
+    FacultyWorkloadReportResponse,
+    UniversityWorkloadReportResponse
+)
+
+# Services
+from app.services.workload_rollup_service import WorkloadRollupService
+from app.services.master_data_cache import MasterDataCache
 
 
 class ReportService:
     """
     Service for generating reports and analytics.
+    Workload reports are summed from the daily WorkloadRollup rows, so their cost
+    depends on the number of days/tutors in the range, not on session history.
     """
 
+    # ==========================================
+    # INTERNAL HELPERS
+    # ==========================================
+    @staticmethod
+    def _merge_by_tutor(rows: List[dict]) -> Dict[PydanticObjectId, dict]:
+        """Folds (tutor, faculty) summary rows into one total per tutor."""
+        totals: Dict[PydanticObjectId, dict] = {}
+        for row in rows:
+            total = totals.setdefault(row["tutor_id"], {"hours": 0.0, "sessions": 0, "mode_sessions": {}})
+            total["hours"] += row["hours"]
+            total["sessions"] += row["sessions"]
+            for mode, count in row["mode_sessions"].items():
+                total["mode_sessions"][mode] = total["mode_sessions"].get(mode, 0) + count
+        return totals
+
+    @staticmethod
+    async def _tutor_items(totals: Dict[PydanticObjectId, dict]) -> List[TutorWorkloadItem]:
+        """Builds report items (names from the search read model), most hours first."""
+        names = {
+            view.id: view.full_name
+            for view in await TutorSearchView.find(In(TutorSearchView.id, list(totals))).to_list()
+        }
+        items = [
+            TutorWorkloadItem(
+                tutor_id=str(tutor_id),
+                tutor_name=names.get(tutor_id, "Unknown"),
+                total_hours=round(total["hours"], 2),
+                total_sessions=total["sessions"],
+                average_session_duration=round(total["hours"] / total["sessions"], 2) if total["sessions"] else 0.0,
+                mode_breakdown=total["mode_sessions"]
+            )
+            for tutor_id, total in totals.items()
+        ]
+        items.sort(key=lambda item: (-item.total_hours, item.tutor_name))
+        return items
+
+    # ==========================================
+    # WORKLOAD REPORTS
+    # ==========================================
     @staticmethod
     async def get_tutor_workload(
         tutor_id: str,
@@ -22,17 +76,18 @@ class ReportService:
         end_date: datetime
     ) -> WorkloadReportResponse:
         """
-        Generates a workload report for a tutor using MongoDB aggregation.
+        Generates a workload report for a tutor from the daily rollups.
         
         Calculates:
         - Total hours taught (sum of session durations for COMPLETED/CONFIRMED sessions)
         - Total sessions completed
         - Average session duration
+        - Sessions per location mode
         
         Args:
             tutor_id: The ID of the tutor
-            start_date: Start of the reporting period
-            end_date: End of the reporting period
+            start_date: Start of the reporting period (whole UTC day)
+            end_date: End of the reporting period (whole UTC day, inclusive)
             
         Returns:
             WorkloadReportResponse with workload statistics
@@ -52,60 +107,88 @@ class ReportService:
         # Fetch tutor's user info for name
         tutor_user = await tutor.user.fetch()
         
-        # 2. Build MongoDB aggregation pipeline
-        pipeline = [
-            # Stage 1: Match sessions for this tutor within date range
-            {
-                "$match": {
-                    "tutor.$id": tutor.id,
-                    "start_time": {"$gte": start_date, "$lte": end_date},
-                    "status": {"$in": [SessionStatus.COMPLETED.value, SessionStatus.CONFIRMED.value]}
-                }
-            },
-            # Stage 2: Calculate session duration and project fields
-            {
-                "$project": {
-                    "duration_hours": {
-                        "$divide": [
-                            {"$subtract": ["$end_time", "$start_time"]},
-                            3600000  # Convert milliseconds to hours
-                        ]
-                    },
-                    "status": 1
-                }
-            },
-            # Stage 3: Group and calculate statistics
-            {
-                "$group": {
-                    "_id": None,
-                    "total_hours": {"$sum": "$duration_hours"},
-                    "total_sessions": {"$sum": 1},
-                    "average_duration": {"$avg": "$duration_hours"}
-                }
-            }
-        ]
-        
-        # 3. Execute aggregation
-        results = await TutorSession.aggregate(pipeline).to_list()
-        
-        # 4. Process results
-        if results and len(results) > 0:
-            stats = results[0]
-            total_hours = round(stats.get("total_hours", 0.0), 2)
-            total_sessions = stats.get("total_sessions", 0)
-            average_duration = round(stats.get("average_duration", 0.0), 2)
-        else:
-            # No sessions found in the period
-            total_hours = 0.0
-            total_sessions = 0
-            average_duration = 0.0
+        # 2. Sum the tutor's rollups over the period
+        rows = await WorkloadRollupService.summarize(start_date, end_date, tutor_id=tutor.id)
+        total = ReportService._merge_by_tutor(rows).get(tutor.id, {"hours": 0.0, "sessions": 0, "mode_sessions": {}})
         
         return WorkloadReportResponse(
             tutor_id=str(tutor.id),
             tutor_name=tutor_user.full_name,
             start_date=start_date,
             end_date=end_date,
-            total_hours=total_hours,
-            total_sessions=total_sessions,
-            average_session_duration=average_duration
+            total_hours=round(total["hours"], 2),
+            total_sessions=total["sessions"],
+            average_session_duration=round(total["hours"] / total["sessions"], 2) if total["sessions"] else 0.0,
+            mode_breakdown=total["mode_sessions"]
+        )
+
+    @staticmethod
+    async def get_faculty_workload(
+        faculty_id: str,
+        start_date: datetime,
+        end_date: datetime
+    ) -> FacultyWorkloadReportResponse:
+        """
+        Workload of every tutor who taught courses of one faculty in the period.
+        
+        Raises:
+            HTTPException: If faculty not found
+        """
+        faculty = await MasterDataCache.get_faculty(faculty_id) if PydanticObjectId.is_valid(faculty_id) else None
+        if not faculty:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Faculty not found"
+            )
+        
+        rows = await WorkloadRollupService.summarize(start_date, end_date, faculty_id=faculty.id)
+        tutors = await ReportService._tutor_items(ReportService._merge_by_tutor(rows))
+        
+        return FacultyWorkloadReportResponse(
+            faculty_id=str(faculty.id),
+            faculty_code=faculty.code,
+            faculty_name=faculty.name,
+            start_date=start_date,
+            end_date=end_date,
+            total_hours=round(sum(row["hours"] for row in rows), 2),
+            total_sessions=sum(row["sessions"] for row in rows),
+            tutors=tutors
+        )
+
+    @staticmethod
+    async def get_university_workload(
+        start_date: datetime,
+        end_date: datetime
+    ) -> UniversityWorkloadReportResponse:
+        """Workload of every tutor in the period, with per-faculty totals (one aggregation)."""
+        rows = await WorkloadRollupService.summarize(start_date, end_date)
+        
+        # Per-faculty totals
+        by_faculty: Dict[PydanticObjectId, dict] = {}
+        for row in rows:
+            total = by_faculty.setdefault(row["faculty_id"], {"hours": 0.0, "sessions": 0, "tutors": set()})
+            total["hours"] += row["hours"]
+            total["sessions"] += row["sessions"]
+            total["tutors"].add(row["tutor_id"])
+        
+        faculties = []
+        for faculty_id, total in by_faculty.items():
+            faculty = await MasterDataCache.get_faculty(faculty_id) if faculty_id else None
+            faculties.append(FacultyWorkloadItem(
+                faculty_id=str(faculty_id) if faculty_id else None,
+                faculty_code=faculty.code if faculty else None,
+                faculty_name=faculty.name if faculty else None,
+                total_hours=round(total["hours"], 2),
+                total_sessions=total["sessions"],
+                tutor_count=len(total["tutors"])
+            ))
+        faculties.sort(key=lambda item: -item.total_hours)
+        
+        return UniversityWorkloadReportResponse(
+            start_date=start_date,
+            end_date=end_date,
+            total_hours=round(sum(row["hours"] for row in rows), 2),
+            total_sessions=sum(row["sessions"] for row in rows),
+            faculties=faculties,
+            tutors=await ReportService._tutor_items(ReportService._merge_by_tutor(rows))
         )
@@ -1,8 +1,11 @@
+import asyncio
+import base64
+import time
 from datetime import datetime, timezone, timedelta
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from fastapi import HTTPException, status
-from beanie import PydanticObjectId
-from beanie.operators import In
+from beanie import PydanticObjectId, Link
+from beanie.operators import In, Set
 
 # Models
 from app.models.internal.user import User
@@ -13,12 +16,15 @@ from app.models.internal.session import TutorSession, SessionStatus, Negotiation
 from app.models.internal.notification import NotificationType
 from app.models.internal.feedback import SessionFeedback
 from app.models.external.course import Course
+from app.models.external.hcmut_sso import HCMUT_SSO
 from app.models.enums.role import UserRole
 
 # Schemas
 from app.models.schemas.schedule import (
     AvailabilityCreateRequest, 
     AvailabilityResponse,
+    OverlapCheckRequest,
+    OverlapCheckResult,
     BookingRequest,
     SessionResponse,
     SessionConfirmRequest, 
@@ -26,8 +32,25 @@ from app.models.schemas.schedule import (
     NegotiationResponse
 )
 
+# Events
+from app.core.events import EventBus, SessionConfirmed, SessionCompleted, SessionCancelled
+
 # Services
 from app.services.notification_service import NotificationService
+from app.services.interval_index import TutorIntervalIndex
+from app.services.tutor_search_view_service import TutorSearchViewService
+from app.services.master_data_cache import MasterDataCache
+from app.services.avatar_service import AvatarService, CHIP_AVATAR_SIZE
+
+
+# Max sessions handled per round trip by the auto-complete job
+AUTO_COMPLETE_BATCH_SIZE = 500
+
+# Page size of get_user_sessions when a cursor is passed without a limit
+SESSION_PAGE_SIZE = 100
+
+# Cap of the unpaginated get_user_sessions default (newest sessions first)
+SESSION_LIST_MAX = 1000
 
 
 class ScheduleService:
@@ -48,6 +71,8 @@ class ScheduleService:
     ):
         """
         Ensures the Tutor is not double-booked in Availability or Confirmed Sessions.
+        Answered from the in-process TutorIntervalIndex (no database hit once the
+        tutor's timeline is loaded).
         
         Args:
             tutor_id: The tutor's profile ID
@@ -59,33 +84,14 @@ class ScheduleService:
             HTTPException: If overlap is detected
         """
         # Check availability slots
-        slot_query = [
-            AvailabilitySlot.tutor.id == tutor_id,
-            AvailabilitySlot.start_time < end,
-            AvailabilitySlot.end_time > start
-        ]
-        if exclude_slot_id:
-            slot_query.append(AvailabilitySlot.id != exclude_slot_id)
-            
-        overlap_slot = await AvailabilitySlot.find_one(*slot_query)
-        if overlap_slot:
+        if await TutorIntervalIndex.find_overlapping_slots(tutor_id, start, end, exclude_slot_id):
             raise HTTPException(
                 status.HTTP_400_BAD_REQUEST, 
                 "Time overlaps with an existing availability slot."
             )
 
         # Check existing sessions (block during negotiation too)
-        overlap_session = await TutorSession.find_one(
-            TutorSession.tutor.id == tutor_id,
-            In(TutorSession.status, [
-                SessionStatus.CONFIRMED, 
-                SessionStatus.WAITING_FOR_TUTOR, 
-                SessionStatus.WAITING_FOR_STUDENT
-            ]),
-            TutorSession.start_time < end,
-            TutorSession.end_time > start
-        )
-        if overlap_session:
+        if await TutorIntervalIndex.find_overlapping_sessions(tutor_id, start, end):
             raise HTTPException(
                 status.HTTP_400_BAD_REQUEST, 
                 "Time overlaps with an existing session."
@@ -107,8 +113,11 @@ class ScheduleService:
             slot: The original availability slot to split
             session: The session that consumes part of the slot
         """
+        tutor_id = ScheduleService._link_id(slot.tutor)
+
         # Delete original slot (it's now consumed)
         await slot.delete()
+        TutorIntervalIndex.remove_slot(tutor_id, slot.id)
         
         # Create remainder slot BEFORE session (if exists)
         if slot.start_time < session.start_time:
@@ -119,6 +128,7 @@ class ScheduleService:
                 is_booked=False
             )
             await before_slot.save()
+            TutorIntervalIndex.add_slot(tutor_id, before_slot)
 
         # Create remainder slot AFTER session (if exists)
         if slot.end_time > session.end_time:
@@ -129,6 +139,9 @@ class ScheduleService:
                 is_booked=False
             )
             await after_slot.save()
+            TutorIntervalIndex.add_slot(tutor_id, after_slot)
+
+        await TutorSearchViewService.refresh_next_slot(tutor_id)
 
     @staticmethod
     async def create_slot(user: User, payload: AvailabilityCreateRequest) -> AvailabilityResponse:
@@ -172,6 +185,8 @@ class ScheduleService:
             is_booked=False
         )
         await slot.save()
+        TutorIntervalIndex.add_slot(tutor_profile.id, slot)
+        await TutorSearchViewService.refresh_next_slot(tutor_profile.id)
         
         return AvailabilityResponse(
             id=str(slot.id),
@@ -225,6 +240,42 @@ class ScheduleService:
             ) for s in slots
         ]
 
+    @staticmethod
+    async def check_overlaps(user: User, payload: OverlapCheckRequest) -> List[OverlapCheckResult]:
+        """
+        Checks many candidate intervals against the tutor's slots and active sessions.
+        Lets the tutor UI validate a whole week of slots in one request.
+        
+        Args:
+            user: The authenticated tutor user
+            payload: Candidate intervals
+            
+        Returns:
+            One OverlapCheckResult per candidate interval, in request order
+            
+        Raises:
+            HTTPException: If user is not a tutor
+        """
+        tutor_profile = await TutorProfile.find_one(TutorProfile.user.id == user.id)
+        if not tutor_profile:
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST, 
+                "User is not a Tutor"
+            )
+
+        conflicts = await TutorIntervalIndex.check_many(
+            tutor_profile.id,
+            [(i.start_time, i.end_time) for i in payload.intervals]
+        )
+        return [
+            OverlapCheckResult(
+                start_time=interval.start_time,
+                end_time=interval.end_time,
+                is_free=conflict is None,
+                conflict=conflict
+            ) for interval, conflict in zip(payload.intervals, conflicts)
+        ]
+
     @staticmethod
     async def delete_slot(slot_id: str, user: User):
         """
@@ -274,6 +325,8 @@ class ScheduleService:
         
         # Delete the slot
         await slot.delete()
+        TutorIntervalIndex.remove_slot(tutor_profile.id, slot.id)
+        await TutorSearchViewService.refresh_next_slot(tutor_profile.id)
 
     # ==========================================
     # 2. SESSION BOOKING & NEGOTIATION
@@ -341,6 +394,7 @@ class ScheduleService:
             status=SessionStatus.WAITING_FOR_TUTOR
         )
         await session.save()
+        TutorIntervalIndex.sync_session(tutor.id, session)
         
         return await ScheduleService._map_session_response(session, student_user)
 
@@ -393,15 +447,12 @@ class ScheduleService:
         proposed_start = payload.new_start_time or session.start_time
         proposed_end = payload.new_end_time or session.end_time
         
-        # Check if tutor has any session (any status except REJECTED/CANCELLED) in that time
-        # Exclude sessions that are REJECTED or CANCELLED when checking overlap
-        overlap_check = await TutorSession.find_one(
-            TutorSession.tutor.id == session.tutor.ref.id,
-            TutorSession.id != session.id,
-            TutorSession.status != SessionStatus.REJECTED,
-            TutorSession.status != SessionStatus.CANCELLED,
-            TutorSession.start_time < proposed_end,
-            TutorSession.end_time > proposed_start
+        # Check if tutor has any other active session in that time
+        overlap_check = await TutorIntervalIndex.find_overlapping_sessions(
+            session.tutor.ref.id,
+            proposed_start,
+            proposed_end,
+            exclude_session_id=session.id
         )
         if overlap_check:
             raise HTTPException(
@@ -424,18 +475,14 @@ class ScheduleService:
         # Transition state
         session.status = SessionStatus.WAITING_FOR_STUDENT
         await session.save()
-        
-        # Fetch all links before sending notification
-        await session.fetch_all_links()
+        TutorIntervalIndex.sync_session(session.tutor.ref.id, session)
         
         # NOTIFICATION: Notify student about counter-offer
-        student = session.students[0]
-        await student.fetch_link(StudentProfile.user)
-        await NotificationService.create_system_notification(
-            receiver_user=student.user,
+        await NotificationService.enqueue(
             n_type=NotificationType.NEGOTIATION_PROPOSAL,
             session=session,
-            extra_message=f"The tutor has proposed changes to your session request. Message: {payload.message}"
+            extra_message=f"The tutor has proposed changes to your session request. Message: {payload.message}",
+            students=session.students[:1]
         )
         
         return await ScheduleService._map_session_response(session, user)
@@ -500,12 +547,16 @@ class ScheduleService:
             session.end_time = final_end
             
             # Remove any availability slots that overlap with the new time
-            overlapping_slots = await AvailabilitySlot.find(
-                AvailabilitySlot.tutor.id == session.tutor.ref.id,
-                AvailabilitySlot.start_time < final_end,
-                AvailabilitySlot.end_time > final_start,
-                AvailabilitySlot.is_booked == False
-            ).to_list()
+            # (index lookup first; only load the slot documents that actually overlap)
+            overlapping_ids = await TutorIntervalIndex.find_overlapping_slots(
+                session.tutor.ref.id, final_start, final_end
+            )
+            overlapping_slots = []
+            if overlapping_ids:
+                overlapping_slots = await AvailabilitySlot.find(
+                    In(AvailabilitySlot.id, overlapping_ids),
+                    AvailabilitySlot.is_booked == False
+                ).to_list()
             
             for slot in overlapping_slots:
                 await ScheduleService._split_availability_slot(slot, session)
@@ -545,11 +596,24 @@ class ScheduleService:
             )
 
         await session.save()
+        TutorIntervalIndex.sync_session(session.tutor.ref.id, session)
+        await ScheduleService._publish_status_change(session, SessionStatus.WAITING_FOR_STUDENT)
         return await ScheduleService._map_session_response(session, user)
 
     # ==========================================
     # 3. SESSION STATE ACTIONS
     # ==========================================
+    @staticmethod
+    async def _publish_status_change(session: TutorSession, previous_status: SessionStatus):
+        """Publishes the lifecycle event of a status transition that was just saved."""
+        event_class = {
+            SessionStatus.CONFIRMED: SessionConfirmed,
+            SessionStatus.COMPLETED: SessionCompleted,
+            SessionStatus.CANCELLED: SessionCancelled,
+        }.get(session.status)
+        if event_class and session.status != previous_status:
+            await EventBus.publish(event_class.from_session(session))
+
     @staticmethod
     async def handle_session_action(
         session_id: str, 
@@ -595,6 +659,7 @@ class ScheduleService:
         is_student = student_profile and any(
             s.ref.id == student_profile.id for s in session.students
         )
+        previous_status = session.status
 
         # ===== CONFIRM ACTION =====
         if action == "confirm":
@@ -632,27 +697,20 @@ class ScheduleService:
             if confirm_details.final_location_link:
                 session.location = confirm_details.final_location_link
             
-            # Fetch all links before sending notifications
-            await session.fetch_all_links()
-            
             # NOTIFICATION: Notify student that session is confirmed
-            student = session.students[0]
-            await student.fetch_link(StudentProfile.user)
-            await NotificationService.create_system_notification(
-                receiver_user=student.user,
+            await NotificationService.enqueue(
                 n_type=NotificationType.SESSION_CONFIRMED,
                 session=session,
-                extra_message="Your session has been confirmed by the tutor."
+                extra_message="Your session has been confirmed by the tutor.",
+                students=session.students[:1]
             )
             
             # NOTIFICATION: Also notify tutor
-            tutor = session.tutor
-            await tutor.fetch_link(TutorProfile.user)
-            await NotificationService.create_system_notification(
-                receiver_user=tutor.user,
+            await NotificationService.enqueue(
                 n_type=NotificationType.SESSION_CONFIRMED,
                 session=session,
-                extra_message="You have confirmed a new session."
+                extra_message="You have confirmed a new session.",
+                tutors=[session.tutor]
             )
         
         # ===== REJECT ACTION =====
@@ -667,17 +725,12 @@ class ScheduleService:
             session.cancellation_reason = reason or "Tutor declined request."
             # NOTE: NO slot restoration (Cost of Commitment)
             
-            # Fetch all links before sending notification
-            await session.fetch_all_links()
-            
             # NOTIFICATION: Notify student that session was rejected
-            student = session.students[0]
-            await student.fetch_link(StudentProfile.user)
-            await NotificationService.create_system_notification(
-                receiver_user=student.user,
+            await NotificationService.enqueue(
                 n_type=NotificationType.SESSION_REJECTED,
                 session=session,
-                extra_message=f"Reason: {session.cancellation_reason}"
+                extra_message=f"Reason: {session.cancellation_reason}",
+                students=session.students[:1]
             )
             
         # ===== CANCEL ACTION =====
@@ -699,15 +752,13 @@ class ScheduleService:
                 session.status = SessionStatus.CANCELLED
                 session.cancelled_by = "TUTOR"
                 
-                # NOTIFICATION: Notify all students about cancellation
-                for student_link in session.students:
-                    student = await student_link.fetch_link(StudentProfile.user)
-                    await NotificationService.create_system_notification(
-                        receiver_user=student.user,
-                        n_type=NotificationType.SESSION_CANCELLED,
-                        session=session,
-                        extra_message=f"The tutor has cancelled the session. Reason: {reason or 'Not specified'}"
-                    )
+                # NOTIFICATION: Notify all students about cancellation (one insert)
+                await NotificationService.enqueue(
+                    n_type=NotificationType.SESSION_CANCELLED,
+                    session=session,
+                    extra_message=f"The tutor has cancelled the session. Reason: {reason or 'Not specified'}",
+                    students=session.students
+                )
                 
             elif is_student:
                 if is_late_cancellation:
@@ -724,30 +775,20 @@ class ScheduleService:
                     session.status = SessionStatus.CANCELLED
                     session.cancelled_by = "STUDENT"
                     
-                    # Fetch all links before sending notification
-                    await session.fetch_all_links()
-                    
                     # NOTIFICATION: Notify tutor about cancellation
-                    tutor = session.tutor
-                    await tutor.fetch_link(TutorProfile.user)
-                    await NotificationService.create_system_notification(
-                        receiver_user=tutor.user,
+                    await NotificationService.enqueue(
                         n_type=NotificationType.SESSION_CANCELLED,
                         session=session,
-                        extra_message=f"The student has cancelled the session. Reason: {reason or 'Not specified'}"
+                        extra_message=f"The student has cancelled the session. Reason: {reason or 'Not specified'}",
+                        tutors=[session.tutor]
                     )
                 else:
-                    # Fetch all links before sending notification
-                    await session.fetch_all_links()
-                    
                     # NOTIFICATION: Notify tutor that a student left (but session continues)
-                    tutor = session.tutor
-                    await tutor.fetch_link(TutorProfile.user)
-                    await NotificationService.create_system_notification(
-                        receiver_user=tutor.user,
+                    await NotificationService.enqueue(
                         n_type=NotificationType.SESSION_CANCELLED,
                         session=session,
-                        extra_message="A student has left the group session."
+                        extra_message="A student has left the group session.",
+                        tutors=[session.tutor]
                     )
             
             session.cancellation_reason = reason or "User cancelled."
@@ -778,54 +819,188 @@ class ScheduleService:
             )
 
         await session.save()
+        TutorIntervalIndex.sync_session(ScheduleService._link_id(session.tutor), session)
+
+        await ScheduleService._publish_status_change(session, previous_status)
         return await ScheduleService._map_session_response(session, user)
 
+    @staticmethod
+    async def auto_complete_past_sessions(batch_size: int = AUTO_COMPLETE_BATCH_SIZE) -> dict:
+        """
+        Marks CONFIRMED sessions whose end_time has passed as COMPLETED (background job).
+
+        Works in bounded batches. Per batch: one find, one bulk upsert of PENDING
+        feedback rows keyed by (session, student), and one update_many status flip.
+        Feedback rows are written before the flip, so a crash in between is repaired
+        by the next run (the upsert is idempotent). The flipped sessions are published
+        as one SessionCompleted batch (stats and workload projections). Yields to the event loop
+        between batches so API traffic is not starved.
+
+        Returns:
+            Run metrics: sessions_completed, feedbacks_created, batches, elapsed_ms
+        """
+        from app.services.feedback_service import FeedbackService
+
+        started = time.perf_counter()
+        now = datetime.now(timezone.utc)
+        metrics = {"sessions_completed": 0, "feedbacks_created": 0, "batches": 0}
+
+        while True:
+            batch = await TutorSession.find(
+                TutorSession.status == SessionStatus.CONFIRMED,
+                TutorSession.end_time < now
+            ).sort("+end_time").limit(batch_size).to_list()
+            if not batch:
+                break
+            metrics["batches"] += 1
+
+            # 1. Feedback records for every student of the batch (single bulk_write)
+            metrics["feedbacks_created"] += await FeedbackService.create_feedback_records_for_sessions(batch)
+
+            # 2. Status flip (single update_many; skips sessions changed meanwhile)
+            result = await TutorSession.find(
+                In(TutorSession.id, [s.id for s in batch]),
+                TutorSession.status == SessionStatus.CONFIRMED
+            ).update(Set({TutorSession.status: SessionStatus.COMPLETED}))
+            metrics["sessions_completed"] += result.modified_count
+
+            # 3. Stats projection; sessions changed meanwhile are re-read (event ids
+            # are per session, so one completed by a tutor in between is not counted twice)
+            completed = batch
+            if result.modified_count != len(batch):
+                completed = await TutorSession.find(
+                    In(TutorSession.id, [s.id for s in batch]),
+                    TutorSession.status == SessionStatus.COMPLETED
+                ).to_list()
+            await EventBus.publish(*[SessionCompleted.from_session(s) for s in completed])
+
+            # 4. Completed sessions no longer block the tutor's time
+            for session in batch:
+                TutorIntervalIndex.remove_session(ScheduleService._link_id(session.tutor), session.id)
+
+            if len(batch) < batch_size or result.modified_count == 0:
+                break
+            await asyncio.sleep(0)
+
+        metrics["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return metrics
+
     # ==========================================
     # 4. SESSION RETRIEVAL
     # ==========================================
     @staticmethod
-    async def get_user_sessions(user: User, role_context: Optional[str] = None) -> List[SessionResponse]:
+    def _encode_session_cursor(session: TutorSession) -> str:
+        """Encodes the (start_time, _id) keyset position of a session as an opaque cursor."""
+        raw = f"{session.start_time.isoformat()}|{session.id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def _decode_session_cursor(cursor: str) -> Tuple[datetime, PydanticObjectId]:
         """
-        Retrieves all sessions relevant to the user based on role context.
+        Decodes a cursor produced by _encode_session_cursor.
+        
+        Raises:
+            HTTPException: If the cursor is malformed
+        """
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            start_raw, id_raw = base64.urlsafe_b64decode(padded.encode()).decode().split("|", 1)
+            return datetime.fromisoformat(start_raw), PydanticObjectId(id_raw)
+        except Exception:
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST,
+                "Invalid pagination cursor"
+            )
+
+    @staticmethod
+    async def get_user_sessions(
+        user: User,
+        role_context: Optional[str] = None,
+        statuses: Optional[List[SessionStatus]] = None,
+        start_from: Optional[datetime] = None,
+        start_to: Optional[datetime] = None,
+        course_code: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[SessionResponse], Optional[str]]:
+        """
+        Retrieves one page of sessions relevant to the user based on role context.
+        Uses keyset pagination on (start_time, _id) so each page is served from the
+        (tutor.$id / students.$id, start_time, _id) indexes regardless of history size.
         
         Args:
             user: The authenticated user
             role_context: Optional "student" or "tutor" to specify which sessions to return
+            statuses: Optional list of session statuses to include
+            start_from: Optional lower bound (inclusive) on start_time
+            start_to: Optional upper bound (exclusive) on start_time
+            course_code: Optional course code filter
+            limit: Maximum number of sessions in the page (None: the newest
+                SESSION_LIST_MAX sessions, or SESSION_PAGE_SIZE when a cursor is given)
+            cursor: Opaque cursor returned by the previous page
             
         Returns:
-            List of sessions sorted by start time (descending)
+            Tuple of (sessions sorted by start time descending, next page cursor or None)
         """
-        sessions = []
-        
-        # If role context is explicitly specified, use it
-        if role_context == "student":
+        # 1. Resolve which profile the timeline belongs to
+        # Default: Check for student profile first (prioritize student view),
+        # fall back to tutor sessions if no student profile
+        if role_context not in ("student", "tutor"):
+            role_context = None
+        query = None
+        if role_context in (None, "student"):
             student_profile = await StudentProfile.find_one(StudentProfile.user.id == user.id)
             if student_profile:
-                sessions = await TutorSession.find(
-                    TutorSession.students.id == student_profile.id
-                ).sort("-start_time").to_list()
-        elif role_context == "tutor":
+                query = {"students.$id": student_profile.id}
+        if query is None and role_context in (None, "tutor"):
             tutor_profile = await TutorProfile.find_one(TutorProfile.user.id == user.id)
             if tutor_profile:
-                sessions = await TutorSession.find(
-                    TutorSession.tutor.id == tutor_profile.id
-                ).sort("-start_time").to_list()
-        else:
-            # Default: Check for student profile first (prioritize student view)
-            student_profile = await StudentProfile.find_one(StudentProfile.user.id == user.id)
-            if student_profile:
-                sessions = await TutorSession.find(
-                    TutorSession.students.id == student_profile.id
-                ).sort("-start_time").to_list()
-            else:
-                # Fall back to tutor sessions if no student profile
-                tutor_profile = await TutorProfile.find_one(TutorProfile.user.id == user.id)
-                if tutor_profile:
-                    sessions = await TutorSession.find(
-                        TutorSession.tutor.id == tutor_profile.id
-                    ).sort("-start_time").to_list()
-        
-        return [await ScheduleService._map_session_response(s, user) for s in sessions]
+                query = {"tutor.$id": tutor_profile.id}
+        if query is None:
+            return [], None
+
+        # 2. Server-side filters (equality prefix stays on the indexed profile field)
+        if statuses:
+            query["status"] = {"$in": [s.value for s in statuses]}
+
+        start_range = {}
+        if start_from:
+            start_range["$gte"] = start_from
+        if start_to:
+            start_range["$lt"] = start_to
+        if start_range:
+            query["start_time"] = start_range
+
+        if course_code:
+            course = await MasterDataCache.get_course_by_code(course_code)
+            if not course:
+                return [], None
+            query["course.$id"] = course.id
+
+        # 3. Keyset condition: strictly after the cursor position in (-start_time, -_id) order
+        if cursor:
+            cursor_start, cursor_id = ScheduleService._decode_session_cursor(cursor)
+            query["$or"] = [
+                {"start_time": {"$lt": cursor_start}},
+                {"start_time": cursor_start, "_id": {"$lt": cursor_id}}
+            ]
+
+        # Unpaginated (legacy callers): the newest SESSION_LIST_MAX sessions,
+        # with a cursor to the rest
+        if limit is None:
+            limit = SESSION_PAGE_SIZE if cursor else SESSION_LIST_MAX
+
+        # Fetch one extra row to know whether another page exists
+        sessions = await TutorSession.find(query).sort(
+            [("start_time", -1), ("_id", -1)]
+        ).limit(limit + 1).to_list()
+
+        next_cursor = None
+        if len(sessions) > limit:
+            sessions = sessions[:limit]
+            next_cursor = ScheduleService._encode_session_cursor(sessions[-1])
+
+        return await ScheduleService._map_session_responses(sessions, user), next_cursor
 
     @staticmethod
     async def get_session_detail(session_id: str, user: User) -> SessionResponse:
@@ -901,129 +1076,192 @@ class ScheduleService:
             )
 
     # ==========================================
-    # 5. MAPPER (Optimized - DRY Principle)
+    # 5. MAPPER (Batched - Fixed Number of Queries)
     # ==========================================
+    @staticmethod
+    def _link_id(value) -> Optional[PydanticObjectId]:
+        """Returns the referenced id of a Link, or the id of an already fetched Document."""
+        if value is None:
+            return None
+        if isinstance(value, Link):
+            return value.ref.id
+        return value.id
+
+    @staticmethod
+    async def _fetch_by_ids(model, ids) -> dict:
+        """Loads all documents of a collection with a single $in query, keyed by id."""
+        ids = list({i for i in ids if i is not None})
+        if not ids:
+            return {}
+        docs = await model.find(In(model.id, ids)).to_list()
+        return {doc.id: doc for doc in docs}
+
     @staticmethod
     async def _map_session_response(session: TutorSession, user: User) -> SessionResponse:
         """
-        Maps internal TutorSession model to SessionResponse schema.
-        Optimized to avoid redundant link fetching by using snapshot data from User model.
+        Maps a single TutorSession to SessionResponse.
+        Thin wrapper around the batch mapper so every caller shares the same logic.
+        """
+        responses = await ScheduleService._map_session_responses([session], user)
+        return responses[0]
+
+    @staticmethod
+    async def _map_session_responses(sessions: List[TutorSession], user: User) -> List[SessionResponse]:
+        """
+        Maps a list of TutorSession documents to SessionResponse schemas.
+        Collects every tutor, student, user, SSO and course id across the whole list,
+        resolves each collection with one $in query and builds the responses from
+        in-memory maps, so the number of queries does not grow with the list size.
         
         Args:
-            session: The TutorSession document
+            sessions: The TutorSession documents (links may be fetched or not)
             user: The current authenticated user
             
         Returns:
-            SessionResponse with all necessary fields populated
+            List of SessionResponse in the same order as the input sessions
         """
-        # Fetch all links efficiently
-        await session.fetch_all_links()
-        
-        tutor = session.tutor
-        await tutor.fetch_link(TutorProfile.user)
-        
-        # Map negotiation proposal (with ALL fields including capacity/publicity)
-        proposal_res = None
-        if session.proposal:
-            proposal_res = NegotiationResponse(
-                new_start_time=session.proposal.new_start_time,
-                new_end_time=session.proposal.new_end_time,
-                new_mode=session.proposal.new_mode,
-                new_location=session.proposal.new_location,
-                tutor_message=session.proposal.tutor_message,
-                new_max_capacity=session.proposal.new_max_capacity,
-                new_is_public=session.proposal.new_is_public
-            )
-        
-        # Get primary student (first in list) - handle case where all students left
-        student_id = None
-        student_name = None
-        
-        if len(session.students) > 0:
-            student = session.students[0] 
-            await student.fetch_link(StudentProfile.user)
-            await student.user.fetch_link(User.sso_info)
-            student_id = student.user.sso_info.identity_id
-            student_name = student.user.full_name
-        
-        # Get feedback status for current user (only if user is a student)
-        feedback_status = None
-        is_requester = None
-        
+        if not sessions:
+            return []
+
+        link_id = ScheduleService._link_id
+
+        # 1. Collect profile and course ids from all sessions
+        tutor_ids = set()
+        student_ids = set()
+        course_ids = set()
+        for session in sessions:
+            tutor_ids.add(link_id(session.tutor))
+            course_ids.add(link_id(session.course))
+            student_ids.update(link_id(s) for s in session.students)
+            for participation in session.student_participations or []:
+                student_ids.add(link_id(participation.student))
+
+        # 2. Resolve profiles and courses (one query per collection)
+        tutors = await ScheduleService._fetch_by_ids(TutorProfile, tutor_ids)
+        students = await ScheduleService._fetch_by_ids(StudentProfile, student_ids)
+        courses = await MasterDataCache.get_courses(course_ids)
+
+        # 3. Resolve users behind the profiles, then SSO records behind the student users
+        user_ids = {link_id(t.user) for t in tutors.values()}
+        user_ids.update(link_id(s.user) for s in students.values())
+        users = await ScheduleService._fetch_by_ids(User, user_ids)
+
+        sso_ids = {link_id(users[link_id(s.user)].sso_info) for s in students.values() if link_id(s.user) in users}
+        sso_records = await ScheduleService._fetch_by_ids(HCMUT_SSO, sso_ids)
+
+        def student_identity(student_id) -> Optional[tuple]:
+            """Returns (profile, user, sso) for a student profile id, or None if any link is dangling."""
+            profile = students.get(student_id)
+            student_user = users.get(link_id(profile.user)) if profile else None
+            sso = sso_records.get(link_id(student_user.sso_info)) if student_user else None
+            if not sso:
+                return None
+            return profile, student_user, sso
+
+        # 4. Feedback status for the current user (only if user is a student) - one query
+        current_student_id = None
+        feedback_by_session = {}
         if UserRole.STUDENT in user.roles:
-            # Find student profile for current user
-            student_profile = await StudentProfile.find_one(StudentProfile.user.id == user.id)
-            if student_profile:
-                # Check if this student is part of the session
-                student_ids = [str(s.id) for s in session.students]
-                if str(student_profile.id) in student_ids:
-                    # Check if this student is the requester (first student)
-                    if session.is_public and len(session.students) > 0:
-                        is_requester = str(session.students[0].id) == str(student_profile.id)
-                    
-                    # Query feedback for this session and student
-                    feedback = await SessionFeedback.find_one(
-                        SessionFeedback.session.id == session.id,
-                        SessionFeedback.student.id == student_profile.id
-                    )
-                    if feedback:
-                        feedback_status = feedback.status.value
-        
-        # Build students list with all enrolled students and their participation status
-        students_list = []
-        
-        # If we have participation tracking, use it; otherwise fall back to students list
-        if session.student_participations:
-            for participation in session.student_participations:
-                await participation.student.fetch_link(StudentProfile.user)
-                await participation.student.user.fetch_link(User.sso_info)
-                students_list.append({
-                    "id": str(participation.student.id),
-                    "student_id": participation.student.user.sso_info.identity_id,
-                    "full_name": participation.student.user.full_name,
-                    "status": participation.status.value
-                })
-        else:
-            # Legacy sessions without participation tracking
-            for student_link in session.students:
-                await student_link.fetch_link(StudentProfile.user)
-                await student_link.user.fetch_link(User.sso_info)
+            current_student = await StudentProfile.find_one(StudentProfile.user.id == user.id)
+            if current_student:
+                current_student_id = current_student.id
+                feedbacks = await SessionFeedback.find(
+                    In(SessionFeedback.session.id, [s.id for s in sessions]),
+                    SessionFeedback.student.id == current_student_id
+                ).to_list()
+                feedback_by_session = {fb.session.ref.id: fb.status.value for fb in feedbacks}
+
+        # 5. Build responses from the in-memory maps
+        results = []
+        for session in sessions:
+            tutor = tutors[link_id(session.tutor)]
+            tutor_user = users[link_id(tutor.user)]
+            course = courses[link_id(session.course)]
+            session_student_ids = [link_id(s) for s in session.students]
+
+            # Map negotiation proposal (with ALL fields including capacity/publicity)
+            proposal_res = None
+            if session.proposal:
+                proposal_res = NegotiationResponse(
+                    new_start_time=session.proposal.new_start_time,
+                    new_end_time=session.proposal.new_end_time,
+                    new_mode=session.proposal.new_mode,
+                    new_location=session.proposal.new_location,
+                    tutor_message=session.proposal.tutor_message,
+                    new_max_capacity=session.proposal.new_max_capacity,
+                    new_is_public=session.proposal.new_is_public
+                )
+
+            # Get primary student (first in list) - handle case where all students left
+            student_id = None
+            student_name = None
+            primary = student_identity(session_student_ids[0]) if session_student_ids else None
+            if primary:
+                _, primary_user, primary_sso = primary
+                student_id = primary_sso.identity_id
+                student_name = primary_user.full_name
+
+            # Feedback status and requester flag for the current student
+            feedback_status = None
+            is_requester = None
+            if current_student_id and current_student_id in session_student_ids:
+                if session.is_public:
+                    is_requester = session_student_ids[0] == current_student_id
+                feedback_status = feedback_by_session.get(session.id)
+
+            # Build students list with all enrolled students and their participation status
+            # (participation tracking if present, otherwise legacy students list)
+            if session.student_participations:
+                entries = [
+                    (link_id(p.student), p.status.value) for p in session.student_participations
+                ]
+            else:
+                entries = [(sid, "CONFIRMED") for sid in session_student_ids]
+
+            students_list = []
+            for sid, participation_status in entries:
+                identity = student_identity(sid)
+                if not identity:
+                    continue
+                _, s_user, s_sso = identity
                 students_list.append({
-                    "id": str(student_link.id),
-                    "student_id": student_link.user.sso_info.identity_id,
-                    "full_name": student_link.user.full_name,
-                    "status": "CONFIRMED"  # Default for legacy data
+                    "id": str(sid),
+                    "student_id": s_sso.identity_id,
+                    "full_name": s_user.full_name,
+                    "status": participation_status
                 })
-        
-        # Use snapshot data from User model (DRY - no redundant fetching)
-        return SessionResponse(
-            id=str(session.id),
-            tutor_id=str(tutor.id),
-            tutor_name=tutor.user.full_name,  # Snapshot data
-            student_id=student_id,  # MSSV from SSO (None if no students)
-            student_name=student_name,  # Snapshot data (None if no students)
-            course_code=session.course.code,
-            course_name=session.course.name,
-            topic=session.topic,
-            # Include the original student note (booking request) so UI can show it
-            note=session.note,
-            start_time=session.start_time,
-            end_time=session.end_time,
-            mode=session.mode,
-            location=session.location,
-            status=session.status,
-            proposal=proposal_res,
-            created_at=session.created_at,
-            # Session structure fields
-            session_request_type=session.session_request_type,
-            max_capacity=session.max_capacity,
-            is_public=session.is_public,
-            is_requester=is_requester,
-            # All students in session
-            students=students_list,
-            # Feedback status
-            feedback_status=feedback_status
-        )
+
+            results.append(SessionResponse(
+                id=str(session.id),
+                tutor_id=str(tutor.id),
+                tutor_name=tutor_user.full_name,  # Snapshot data
+                tutor_avatar_url=AvatarService.variant_url(tutor.avatar_variants, tutor.avatar_url, CHIP_AVATAR_SIZE),
+                student_id=student_id,  # MSSV from SSO (None if no students)
+                student_name=student_name,  # Snapshot data (None if no students)
+                course_code=course.code,
+                course_name=course.name,
+                topic=session.topic,
+                # Include the original student note (booking request) so UI can show it
+                note=session.note,
+                start_time=session.start_time,
+                end_time=session.end_time,
+                mode=session.mode,
+                location=session.location,
+                status=session.status,
+                proposal=proposal_res,
+                created_at=session.created_at,
+                # Session structure fields
+                session_request_type=session.session_request_type,
+                max_capacity=session.max_capacity,
+                is_public=session.is_public,
+                is_requester=is_requester,
+                # All students in session
+                students=students_list,
+                # Feedback status
+                feedback_status=feedback_status
+            ))
+
+        return results
     
     # ==========================================
     # 9. UPDATE SESSION LOCATION
@@ -1204,8 +1442,8 @@ class ScheduleService:
         for session in sessions:
             # Apply course filter
             if course_code:
-                await session.fetch_link(TutorSession.course)
-                if course_code.lower() not in session.course.code.lower():
+                course = await MasterDataCache.get_course(session.course)
+                if not course or course_code.lower() not in course.code.lower():
                     continue
             
             # Apply tutor name filter
@@ -1227,7 +1465,7 @@ class ScheduleService:
         # Fetch related data
         await session.fetch_link(TutorSession.tutor)
         await session.tutor.fetch_link(TutorProfile.user)
-        await session.fetch_link(TutorSession.course)
+        course = await MasterDataCache.get_course(session.course)
         
         # Check if student has joined
         is_joined = False
@@ -1241,8 +1479,11 @@ class ScheduleService:
             id=str(session.id),
             tutor_id=str(session.tutor.id),
             tutor_name=session.tutor.user.full_name,
-            course_code=session.course.code,
-            course_name=session.course.name,
+            tutor_avatar_url=AvatarService.variant_url(
+                session.tutor.avatar_variants, session.tutor.avatar_url, CHIP_AVATAR_SIZE
+            ),
+            course_code=course.code,
+            course_name=course.name,
             note=session.note,
             topic=session.topic,
             start_time=session.start_time,
@@ -1313,11 +1554,11 @@ class ScheduleService:
         await session.save()
         
         # 8. Send notification to student
-        await NotificationService.create_system_notification(
-            receiver_user=user,
+        await NotificationService.enqueue(
             n_type=NotificationType.SESSION_CONFIRMED,
             session=session,
-            extra_message="You have successfully joined a public session."
+            extra_message="You have successfully joined a public session.",
+            users=[user]
         )
         
         return await ScheduleService._map_session_response(session, user)
@@ -1429,26 +1670,26 @@ class ScheduleService:
             session.cancelled_by = "all_students_cancelled"
             
             # Notify tutor
-            await session.fetch_link(TutorSession.tutor)
-            await session.tutor.fetch_link(TutorProfile.user)
-            await NotificationService.create_system_notification(
-                receiver_user=session.tutor.user,
+            await NotificationService.enqueue(
                 n_type=NotificationType.SESSION_CANCELLED,
                 session=session,
-                extra_message="All students have cancelled their participation. The session has been cancelled."
+                extra_message="All students have cancelled their participation. The session has been cancelled.",
+                tutors=[session.tutor]
             )
             
             message += " The session has been cancelled as all students have cancelled."
         
         await session.save()
+        TutorIntervalIndex.sync_session(ScheduleService._link_id(session.tutor), session)
+        await ScheduleService._publish_status_change(session, SessionStatus.CONFIRMED)
         
         # Notify student
         notification_type = NotificationType.SESSION_CANCELLED if cancelled_flag else NotificationType.SESSION_CONFIRMED
-        await NotificationService.create_system_notification(
-            receiver_user=user,
+        await NotificationService.enqueue(
             n_type=notification_type,
             session=session,
-            extra_message=message
+            extra_message=message,
+            users=[user]
         )
         
         return {
@@ -0,0 +1,304 @@
+from datetime import datetime, timezone
+from typing import Iterable, List, Set, Tuple
+
+from beanie import PydanticObjectId
+from beanie.operators import In
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+# Models
+from app.models.internal.tutor_profile import TutorProfile
+from app.models.internal.student_profile import StudentProfile
+from app.models.internal.session import TutorSession, SessionStatus
+from app.models.internal.attendance import AttendanceLog
+from app.models.internal.tutor_student_pair import TutorStudentPair
+from app.models.internal.applied_event import AppliedEvent
+
+# Events
+from app.core.events import EventBus, EventType, SessionCompleted, FeedbacksFinalized, AttendanceMarked
+
+# Services
+from app.services.tutor_search_view_service import TutorSearchViewService
+
+
+# Max pair rows inserted per bulk_write by the backfill
+PAIR_BACKFILL_BATCH_SIZE = 1000
+
+
+_DUPLICATE_KEY = 11000
+
+
+# First pipeline stage of every student update: profiles written before
+# attended_sessions existed derive it from the stored rate
+_INIT_ATTENDED_SESSIONS = {"$set": {
+    "stats.attended_sessions": {"$ifNull": [
+        "$stats.attended_sessions",
+        {"$round": [{"$divide": [
+            {"$multiply": [{"$ifNull": ["$stats.attendance_rate", 100]}, "$stats.total_sessions"]}, 100
+        ]}, 0]}
+    ]}
+}}
+
+# Last pipeline stage of every student update
+_DERIVE_ATTENDANCE_RATE = {"$set": {
+    "stats.attendance_rate": {"$cond": [
+        {"$gt": ["$stats.total_sessions", 0]},
+        {"$toInt": {"$min": [100, {"$round": [{"$divide": [
+            {"$multiply": ["$stats.attended_sessions", 100]}, "$stats.total_sessions"
+        ]}, 0]}]}},
+        100
+    ]}
+}}
+
+
+class StatsProjector:
+    """
+    Keeps TutorProfile.stats and StudentProfile.stats current from domain events.
+
+    Every change is one atomic update per profile, applied only after the
+    (event id, profile) pair was claimed in AppliedEvent, so redelivered or
+    re-published events are no-ops. Event ids of one-time facts are derived
+    from their source document (session id + transition, attendance log id).
+    Distinct counters (total_students / total_tutors_met) go through the
+    TutorStudentPair ledger. A crash between claim and update loses that one
+    change; the recalculation endpoints remain the repair path.
+
+    Roster changes need no projection: stats only count sessions once they
+    complete, and SessionCompleted carries the final roster.
+    """
+
+    # ==========================================
+    # LIFECYCLE
+    # ==========================================
+    @staticmethod
+    def register():
+        """Subscribes the projector to the event bus (called once in lifespan)."""
+        EventBus.subscribe(EventType.SESSION_COMPLETED, StatsProjector.on_sessions_completed)
+        EventBus.subscribe(EventType.FEEDBACKS_FINALIZED, StatsProjector.on_feedbacks_finalized)
+        EventBus.subscribe(EventType.ATTENDANCE_MARKED, StatsProjector.on_attendance_marked)
+
+    @staticmethod
+    async def ensure_pairs():
+        """Backfills the pair ledger on first start (empty collection), otherwise does nothing."""
+        if await TutorStudentPair.find_one() is None:
+            count = await StatsProjector.backfill_pairs()
+            if count:
+                print(f"✅ Backfilled {count} tutor-student pair(s)")
+
+    @staticmethod
+    async def backfill_pairs() -> int:
+        """
+        Adds every (tutor, student) pair of the completed sessions to the ledger.
+        Idempotent; run after data was imported around the event bus (seeds, scripts).
+        """
+        rows = await TutorSession.aggregate([
+            {"$match": {"status": SessionStatus.COMPLETED.value}},
+            {"$unwind": "$students"},
+            {"$group": {"_id": {"tutor": "$tutor", "student": "$students"}}}
+        ]).to_list()
+        pairs = [(row["_id"]["tutor"].id, row["_id"]["student"].id) for row in rows]
+
+        collection = TutorStudentPair.get_motor_collection()
+        for i in range(0, len(pairs), PAIR_BACKFILL_BATCH_SIZE):
+            await collection.bulk_write([
+                UpdateOne(
+                    {"tutor_id": tutor_id, "student_id": student_id},
+                    {"$setOnInsert": {"first_event_id": None, "first_met_at": datetime.now(timezone.utc)}},
+                    upsert=True
+                )
+                for tutor_id, student_id in pairs[i:i + PAIR_BACKFILL_BATCH_SIZE]
+            ], ordered=False)
+        return len(pairs)
+
+    # ==========================================
+    # HANDLERS
+    # ==========================================
+    @staticmethod
+    async def on_sessions_completed(events: List[SessionCompleted]):
+        """
+        Per session: tutor total_sessions +1 and total_students + new pairs; per
+        student: total_sessions +1, learning hours, total_tutors_met if the pair is
+        new, attended_sessions if a check-in was already logged.
+        """
+        first_meetings = await StatsProjector._record_pairs(events)
+        claimed = await StatsProjector._claim(
+            (event.event_id, profile_id)
+            for event in events
+            for profile_id in [event.tutor_id, *event.student_ids]
+        )
+
+        attended = {
+            (doc["session_ref"].id, doc["student_ref"].id)
+            async for doc in AttendanceLog.get_motor_collection().find(
+                {"session_ref.$id": {"$in": [e.session_id for e in events]}},
+                {"session_ref": 1, "student_ref": 1}
+            )
+        }
+
+        tutor_ops = []
+        student_ops = []
+        for event in events:
+            students = list(dict.fromkeys(event.student_ids))
+            new_students = sum(1 for s in students if (event.tutor_id, s, event.event_id) in first_meetings)
+            if (event.event_id, event.tutor_id) in claimed:
+                tutor_ops.append(UpdateOne(
+                    {"_id": event.tutor_id},
+                    [{"$set": {
+                        "stats.total_sessions": {"$add": ["$stats.total_sessions", 1]},
+                        "stats.total_students": {"$add": ["$stats.total_students", new_students]}
+                    }}]
+                ))
+            for student_id in students:
+                if (event.event_id, student_id) not in claimed:
+                    continue
+                is_new_tutor = (event.tutor_id, student_id, event.event_id) in first_meetings
+                student_ops.append(UpdateOne(
+                    {"_id": student_id},
+                    [
+                        _INIT_ATTENDED_SESSIONS,
+                        {"$set": {
+                            "stats.total_sessions": {"$add": ["$stats.total_sessions", 1]},
+                            "stats.total_learning_hours": {"$round": [
+                                {"$add": ["$stats.total_learning_hours", event.duration_hours]}, 2
+                            ]},
+                            "stats.total_tutors_met": {"$add": ["$stats.total_tutors_met", 1 if is_new_tutor else 0]},
+                            "stats.attended_sessions": {"$add": [
+                                "$stats.attended_sessions",
+                                1 if (event.session_id, student_id) in attended else 0
+                            ]}
+                        }},
+                        _DERIVE_ATTENDANCE_RATE
+                    ]
+                ))
+
+        if tutor_ops:
+            await TutorProfile.get_motor_collection().bulk_write(tutor_ops, ordered=False)
+        if student_ops:
+            await StudentProfile.get_motor_collection().bulk_write(student_ops, ordered=False)
+        await StatsProjector._refresh_search_view(e.tutor_id for e in events)
+
+    @staticmethod
+    async def on_feedbacks_finalized(events: List[FeedbacksFinalized]):
+        """
+        Adds rating deltas to tutor stats. total_feedbacks and rating_sum are
+        incremented server-side and average_rating is re-derived from them in the
+        same atomic pipeline update. Profiles written before rating_sum existed
+        start from average_rating * total_feedbacks.
+        """
+        claimed = await StatsProjector._claim((event.event_id, event.tutor_id) for event in events)
+        operations = [
+            UpdateOne(
+                {"_id": event.tutor_id},
+                [
+                    {"$set": {
+                        "stats.rating_sum": {"$add": [
+                            {"$ifNull": [
+                                "$stats.rating_sum",
+                                {"$multiply": ["$stats.average_rating", "$stats.total_feedbacks"]}
+                            ]},
+                            event.rating_sum
+                        ]},
+                        "stats.total_feedbacks": {"$add": ["$stats.total_feedbacks", event.count]}
+                    }},
+                    {"$set": {
+                        "stats.average_rating": {"$cond": [
+                            {"$gt": ["$stats.total_feedbacks", 0]},
+                            {"$round": [{"$divide": ["$stats.rating_sum", "$stats.total_feedbacks"]}, 2]},
+                            0.0
+                        ]}
+                    }}
+                ]
+            )
+            for event in events
+            if (event.event_id, event.tutor_id) in claimed
+        ]
+        if operations:
+            await TutorProfile.get_motor_collection().bulk_write(operations, ordered=False)
+        await StatsProjector._refresh_search_view(e.tutor_id for e in events)
+
+    @staticmethod
+    async def on_attendance_marked(events: List[AttendanceMarked]):
+        """Late check-ins on already completed sessions raise attended_sessions."""
+        claimed = await StatsProjector._claim(
+            (event.event_id, event.student_id) for event in events if event.session_completed
+        )
+        operations = [
+            UpdateOne(
+                {"_id": event.student_id},
+                [
+                    _INIT_ATTENDED_SESSIONS,
+                    {"$set": {"stats.attended_sessions": {"$add": ["$stats.attended_sessions", 1]}}},
+                    _DERIVE_ATTENDANCE_RATE
+                ]
+            )
+            for event in events
+            if (event.event_id, event.student_id) in claimed
+        ]
+        if operations:
+            await StudentProfile.get_motor_collection().bulk_write(operations, ordered=False)
+
+    # ==========================================
+    # INTERNAL HELPERS
+    # ==========================================
+    @staticmethod
+    async def _claim(targets: Iterable[Tuple[str, PydanticObjectId]]) -> Set[Tuple[str, PydanticObjectId]]:
+        """
+        Inserts an AppliedEvent row per (event_id, profile_id) and returns the
+        pairs inserted by this call; pairs an earlier delivery already claimed
+        hit the unique index and are left out.
+        """
+        targets = list(dict.fromkeys(targets))
+        if not targets:
+            return set()
+
+        now = datetime.now(timezone.utc)
+        try:
+            await AppliedEvent.get_motor_collection().insert_many(
+                [{"event_id": event_id, "profile_id": profile_id, "applied_at": now} for event_id, profile_id in targets],
+                ordered=False
+            )
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            if any(error["code"] != _DUPLICATE_KEY for error in errors):
+                raise
+            duplicates = {error["index"] for error in errors}
+            return {target for i, target in enumerate(targets) if i not in duplicates}
+        return set(targets)
+
+    @staticmethod
+    async def _record_pairs(events: List[SessionCompleted]) -> Set[Tuple[PydanticObjectId, PydanticObjectId, str]]:
+        """
+        Upserts the (tutor, student) pairs of the events and returns the
+        (tutor_id, student_id, event_id) triples whose pair row was created by that
+        event, including rows created by an earlier delivery of the same event.
+        """
+        operations = [
+            UpdateOne(
+                {"tutor_id": event.tutor_id, "student_id": student_id},
+                {"$setOnInsert": {"first_event_id": event.event_id, "first_met_at": event.occurred_at}},
+                upsert=True
+            )
+            for event in events
+            for student_id in event.student_ids
+        ]
+        if not operations:
+            return set()
+
+        collection = TutorStudentPair.get_motor_collection()
+        await collection.bulk_write(operations, ordered=False)
+        return {
+            (doc["tutor_id"], doc["student_id"], doc["first_event_id"])
+            async for doc in collection.find(
+                {"first_event_id": {"$in": [e.event_id for e in events]}},
+                {"tutor_id": 1, "student_id": 1, "first_event_id": 1}
+            )
+        }
+
+    @staticmethod
+    async def _refresh_search_view(tutor_ids: Iterable[PydanticObjectId]):
+        """Copies the new stats of the affected tutors into the search read model."""
+        tutor_ids = list(set(tutor_ids))
+        if not tutor_ids:
+            return
+        for tutor in await TutorProfile.find(In(TutorProfile.id, tutor_ids)).to_list():
+            await TutorSearchViewService.refresh_stats(tutor)
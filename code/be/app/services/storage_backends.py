@@ -0,0 +1,306 @@
+"""
+Storage backends used by StorageService.
+
+A backend stores an already size-checked upload stream and deletes it again by
+public id. CloudinaryBackend is the production default; LocalStorageBackend
+is a deduplicating content-addressed store on disk (served with range support
+under LOCAL_STORAGE_URL by routes/files.py) for tests, offline deployments and
+sites where the same files are uploaded repeatedly. Blocking SDK / disk calls
+run in a bounded thread pool so an upload never stalls the event loop.
+"""
+import asyncio
+import functools
+import mimetypes
+import os
+import re
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import BinaryIO, Dict, Optional, Tuple
+
+import cloudinary
+import cloudinary.exceptions
+import cloudinary.uploader
+from cloudinary.utils import cloudinary_url
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+# Models
+from app.models.internal.stored_blob import StoredBlob
+
+
+# Videos above this size go through Cloudinary's chunked upload API
+CHUNKED_UPLOAD_THRESHOLD_BYTES = 20 * 1024 * 1024
+
+# Part size of chunked uploads (Cloudinary requires at least 5MB)
+UPLOAD_CHUNK_SIZE_BYTES = 6 * 1024 * 1024
+
+# Buffer size when copying an upload to disk
+COPY_BUFFER_BYTES = 1024 * 1024
+
+_DIGEST = re.compile(r"[0-9a-f]{64}")
+
+# Shared by all backends; bounded so a burst of uploads queues instead of
+# starting an unbounded number of threads
+_executor = ThreadPoolExecutor(
+    max_workers=settings.STORAGE_UPLOAD_WORKERS,
+    thread_name_prefix="storage"
+)
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Runs a blocking storage call in the storage thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+
+class StorageError(Exception):
+    """A backend failed to store or delete a file (mapped to HTTP 500 by StorageService)."""
+
+
+class StorageBackend:
+    """Interface of a file storage backend."""
+
+    async def upload(
+        self,
+        stream: BinaryIO,
+        size: int,
+        filename: str,
+        folder: str,
+        resource_type: str,
+        digest: str
+    ) -> Dict:
+        """
+        Stores the stream (positioned at 0, `size` bytes, SHA-256 hex `digest`).
+
+        Returns:
+            Dictionary with secure_url, public_id, resource_type and bytes
+        """
+        raise NotImplementedError
+
+    async def delete(self, public_id: str, resource_type: str = "raw") -> bool:
+        """Deletes a stored file; False if it did not exist."""
+        raise NotImplementedError
+
+    def url(self, public_id: str, transformations: Optional[Dict] = None) -> str:
+        """Public URL of a stored file."""
+        raise NotImplementedError
+
+
+class CloudinaryBackend(StorageBackend):
+    """Cloudinary storage (configured once from the Cloudinary settings)."""
+
+    def __init__(self):
+        cloudinary.config(
+            cloud_name=settings.CLOUD_NAME,
+            api_key=settings.CLOUDINARY_API_KEY,
+            api_secret=settings.CLOUDINARY_API_SECRET,
+            secure=True
+        )
+
+    async def upload(self, stream, size, filename, folder, resource_type, digest):
+        options = dict(
+            folder=folder,
+            resource_type=resource_type,
+            filename=filename,
+            use_filename=True,
+            unique_filename=True,
+            overwrite=False
+        )
+        try:
+            if resource_type == "video" and size > CHUNKED_UPLOAD_THRESHOLD_BYTES:
+                result = await run_blocking(
+                    cloudinary.uploader.upload_large, stream, chunk_size=UPLOAD_CHUNK_SIZE_BYTES, **options
+                )
+            else:
+                result = await run_blocking(cloudinary.uploader.upload, stream, **options)
+        except cloudinary.exceptions.Error as e:
+            raise StorageError(f"Cloudinary upload failed: {str(e)}")
+
+        return {
+            "secure_url": result.get("secure_url"),
+            "public_id": result.get("public_id"),
+            "resource_type": result.get("resource_type"),
+            "bytes": result.get("bytes", size)
+        }
+
+    async def delete(self, public_id, resource_type="raw"):
+        try:
+            result = await run_blocking(
+                cloudinary.uploader.destroy, public_id, resource_type=resource_type, invalidate=True
+            )
+        except cloudinary.exceptions.Error as e:
+            raise StorageError(f"Cloudinary deletion failed: {str(e)}")
+        return result.get("result") == "ok"
+
+    def url(self, public_id, transformations=None):
+        url, _ = cloudinary_url(public_id, **(transformations or {}))
+        return url
+
+
+class LocalStorageBackend(StorageBackend):
+    """
+    Content-addressed store under a local directory. Each distinct content is
+    written once, at <root>/<aa>/<bb>/<sha256>, and its public id is the digest
+    (the folder is not part of the layout). StoredBlob counts the references:
+    uploading content that is already stored only adds a reference (no copy),
+    and delete() releases one, removing the file with the last.
+
+    The upload that creates (or revives) a record always writes the file, and
+    the last release moves the file aside before dropping the record and puts
+    it back if an upload referenced the digest meanwhile, so a release racing
+    with a re-upload of the same content never loses the file.
+    """
+
+    def __init__(self, root: str, base_url: str):
+        self.root = os.path.abspath(root)
+        self.base_url = base_url.rstrip("/")
+        os.makedirs(os.path.join(self.root, "tmp"), exist_ok=True)
+
+    def path(self, digest: str) -> str:
+        """Location of a blob (StorageError if the public id is not a digest)."""
+        if not _DIGEST.fullmatch(digest):
+            raise StorageError(f"Invalid public id: {digest}")
+        return os.path.join(self.root, digest[:2], digest[2:4], digest)
+
+    def _write(self, stream: BinaryIO, path: str):
+        """Copies the stream to path through a temporary file (no partial blobs)."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = os.path.join(self.root, "tmp", uuid.uuid4().hex)
+        try:
+            with open(tmp_path, "wb") as out:
+                while True:
+                    chunk = stream.read(COPY_BUFFER_BYTES)
+                    if not chunk:
+                        break
+                    out.write(chunk)
+            # Atomic; a concurrent writer of the same digest wrote the same bytes
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _detach(self, path: str) -> Optional[str]:
+        """Moves a blob aside (atomic rename) and returns its new path; None if missing."""
+        aside = os.path.join(self.root, "tmp", uuid.uuid4().hex)
+        try:
+            os.replace(path, aside)
+            return aside
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    @staticmethod
+    async def _add_reference(digest: str, size: int, content_type: str) -> dict:
+        """Counts one more reference to the digest (creating its StoredBlob)."""
+        now = datetime.now(timezone.utc)
+        update = {
+            "$inc": {"ref_count": 1},
+            "$set": {"last_referenced_at": now},
+            "$setOnInsert": {"size": size, "content_type": content_type, "created_at": now}
+        }
+        collection = StoredBlob.get_motor_collection()
+        try:
+            return await collection.find_one_and_update(
+                {"digest": digest}, update, upsert=True, return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # A concurrent upload inserted it first; now the filter matches
+            return await collection.find_one_and_update(
+                {"digest": digest}, update, return_document=ReturnDocument.AFTER
+            )
+
+    @staticmethod
+    async def _release_reference(digest: str) -> Optional[int]:
+        """Drops one reference; returns the remaining count (None if unknown)."""
+        blob = await StoredBlob.get_motor_collection().find_one_and_update(
+            {"digest": digest, "ref_count": {"$gt": 0}},
+            {"$inc": {"ref_count": -1}},
+            return_document=ReturnDocument.AFTER
+        )
+        return blob["ref_count"] if blob else None
+
+    async def upload(self, stream, size, filename, folder, resource_type, digest):
+        path = self.path(digest)
+        content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        blob = await self._add_reference(digest, size, content_type)
+        try:
+            # The first reference writes even if a file is still there: a release
+            # of the previous record may be about to remove it
+            if blob["ref_count"] == 1 or not await run_blocking(os.path.exists, path):
+                await run_blocking(self._write, stream, path)
+        except OSError as e:
+            await self._release_reference(digest)
+            raise StorageError(f"Local upload failed: {str(e)}")
+
+        return {
+            "secure_url": self.url(digest),
+            "public_id": digest,
+            "resource_type": resource_type,
+            "bytes": size
+        }
+
+    async def delete(self, public_id, resource_type="raw"):
+        if not _DIGEST.fullmatch(public_id):
+            return False
+        remaining = await self._release_reference(public_id)
+        if remaining is None:
+            return False
+        if remaining == 0:
+            path = self.path(public_id)
+            try:
+                # Moved aside before the record is dropped: an upload referencing the
+                # digest in between keeps the record alive and the file is put back
+                aside = await run_blocking(self._detach, path)
+                result = await StoredBlob.get_motor_collection().delete_one({"digest": public_id, "ref_count": 0})
+                if aside is not None:
+                    if result.deleted_count:
+                        await run_blocking(self._remove, aside)
+                    else:
+                        # Same content as anything written meanwhile, so replacing is safe
+                        await run_blocking(os.replace, aside, path)
+            except OSError as e:
+                raise StorageError(f"Local deletion failed: {str(e)}")
+        return True
+
+    async def locate(self, public_id: str) -> Optional[Tuple[str, dict]]:
+        """Path and StoredBlob record of a referenced blob, or None."""
+        if not _DIGEST.fullmatch(public_id):
+            return None
+        blob = await StoredBlob.get_motor_collection().find_one({"digest": public_id, "ref_count": {"$gt": 0}})
+        if blob is None:
+            return None
+        path = self.path(public_id)
+        if not await run_blocking(os.path.exists, path):
+            return None
+        return path, blob
+
+    def url(self, public_id, transformations=None):
+        return f"{self.base_url}/{public_id}"
+
+
+async def iter_file_range(path: str, start: int, end: int, chunk_size: int = COPY_BUFFER_BYTES):
+    """Yields bytes start..end (inclusive) of a file, reading in a worker thread."""
+    handle = await run_in_threadpool(open, path, "rb")
+    try:
+        await run_in_threadpool(handle.seek, start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await run_in_threadpool(handle.read, min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        await run_in_threadpool(handle.close)
@@ -1,174 +1,252 @@
-from typing import Dict, Optional
+import hashlib
+import io
+from typing import BinaryIO, Dict, Optional, Tuple
 from fastapi import UploadFile, HTTPException, status
-import cloudinary
-import cloudinary.uploader
-from cloudinary.utils import cloudinary_url
 
 from app.core.config import settings
 
+# Services
+from app.services.storage_backends import (
+    StorageBackend, CloudinaryBackend, LocalStorageBackend, StorageError, run_blocking
+)
+
+
+# Bytes read per step when measuring and hashing an upload
+READ_CHUNK_BYTES = 1024 * 1024
+
+# Map extensions to storage resource types
+IMAGE_EXTENSIONS = ['jpg', 'jpeg', 'png', 'gif', 'bmp', 'webp', 'svg']
+VIDEO_EXTENSIONS = ['mp4', 'mov', 'avi', 'wmv', 'flv', 'webm']
+
+# Content types the local file route displays inline; everything else (SVG,
+# HTML, PDF, ...) could run script on the API origin and is sent as a download
+INLINE_CONTENT_TYPES = {'image/jpeg', 'image/png', 'image/gif', 'image/webp', 'image/bmp'}
+
 
 class StorageService:
     """
-    Service for managing external file storage using Cloudinary.
-    Handles upload and deletion of resources.
+    Service for managing file storage.
+    Handles upload and deletion of resources on the configured backend
+    (STORAGE_BACKEND: "cloudinary" or "local").
     """
-    
-    _configured = False
-    
+
+    _backend: Optional[StorageBackend] = None
+
     @staticmethod
-    def _configure_cloudinary():
+    def backend() -> StorageBackend:
         """
-        Configures Cloudinary with credentials from environment variables.
-        Only configures once per application lifecycle.
+        Returns the configured storage backend.
+        Only created once per application lifecycle.
         """
-        if not StorageService._configured:
-            cloudinary.config(
-                cloud_name=settings.CLOUD_NAME,
-                api_key=settings.CLOUDINARY_API_KEY,
-                api_secret=settings.CLOUDINARY_API_SECRET,
-                secure=True
-            )
-            StorageService._configured = True
-    
+        if StorageService._backend is None:
+            if settings.STORAGE_BACKEND == "local":
+                StorageService._backend = LocalStorageBackend(
+                    settings.LOCAL_STORAGE_DIR, settings.LOCAL_STORAGE_URL
+                )
+            elif settings.STORAGE_BACKEND == "cloudinary":
+                StorageService._backend = CloudinaryBackend()
+            else:
+                raise ValueError(f"Unknown STORAGE_BACKEND: {settings.STORAGE_BACKEND}")
+        return StorageService._backend
+
+    @staticmethod
+    def resource_type_for(filename: str) -> str:
+        """Storage resource type (image, video or raw) from the file extension."""
+        extension = filename.split('.')[-1].lower() if '.' in filename else ''
+        if extension in IMAGE_EXTENSIONS:
+            return "image"
+        if extension in VIDEO_EXTENSIONS:
+            return "video"
+        return "raw"  # For PDFs, documents, etc.
+
+    @staticmethod
+    def _scan(stream: BinaryIO, max_size: int) -> Optional[Tuple[int, str]]:
+        """
+        Size and SHA-256 of a stream, read chunk by chunk (never the whole file
+        at once). Stops as soon as max_size is exceeded (returns None).
+        Blocking: runs in the storage thread pool.
+        """
+        stream.seek(0)
+        digest = hashlib.sha256()
+        size = 0
+        while True:
+            chunk = stream.read(READ_CHUNK_BYTES)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_size:
+                return None
+            digest.update(chunk)
+        stream.seek(0)
+        return size, digest.hexdigest()
+
+    @staticmethod
+    async def _scan_upload(file: UploadFile, max_size: int) -> Tuple[int, str]:
+        """
+        Size and SHA-256 hex digest of the upload.
+
+        Raises:
+            HTTPException: 413 if the file is larger than max_size
+        """
+        too_large = HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File size exceeds maximum allowed size of {max_size / 1024 / 1024}MB"
+        )
+        # Known from the multipart parser: reject without reading anything
+        if file.size is not None and file.size > max_size:
+            raise too_large
+
+        scanned = await run_blocking(StorageService._scan, file.file, max_size)
+        if scanned is None:
+            raise too_large
+        return scanned
+
     @staticmethod
     async def upload_document(file: UploadFile, folder: str = "tutor-system") -> Dict[str, str]:
         """
-        Uploads a file to Cloudinary and returns the secure URL and public ID.
-        
+        Uploads a file to the storage backend and returns the secure URL and public ID.
+        The file is streamed to the backend from its spooled temporary file;
+        large videos are sent in chunks.
+
         Args:
             file: The file to upload (FastAPI UploadFile object)
-            folder: The Cloudinary folder to upload to (default: "tutor-system")
-            
+            folder: The storage folder to upload to (default: "tutor-system")
+
         Returns:
             Dictionary containing:
                 - secure_url: The HTTPS URL to access the file
-                - public_id: The Cloudinary public ID for management/deletion
+                - public_id: The storage public ID for management/deletion
                 - resource_type: The type of resource (image, raw, video, etc.)
                 - bytes: File size in bytes
-                
+
         Raises:
             HTTPException: If upload fails or file is invalid
         """
-        # Ensure Cloudinary is configured
-        StorageService._configure_cloudinary()
-        
+        filename = file.filename or "unknown"
+        resource_type = StorageService.resource_type_for(filename)
+
+        # Videos may be larger (chunked upload); everything else max 10MB by default
+        max_mb = settings.STORAGE_MAX_VIDEO_UPLOAD_MB if resource_type == "video" else settings.STORAGE_MAX_UPLOAD_MB
+
         try:
-            # Read file content
-            file_content = await file.read()
-            
-            # Validate file size (max 10MB for non-premium accounts)
-            max_size = 10 * 1024 * 1024  # 10MB
-            if len(file_content) > max_size:
-                raise HTTPException(
-                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                    detail=f"File size exceeds maximum allowed size of {max_size / 1024 / 1024}MB"
-                )
-            
-            # Determine resource type based on file extension
-            filename = file.filename or "unknown"
-            extension = filename.split('.')[-1].lower() if '.' in filename else ''
-            
-            # Map extensions to Cloudinary resource types
-            image_extensions = ['jpg', 'jpeg', 'png', 'gif', 'bmp', 'webp', 'svg']
-            video_extensions = ['mp4', 'mov', 'avi', 'wmv', 'flv', 'webm']
-            
-            if extension in image_extensions:
-                resource_type = "image"
-            elif extension in video_extensions:
-                resource_type = "video"
-            else:
-                resource_type = "raw"  # For PDFs, documents, etc.
-            
-            # Upload to Cloudinary
-            upload_result = cloudinary.uploader.upload(
-                file_content,
-                folder=folder,
-                resource_type=resource_type,
-                use_filename=True,
-                unique_filename=True,
-                overwrite=False
+            size, digest = await StorageService._scan_upload(file, max_mb * 1024 * 1024)
+            return await StorageService._upload_stream(file.file, size, digest, filename, folder)
+        finally:
+            # Reset file pointer for potential reuse (chunked uploads close the stream)
+            if not file.file.closed:
+                await file.seek(0)
+
+    @staticmethod
+    async def upload_bytes(data: bytes, filename: str, folder: str = "tutor-system") -> Dict[str, str]:
+        """
+        Uploads content generated by the server (e.g. avatar thumbnails).
+        Same result as upload_document; the resource type follows the filename.
+        """
+        return await StorageService._upload_stream(
+            io.BytesIO(data), len(data), hashlib.sha256(data).hexdigest(), filename, folder
+        )
+
+    @staticmethod
+    async def _upload_stream(stream: BinaryIO, size: int, digest: str, filename: str, folder: str) -> Dict[str, str]:
+        resource_type = StorageService.resource_type_for(filename)
+        try:
+            return await StorageService.backend().upload(
+                stream, size, filename, folder, resource_type, digest
             )
-            
-            # Extract and return relevant information
-            return {
-                "secure_url": upload_result.get("secure_url"),
-                "public_id": upload_result.get("public_id"),
-                "resource_type": upload_result.get("resource_type"),
-                "bytes": upload_result.get("bytes", 0)
-            }
-            
-        except cloudinary.exceptions.Error as e:
+
+        except HTTPException:
+            raise
+        except StorageError as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Cloudinary upload failed: {str(e)}"
+                detail=str(e)
             )
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"File upload failed: {str(e)}"
             )
-        finally:
-            # Reset file pointer for potential reuse
-            await file.seek(0)
-    
+
     @staticmethod
     async def delete_resource(public_id: str, resource_type: str = "raw") -> bool:
         """
-        Deletes a resource from Cloudinary using its public ID.
-        
+        Deletes a resource from the storage backend using its public ID.
+        On the local content-addressed backend this releases one reference;
+        the file is only removed when nothing else uses the same content.
+
         Args:
-            public_id: The Cloudinary public ID of the resource
+            public_id: The storage public ID of the resource
             resource_type: The type of resource (image, raw, video)
-            
+
         Returns:
             True if deletion was successful, False otherwise
-            
+
         Raises:
             HTTPException: If deletion fails
         """
-        # Ensure Cloudinary is configured
-        StorageService._configure_cloudinary()
-        
         try:
-            result = cloudinary.uploader.destroy(
-                public_id,
-                resource_type=resource_type,
-                invalidate=True
-            )
-            
-            # Check if deletion was successful
-            if result.get("result") == "ok":
-                return True
-            else:
-                return False
-                
-        except cloudinary.exceptions.Error as e:
+            return await StorageService.backend().delete(public_id, resource_type)
+        except StorageError as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Cloudinary deletion failed: {str(e)}"
+                detail=str(e)
             )
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Resource deletion failed: {str(e)}"
             )
-    
+
     @staticmethod
     def generate_optimized_url(public_id: str, transformations: Optional[Dict] = None) -> str:
         """
-        Generates an optimized URL for a Cloudinary resource with transformations.
-        
+        Generates an optimized URL for a stored resource with transformations.
+
         Args:
-            public_id: The Cloudinary public ID
-            transformations: Optional transformation parameters
-            
+            public_id: The storage public ID
+            transformations: Optional transformation parameters (Cloudinary only)
+
         Returns:
-            Optimized Cloudinary URL
+            Optimized resource URL
         """
-        StorageService._configure_cloudinary()
-        
-        url, _ = cloudinary_url(
-            public_id,
-            **(transformations or {})
-        )
-        return url
+        return StorageService.backend().url(public_id, transformations)
+
+    # ==========================================
+    # LOCAL FILE SERVING
+    # ==========================================
+    @staticmethod
+    def is_inline_safe(content_type: str) -> bool:
+        """Whether a stored file may be displayed by the browser (raster images and videos)."""
+        content_type = content_type.split(";")[0].strip().lower()
+        return content_type in INLINE_CONTENT_TYPES or content_type.startswith("video/")
+
+    @staticmethod
+    def parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+        """
+        Parses a single-range "bytes=" Range header into inclusive (start, end).
+        Returns None when the whole file should be sent (no header, several
+        ranges or another unit).
+
+        Raises:
+            HTTPException: 416 if the range lies outside the file
+        """
+        if not range_header or not range_header.startswith("bytes=") or "," in range_header:
+            return None
+        first, _, last = range_header[len("bytes="):].strip().partition("-")
+        try:
+            if first:
+                start = int(first)
+                end = min(int(last), size - 1) if last else size - 1
+            else:
+                # Suffix range: the last N bytes
+                start = max(size - int(last), 0)
+                end = size - 1
+        except ValueError:
+            return None
+        if start > end or start >= size:
+            raise HTTPException(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                detail="Requested range not satisfiable",
+                headers={"Content-Range": f"bytes */{size}"}
+            )
+        return start, end
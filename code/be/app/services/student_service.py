@@ -1,7 +1,8 @@
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timezone
 from fastapi import HTTPException, status
 from beanie import PydanticObjectId, Link
+from pymongo import UpdateOne
 
 # Models
 from app.models.internal.user import User
@@ -11,6 +12,9 @@ from app.models.internal.session import TutorSession, SessionStatus
 # Schemas
 from app.models.schemas.student import StudentResponse, StudentUpdateRequest, StudentStatsResponse
 
+# Max student profiles written per bulk_write by the stats recalculation
+STATS_WRITE_BATCH_SIZE = 1000
+
 class StudentService:
     
     @staticmethod
@@ -128,11 +132,13 @@ class StudentService:
         """
         Recalculates learning statistics for student(s) based on completed sessions.
         
-        Similar to tutor stats recalculation, this method:
-        - Counts COMPLETED sessions where student participated
-        - Calculates total learning hours from session durations
-        - Counts unique tutors the student has worked with
-        - Calculates attendance rate (currently defaults to 100% - can be enhanced)
+        Runs one aggregation over COMPLETED sessions ($unwind students) for:
+        - Completed session count per student
+        - Total learning hours from session durations
+        - Unique tutors the student has worked with
+        and one over attendance logs for the attendance rate (sessions with a check-in
+        / completed sessions). Only students whose stats changed are written, with
+        batched bulk_write calls.
         
         Args:
             student_id: Optional specific student profile ID. If None, recalculates for all students.
@@ -140,54 +146,85 @@ class StudentService:
         Returns:
             Number of student profiles updated
         """
-        # Get student profiles to update
+        from app.models.internal.attendance import AttendanceLog
+        
+        # Scope: one student or everyone
+        profile_filter = {}
+        session_scope = {}
+        attendance_scope = {}
         if student_id:
             student = await StudentProfile.get(student_id)
             if not student:
                 raise HTTPException(status.HTTP_404_NOT_FOUND, "Student profile not found")
-            students = [student]
-        else:
-            students = await StudentProfile.find_all().to_list()
+            profile_filter = {"_id": student.id}
+            session_scope = {"students.$id": student.id}
+            attendance_scope = {"student_ref.$id": student.id}
         
-        updated_count = 0
+        # 1. Sessions, hours and distinct tutors per student
+        learning_by_student = {
+            row["_id"].id: row
+            for row in await TutorSession.aggregate([
+                {"$match": {**session_scope, "status": SessionStatus.COMPLETED.value}},
+                {"$unwind": "$students"},
+                {"$match": session_scope},
+                {"$group": {
+                    "_id": "$students",
+                    "total_sessions": {"$sum": 1},
+                    "total_ms": {"$sum": {"$subtract": ["$end_time", "$start_time"]}},
+                    "tutors": {"$addToSet": "$tutor"}
+                }},
+                {"$project": {"total_sessions": 1, "total_ms": 1, "total_tutors": {"$size": "$tutors"}}}
+            ]).to_list()
+        }
         
-        for student in students:
-            # Get all COMPLETED sessions for this student
-            completed_sessions = await TutorSession.find(
-                TutorSession.students.id == student.id,
-                TutorSession.status == SessionStatus.COMPLETED
-            ).to_list()
-            
-            # Calculate stats
-            total_sessions = len(completed_sessions)
-            
-            # Calculate total learning hours
-            total_hours = 0.0
-            for session in completed_sessions:
-                duration = (session.end_time - session.start_time).total_seconds() / 3600
-                total_hours += duration
-            
-            # Count unique tutors
-            unique_tutor_ids = set()
-            for session in completed_sessions:
-                await session.fetch_link(TutorSession.tutor)
-                unique_tutor_ids.add(str(session.tutor.id))
-            total_tutors = len(unique_tutor_ids)
-            
-            # Attendance rate - currently set to 100%
-            # TODO: Calculate based on actual attendance records when implemented
-            attendance_rate = 100
-            
-            # Update student stats
-            student.stats.total_sessions = total_sessions
-            student.stats.total_learning_hours = round(total_hours, 2)
-            student.stats.total_tutors_met = total_tutors
-            student.stats.attendance_rate = attendance_rate
-            student.updated_at = datetime.now()
-            
-            await student.save()
-            updated_count += 1
-            
-            print(f"Updated stats for student {student.id}: {total_sessions} sessions, {total_hours:.2f}h, {total_tutors} tutors, {attendance_rate}% attendance")
+        # 2. Completed sessions with a check-in per student (one log counts once)
+        attended_by_student = {
+            row["_id"].id: row["attended"]
+            for row in await AttendanceLog.aggregate([
+                {"$match": attendance_scope},
+                {"$group": {"_id": {"student": "$student_ref", "session": "$session_ref"}}},
+                {"$lookup": {
+                    "from": TutorSession.Settings.name,
+                    "localField": "_id.session.$id",
+                    "foreignField": "_id",
+                    "pipeline": [
+                        {"$match": {"status": SessionStatus.COMPLETED.value}},
+                        {"$project": {"_id": 1}}
+                    ],
+                    "as": "session"
+                }},
+                {"$match": {"session": {"$ne": []}}},
+                {"$group": {"_id": "$_id.student", "attended": {"$sum": 1}}}
+            ]).to_list()
+        }
+        
+        # 3. Diff against stored stats (projection: stats only)
+        updates = []  # (student_id, {"stats.<field>": value})
+        async for doc in StudentProfile.get_motor_collection().find(profile_filter, {"stats": 1}):
+            learning = learning_by_student.get(doc["_id"], {})
+            total_sessions = learning.get("total_sessions", 0)
+            attended = attended_by_student.get(doc["_id"], 0)
+            new_stats = {
+                "total_sessions": total_sessions,
+                "total_learning_hours": round(learning.get("total_ms", 0) / 3_600_000, 2),
+                "total_tutors_met": learning.get("total_tutors", 0),
+                # No completed sessions yet: nothing missed
+                "attendance_rate": min(100, round(attended * 100 / total_sessions)) if total_sessions else 100,
+                "attended_sessions": attended
+            }
+            old_stats = doc.get("stats") or {}
+            if all(old_stats.get(field) == value for field, value in new_stats.items()):
+                continue
+            updates.append((doc["_id"], {f"stats.{field}": value for field, value in new_stats.items()}))
+        
+        # 4. Batched writes
+        now = datetime.now(timezone.utc)
+        for i in range(0, len(updates), STATS_WRITE_BATCH_SIZE):
+            batch = updates[i:i + STATS_WRITE_BATCH_SIZE]
+            await StudentProfile.get_motor_collection().bulk_write([
+                UpdateOne({"_id": profile_id}, {"$set": {**fields, "updated_at": now}})
+                for profile_id, fields in batch
+            ], ordered=False)
         
-        return updated_count
+        print(f"Updated stats for {len(updates)} student(s) ({len(learning_by_student)} with completed sessions)")
+        return len(updates)
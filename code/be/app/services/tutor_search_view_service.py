@@ -0,0 +1,218 @@
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from beanie import PydanticObjectId, Link
+
+# Models
+from app.models.internal.user import User
+from app.models.internal.tutor_profile import TutorProfile
+from app.models.internal.availability import AvailabilitySlot
+from app.models.internal.tutor_search_view import TutorSearchView, SearchViewSubject, SearchViewSlot
+from app.models.external.hcmut_sso import HCMUT_SSO
+from app.models.enums.university_identities import UniversityIdentity
+
+# Services
+from app.services.master_data_cache import MasterDataCache
+
+
+class TutorSearchViewService:
+    """
+    Maintains the TutorSearchView read model.
+
+    Write paths call the narrow refresh hooks (refresh_tutor / refresh_next_slot /
+    refresh_stats) after their own save. Hooks never fail the caller: errors are
+    logged and rebuild_all() (scripts/rebuild_tutor_search_view.py) recovers.
+    """
+
+    # ==========================================
+    # INTERNAL HELPERS
+    # ==========================================
+    @staticmethod
+    def _link_id(value) -> Optional[PydanticObjectId]:
+        """Returns the target id of a Link or an already fetched document."""
+        if value is None:
+            return None
+        if isinstance(value, Link):
+            return value.ref.id
+        return value.id
+
+    @staticmethod
+    async def _fetch_next_slot(tutor_id: PydanticObjectId) -> Optional[SearchViewSlot]:
+        """Earliest unbooked slot that has not ended yet."""
+        slot = await AvailabilitySlot.find(
+            AvailabilitySlot.tutor.id == tutor_id,
+            AvailabilitySlot.is_booked == False,
+            AvailabilitySlot.end_time > datetime.now(timezone.utc)
+        ).sort("+start_time").first_or_none()
+        if not slot:
+            return None
+        return SearchViewSlot(
+            start_time=slot.start_time,
+            end_time=slot.end_time,
+            allowed_modes=slot.allowed_modes
+        )
+
+    @staticmethod
+    async def _build(profile: TutorProfile) -> Optional[TutorSearchView]:
+        """Flattens one TutorProfile and its linked documents into a view document."""
+        user = await User.get(TutorSearchViewService._link_id(profile.user))
+        if not user:
+            return None
+        sso = await HCMUT_SSO.get(TutorSearchViewService._link_id(user.sso_info))
+
+        # Organization: Major -> Faculty for academic identities, work_info for staff
+        major = faculty = None
+        if sso and sso.academic:
+            major = await MasterDataCache.get_major(sso.academic.major_link)
+            if major:
+                faculty = await MasterDataCache.get_faculty(major.faculty_id)
+
+        # Subjects: master data cache, keep the tutor's own order
+        course_ids = [TutorSearchViewService._link_id(sub.course_ref) for sub in profile.teaching_subjects]
+        courses = await MasterDataCache.get_courses(course_ids)
+        subjects = []
+        for sub, course_id in zip(profile.teaching_subjects, course_ids):
+            course = courses.get(course_id)
+            if course:
+                subjects.append(SearchViewSubject(
+                    course_id=course.id,
+                    course_code=course.code,
+                    course_name=course.name,
+                    description=sub.description
+                ))
+
+        return TutorSearchView(
+            id=profile.id,
+            user_id=user.id,
+            full_name=user.full_name,
+            display_name=profile.display_name,
+            email_edu=user.email_edu,
+            is_lecturer=sso.identity_type == UniversityIdentity.LECTURER if sso else False,
+            academic_major=sso.academic.major if sso and sso.academic else None,
+            major_code=major.code if major else None,
+            faculty_code=faculty.code if faculty else None,
+            faculty_name=faculty.name if faculty else None,
+            department=sso.work_info.department if sso and sso.work_info else None,
+            bio=profile.bio,
+            tags=profile.tags,
+            status=profile.status,
+            avatar_url=profile.avatar_url,
+            avatar_variants=profile.avatar_variants,
+            subjects=subjects,
+            stats=profile.stats,
+            next_slot=await TutorSearchViewService._fetch_next_slot(profile.id),
+            refreshed_at=datetime.now(timezone.utc)
+        )
+
+    # ==========================================
+    # INCREMENTAL HOOKS
+    # ==========================================
+    @staticmethod
+    async def refresh_tutor(tutor_id: PydanticObjectId):
+        """Rebuilds the whole view document of one tutor (profile/identity changes)."""
+        try:
+            profile = await TutorProfile.get(tutor_id)
+            view = await TutorSearchViewService._build(profile) if profile else None
+            if view:
+                await view.save()
+            else:
+                await TutorSearchView.find_one(TutorSearchView.id == tutor_id).delete()
+        except Exception as e:
+            print(f"Warning: Failed to refresh search view for tutor {tutor_id}: {str(e)}")
+
+    @staticmethod
+    async def refresh_next_slot(tutor_id: PydanticObjectId) -> Optional[SearchViewSlot]:
+        """
+        Recomputes only next_slot (availability slot create/split/delete, or the
+        stored slot has ended). Returns the new next slot.
+        """
+        next_slot = None
+        try:
+            next_slot = await TutorSearchViewService._fetch_next_slot(tutor_id)
+            result = await TutorSearchView.find_one(TutorSearchView.id == tutor_id).update({"$set": {
+                "next_slot": {
+                    "start_time": next_slot.start_time,
+                    "end_time": next_slot.end_time,
+                    "allowed_modes": [m.value for m in next_slot.allowed_modes]
+                } if next_slot else None,
+                "refreshed_at": datetime.now(timezone.utc)
+            }})
+            if result is None or result.matched_count == 0:
+                # Tutor not in the view yet
+                await TutorSearchViewService.refresh_tutor(tutor_id)
+        except Exception as e:
+            print(f"Warning: Failed to refresh next slot for tutor {tutor_id}: {str(e)}")
+        return next_slot
+
+    @staticmethod
+    async def current_next_slot(view: TutorSearchView) -> Optional[SearchViewSlot]:
+        """The view's next slot, recomputed (and stored) if it has already ended."""
+        slot = view.next_slot
+        if slot is None:
+            return None
+        end_time = slot.end_time if slot.end_time.tzinfo else slot.end_time.replace(tzinfo=timezone.utc)
+        if end_time > datetime.now(timezone.utc):
+            return slot
+        return await TutorSearchViewService.refresh_next_slot(view.id)
+
+    @staticmethod
+    async def refresh_expired_slots() -> int:
+        """
+        Recomputes next_slot of every view whose slot has ended (periodic job),
+        so search results do not advertise past availability.
+
+        Returns:
+            Number of views refreshed
+        """
+        expired = await TutorSearchView.get_motor_collection().find(
+            {"next_slot.end_time": {"$lte": datetime.now(timezone.utc)}}, {"_id": 1}
+        ).to_list(None)
+        for doc in expired:
+            await TutorSearchViewService.refresh_next_slot(doc["_id"])
+        return len(expired)
+
+    @staticmethod
+    async def refresh_stats(profile: TutorProfile):
+        """Copies the profile's current stats into the view (stats recalculation)."""
+        try:
+            result = await TutorSearchView.find_one(TutorSearchView.id == profile.id).update({"$set": {
+                "stats": profile.stats.model_dump(),
+                "refreshed_at": datetime.now(timezone.utc)
+            }})
+            if result is None or result.matched_count == 0:
+                await TutorSearchViewService.refresh_tutor(profile.id)
+        except Exception as e:
+            print(f"Warning: Failed to refresh stats view for tutor {profile.id}: {str(e)}")
+
+    # ==========================================
+    # FULL REBUILD (Recovery)
+    # ==========================================
+    @staticmethod
+    async def rebuild_all() -> dict:
+        """
+        Rebuilds the view from scratch for every TutorProfile and drops orphaned rows.
+        Safe to run at any time; used by scripts/rebuild_tutor_search_view.py.
+        """
+        profiles = await TutorProfile.find_all().to_list()
+        rebuilt_ids: List[PydanticObjectId] = []
+
+        for profile in profiles:
+            view = await TutorSearchViewService._build(profile)
+            if view:
+                await view.save()
+                rebuilt_ids.append(profile.id)
+
+        removed = await TutorSearchView.find({"_id": {"$nin": rebuilt_ids}}).delete()
+
+        return {
+            "rebuilt_count": len(rebuilt_ids),
+            "removed_count": removed.deleted_count if removed else 0,
+            "message": f"Rebuilt search view for {len(rebuilt_ids)} tutor(s)"
+        }
+
+    @staticmethod
+    async def ensure_built():
+        """Builds the view on first start (empty collection), otherwise does nothing."""
+        if await TutorSearchView.find_one() is None:
+            result = await TutorSearchViewService.rebuild_all()
+            print(f"✅ {result['message']}")
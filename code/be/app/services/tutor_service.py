@@ -1,16 +1,19 @@
-from typing import List, Optional
+import re
+import time
+from typing import Callable, List, Optional
 from datetime import datetime, timezone
 from fastapi import HTTPException, status, UploadFile
 from beanie import PydanticObjectId, Link
 from beanie.operators import In
 from bson import ObjectId
 from bson.dbref import DBRef
+from pymongo import UpdateOne
 
 # Models
 from app.models.internal.user import User
 from app.models.internal.tutor_profile import TutorProfile, TutorStatus, TeachingSubject
+from app.models.internal.tutor_search_view import TutorSearchView
 from app.models.internal.availability import AvailabilitySlot
-from app.models.external.course import Course
 from app.models.enums.role import UserRole
 from app.models.enums.university_identities import UniversityIdentity
 
@@ -27,7 +30,13 @@ from app.models.schemas.tutor import (
 )
 
 # Services
-from app.services.storage_service import StorageService
+from app.services.avatar_service import AvatarService, CARD_AVATAR_SIZE
+from app.services.tutor_search_view_service import TutorSearchViewService
+from app.services.master_data_cache import MasterDataCache
+
+# Max tutor profiles written per bulk_write by the stats recalculation
+STATS_WRITE_BATCH_SIZE = 1000
+
 
 class TutorService:
     
@@ -56,14 +65,10 @@ class TutorService:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, 
                               detail="SSO data missing for tutor")
         
-        # 3. Map Subjects (Fetch Course names/codes)
+        # 3. Map Subjects (Course names/codes from the master data cache)
         mapped_subjects = []
         for sub in profile.teaching_subjects:
-            course_data = sub.course_ref
-            
-            # Fetch Link if necessary
-            if isinstance(course_data, Link):
-                course_data = await sub.course_ref.fetch()
+            course_data = await MasterDataCache.get_course(sub.course_ref)
             
             if course_data: 
                 mapped_subjects.append(TeachingSubjectResponse(
@@ -145,6 +150,7 @@ class TutorService:
                     is_certified_by_faculty=True
                 )
                 await new_profile.save()
+                await TutorSearchViewService.refresh_tutor(new_profile.id)
             
             success_count += 1
 
@@ -159,25 +165,21 @@ class TutorService:
     @staticmethod
     async def search_tutors(subject_code: Optional[str] = None) -> List[TutorResponse]:
         """
-        Search and filter tutors. Uses in-memory filtering for linked fields 
-        to ensure consistency with small-to-medium datasets.
+        Search and filter tutors. Candidates are selected from the TutorSearchView
+        collection (indexed on status and subject code), then mapped from their profiles.
         """
-        # Base Query: Find all AVAILABLE tutors (Limit 50)
-        query = TutorProfile.find(TutorProfile.status == TutorStatus.AVAILABLE).limit(50)
-        
-        profiles = await query.to_list()
-        
-        # 2. Filter by Subject Code (Python-side filtering)
+        # 1. Find AVAILABLE tutors (Limit 50), optionally teaching the given course
+        query = TutorSearchView.find(TutorSearchView.status == TutorStatus.AVAILABLE)
         if subject_code:
-            course = await Course.find_one(Course.code == subject_code)
-            if not course:
-                return [] 
-            
-            # Filter the list of profiles retrieved
-            profiles = [
-                p for p in profiles 
-                if any(sub.course_ref.id == course.id for sub in p.teaching_subjects)
-            ]
+            query = query.find({"subjects.course_code": subject_code})
+        views = await query.sort("-stats.average_rating", "+_id").limit(50).to_list()
+
+        # 2. Load the matching profiles in one query, keeping the view order
+        view_ids = [v.id for v in views]
+        profiles_by_id = {
+            p.id: p for p in await TutorProfile.find(In(TutorProfile.id, view_ids)).to_list()
+        } if view_ids else {}
+        profiles = [profiles_by_id[i] for i in view_ids if i in profiles_by_id]
 
         # 3. Map to Response Schema
         results = []
@@ -208,160 +210,112 @@ class TutorService:
         """
         Advanced tutor search with availability filtering.
         Returns tutors matching the search criteria with their closest available time slot.
+
+        Reads the denormalized TutorSearchView collection (one document per tutor), so
+        matching, sorting and pagination run on a single indexed collection. Slots are
+        only joined when a time window or mode filter is given; otherwise the view's
+        precomputed next_slot is returned.
         """
-        # Base query: Find AVAILABLE tutors
-        query = TutorProfile.find(TutorProfile.status == TutorStatus.AVAILABLE)
-        
-        # Filter by tags (expertise keywords)
+        has_slot_filter = bool(search_params.available_from or search_params.available_to or search_params.mode)
+
+        # Stage 1: Match AVAILABLE tutors (+ tags, subject, department)
+        match = {"status": TutorStatus.AVAILABLE.value}
         if search_params.tags:
-            # Match any of the provided tags
-            query = query.find({"tags": {"$in": search_params.tags}})
-        
-        # Get initial results
-        profiles = await query.skip(search_params.offset).limit(search_params.limit).to_list()
-        
-        # Filter by subject/course (Python-side)
+            match["tags"] = {"$in": search_params.tags}
+        conditions = []
         if search_params.subject:
-            course = await Course.find_one(
-                {"$or": [
-                    {"code": {"$regex": search_params.subject, "$options": "i"}},
-                    {"name": {"$regex": search_params.subject, "$options": "i"}}
-                ]}
-            )
-            if course:
-                profiles = [
-                    p for p in profiles 
-                    if any(sub.course_ref.id == course.id for sub in p.teaching_subjects)
-                ]
-        
-        # Filter by department (Python-side via SSO data)
+            subject_regex = {"$regex": re.escape(search_params.subject), "$options": "i"}
+            conditions.append({"$or": [
+                {"subjects.course_code": subject_regex},
+                {"subjects.course_name": subject_regex}
+            ]})
         if search_params.department:
-            filtered_profiles = []
-            for p in profiles:
-                if isinstance(p.user, Link):
-                    await p.fetch_link(TutorProfile.user)
-                user = p.user
-                if isinstance(user.sso_info, Link):
-                    await user.fetch_link(User.sso_info)
-                sso = user.sso_info
-                
-                # Check if tutor has academic info with major
-                if sso and sso.academic and sso.academic.major_link:
-                    # Fetch the major to get faculty information
-                    major = sso.academic.major_link
-                    if isinstance(major, Link):
-                        from app.models.external.major import Major
-                        major = await major.fetch()
-                    
-                    if major and major.faculty:
-                        # Fetch faculty name
-                        faculty = major.faculty
-                        if isinstance(faculty, Link):
-                            from app.models.external.faculty import Faculty
-                            faculty = await faculty.fetch()
-                        
-                        if faculty and hasattr(faculty, 'name'):
-                            if search_params.department.lower() in faculty.name.lower():
-                                filtered_profiles.append(p)
-                        elif faculty and hasattr(faculty, 'code'):
-                            if search_params.department.lower() in faculty.code.lower():
-                                filtered_profiles.append(p)
-                # Also check work_info for lecturers/staff
-                elif sso and sso.work_info and sso.work_info.department:
-                    if search_params.department.lower() in sso.work_info.department.lower():
-                        filtered_profiles.append(p)
-            profiles = filtered_profiles
-        
-        # Build results with availability data
-        results = []
-        for profile in profiles:
-            # Fetch availability slots for this tutor
-            availability_query = AvailabilitySlot.find(
-                AvailabilitySlot.tutor.id == profile.id,
-                AvailabilitySlot.is_booked == False
-            ).sort("+start_time")
-            
-            # Apply time range filter if provided
+            department_regex = {"$regex": re.escape(search_params.department), "$options": "i"}
+            conditions.append({"$or": [
+                {"faculty_name": department_regex},
+                {"faculty_code": department_regex},
+                {"department": department_regex}
+            ]})
+        if conditions:
+            match["$and"] = conditions
+        pipeline = [{"$match": match}]
+
+        # Stage 2: Availability window/mode (earliest matching open slot per tutor)
+        if has_slot_filter:
+            # Ended slots never count as availability
+            slot_match = {"is_booked": False, "end_time": {"$gt": datetime.now(timezone.utc)}}
             if search_params.available_from:
-                availability_query = availability_query.find(
-                    AvailabilitySlot.start_time >= search_params.available_from
-                )
+                slot_match["start_time"] = {"$gte": search_params.available_from}
             if search_params.available_to:
-                availability_query = availability_query.find(
-                    AvailabilitySlot.end_time <= search_params.available_to
-                )
-            
-            # Filter by mode if specified
+                slot_match["end_time"]["$lte"] = search_params.available_to
             if search_params.mode:
-                availability_query = availability_query.find(
-                    {"allowed_modes": search_params.mode}
-                )
-            
-            slots = await availability_query.to_list()
-            
-            # Skip tutors with no matching availability if time/mode filters are active
-            if (search_params.available_from or search_params.available_to or search_params.mode) and not slots:
-                continue
-            
-            # Get closest availability
-            closest_slot = slots[0] if slots else None
-            closest_availability = None
-            if closest_slot:
-                closest_availability = ClosestAvailability(
-                    start_time=closest_slot.start_time,
-                    end_time=closest_slot.end_time,
-                    allowed_modes=closest_slot.allowed_modes
-                )
-            
-            # Build search result
-            if isinstance(profile.user, Link):
-                await profile.fetch_link(TutorProfile.user)
-            user = profile.user
-            
-            if isinstance(user.sso_info, Link):
-                await user.fetch_link(User.sso_info)
-            sso = user.sso_info
-            
-            # Map subjects
-            mapped_subjects = []
-            for sub in profile.teaching_subjects:
-                course_data = sub.course_ref
-                if isinstance(course_data, Link):
-                    course_data = await sub.course_ref.fetch()
-                if course_data:
-                    mapped_subjects.append(TeachingSubjectResponse(
-                        course_code=course_data.code,
-                        course_name=course_data.name,
+                slot_match["allowed_modes"] = search_params.mode.value
+            pipeline += [
+                {"$lookup": {
+                    "from": AvailabilitySlot.Settings.name,
+                    "localField": "_id",
+                    "foreignField": "tutor.$id",
+                    "pipeline": [
+                        {"$match": slot_match},
+                        {"$sort": {"start_time": 1}},
+                        {"$limit": 1},
+                        {"$project": {"_id": 0, "start_time": 1, "end_time": 1, "allowed_modes": 1}}
+                    ],
+                    "as": "_closest"
+                }},
+                {"$match": {"_closest.0": {"$exists": True}}},
+                {"$set": {"next_slot": {"$first": "$_closest"}}}
+            ]
+
+        # Stage 3: Stable ordering + pagination on the filtered set
+        pipeline += [
+            {"$sort": {"stats.average_rating": -1, "stats.total_feedbacks": -1, "_id": 1}},
+            {"$skip": search_params.offset},
+            {"$limit": search_params.limit}
+        ]
+
+        views = await TutorSearchView.aggregate(pipeline, projection_model=TutorSearchView).to_list()
+
+        # Map to response
+        results = []
+        for view in views:
+            # Stored next slot may have ended since the view was refreshed
+            next_slot = view.next_slot if has_slot_filter else await TutorSearchViewService.current_next_slot(view)
+            results.append(TutorSearchResult(
+                id=str(view.id),
+                user_id=str(view.user_id),
+                full_name=view.full_name,
+                display_name=view.display_name,
+                email_edu=view.email_edu,
+                academic_major=view.academic_major,
+                is_lecturer=view.is_lecturer,
+                bio=view.bio,
+                tags=view.tags,
+                status=view.status.value,
+                avatar_url=AvatarService.variant_url(view.avatar_variants, view.avatar_url, CARD_AVATAR_SIZE),
+                avatar_variants=view.avatar_variants,
+                subjects=[
+                    TeachingSubjectResponse(
+                        course_code=sub.course_code,
+                        course_name=sub.course_name,
                         description=sub.description
-                    ))
-            
-            is_lecturer = sso.identity_type == UniversityIdentity.LECTURER if sso else False
-            academic_major = sso.academic.major if sso and sso.academic else None
-            
-            result = TutorSearchResult(
-                id=str(profile.id),
-                user_id=str(user.id),
-                full_name=user.full_name,
-                display_name=profile.display_name,
-                email_edu=user.email_edu,
-                academic_major=academic_major,
-                is_lecturer=is_lecturer,
-                bio=profile.bio,
-                tags=profile.tags,
-                status=profile.status.value,
-                avatar_url=profile.avatar_url,
-                subjects=mapped_subjects,
+                    )
+                    for sub in view.subjects
+                ],
                 stats=TutorStatsResponse(
-                    average_rating=profile.stats.average_rating,
-                    total_feedbacks=profile.stats.total_feedbacks,
-                    total_sessions=profile.stats.total_sessions,
-                    total_students=profile.stats.total_students,
-                    response_rate=profile.stats.response_rate
+                    average_rating=view.stats.average_rating,
+                    total_feedbacks=view.stats.total_feedbacks,
+                    total_sessions=view.stats.total_sessions,
+                    total_students=view.stats.total_students,
+                    response_rate=view.stats.response_rate
                 ),
-                closest_availability=closest_availability
-            )
-            results.append(result)
-        
+                closest_availability=ClosestAvailability(
+                    start_time=next_slot.start_time,
+                    end_time=next_slot.end_time,
+                    allowed_modes=next_slot.allowed_modes
+                ) if next_slot else None
+            ))
+
         return results
 
     # ==========================================
@@ -400,6 +354,7 @@ class TutorService:
         
         if payload.avatar_url is not None:
             profile.avatar_url = payload.avatar_url
+            profile.avatar_variants = {}  # Thumbnails belong to the uploaded avatar
             changes_made = True
 
         # Update User.email_personal (cross-model field)
@@ -412,6 +367,7 @@ class TutorService:
         if changes_made:
             profile.updated_at = datetime.now(timezone.utc)
             await profile.save()
+            await TutorSearchViewService.refresh_tutor(profile.id)
 
         return await TutorService._map_to_response(profile)
 
@@ -421,8 +377,10 @@ class TutorService:
     @staticmethod
     async def upload_avatar(user: User, file: UploadFile) -> dict:
         """
-        Uploads a new avatar for the tutor to Cloudinary.
-        Deletes the old avatar if it exists to save storage space.
+        Uploads a new avatar for the tutor to storage, with its thumbnails
+        (validated and stripped of metadata by AvatarService).
+        The old avatar is released after the new one is stored (if the upload
+        fails the old one stays); shared content is only deleted when unused.
         
         Args:
             user: The authenticated tutor user
@@ -436,31 +394,25 @@ class TutorService:
         if not profile:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tutor profile not found")
         
-        # Delete old avatar from Cloudinary if exists
-        if profile.avatar_public_id:
-            try:
-                await StorageService.delete_resource(
-                    public_id=profile.avatar_public_id,
-                    resource_type="image"
-                )
-            except Exception as e:
-                # Log but don't fail if deletion fails
-                print(f"Warning: Failed to delete old avatar {profile.avatar_public_id}: {str(e)}")
-        
-        # Upload new avatar to Cloudinary
-        upload_result = await StorageService.upload_document(
-            file=file,
-            folder="tutor-system/avatars"
-        )
+        # Process and upload new avatar
+        avatar = await AvatarService.process_upload(file, folder="tutor-system/avatars")
+        old_public_ids = profile.avatar_public_ids or ([profile.avatar_public_id] if profile.avatar_public_id else [])
         
-        # Update profile with new avatar URL and public_id
-        profile.avatar_url = upload_result["secure_url"]
-        profile.avatar_public_id = upload_result["public_id"]
+        # Update profile with new avatar URLs and public_ids
+        profile.avatar_url = avatar["avatar_url"]
+        profile.avatar_public_id = None
+        profile.avatar_public_ids = avatar["avatar_public_ids"]
+        profile.avatar_variants = avatar["avatar_variants"]
         profile.updated_at = datetime.now(timezone.utc)
         await profile.save()
+        await TutorSearchViewService.refresh_tutor(profile.id)
+        
+        # Release old avatar if exists (deleted once nothing else uses it)
+        await AvatarService.release(old_public_ids)
         
         return {
-            "avatar_url": upload_result["secure_url"],
+            "avatar_url": avatar["avatar_url"],
+            "avatar_variants": avatar["avatar_variants"],
             "message": "Avatar uploaded successfully"
         }
 
@@ -468,7 +420,11 @@ class TutorService:
     # 5. STATS RECALCULATION
     # ==========================================
     @staticmethod
-    async def recalculate_tutor_stats(tutor_profile_id: Optional[PydanticObjectId] = None):
+    async def recalculate_tutor_stats(
+        tutor_profile_id: Optional[PydanticObjectId] = None,
+        dry_run: bool = False,
+        progress: Optional[Callable[[str], None]] = None
+    ):
         """
         Recalculates tutor statistics from actual session and feedback data.
         Can recalculate for a specific tutor or all tutors if no ID provided.
@@ -478,69 +434,118 @@ class TutorService:
         - When stats appear incorrect
         - As a maintenance task
         
+        Runs one aggregation per stat family over all tutors at once (completed
+        sessions, unique students, submitted ratings), diffs the result against the
+        stored stats and writes only the changed tutors with batched bulk_write calls.
+        
         Args:
             tutor_profile_id: Optional specific tutor to recalculate. If None, recalculates all tutors.
+            dry_run: Compute and return the diff without writing anything.
+            progress: Callback receiving progress lines (None: silent; scripts pass print).
         """
         from app.models.internal.session import TutorSession, SessionStatus
         from app.models.internal.feedback import SessionFeedback, FeedbackStatus
         
-        # Find tutors to update
+        report = progress or (lambda message: None)
+        started = time.perf_counter()
+        
+        # Scope: one tutor or everyone
+        profile_filter = {}
+        scope = {}
         if tutor_profile_id:
-            tutors = [await TutorProfile.get(tutor_profile_id)]
-            if not tutors[0]:
+            if not await TutorProfile.get(tutor_profile_id):
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tutor not found")
-        else:
-            tutors = await TutorProfile.find_all().to_list()
+            profile_filter = {"_id": tutor_profile_id}
+            scope = {"tutor.$id": tutor_profile_id}
         
-        for tutor in tutors:
-            # 1. Count total COMPLETED sessions where this tutor was the tutor
-            completed_sessions = await TutorSession.find(
-                TutorSession.tutor.id == tutor.id,
-                TutorSession.status == SessionStatus.COMPLETED
-            ).to_list()
-            
-            total_sessions = len(completed_sessions)
-            
-            # 2. Count unique students across all completed sessions
-            unique_students = set()
-            for session in completed_sessions:
-                await session.fetch_link(TutorSession.students)
-                if session.students:
-                    for student in session.students:
-                        if isinstance(student, Link):
-                            await student.fetch()
-                        unique_students.add(str(student.id))
-            
-            total_students = len(unique_students)
-            
-            # 3. Get all SUBMITTED feedbacks for this tutor
-            submitted_feedbacks = await SessionFeedback.find(
-                SessionFeedback.tutor.id == tutor.id,
-                SessionFeedback.status == FeedbackStatus.SUBMITTED
-            ).to_list()
-            
-            total_feedbacks = len(submitted_feedbacks)
-            
-            # 4. Calculate average rating from SUBMITTED feedbacks that have ratings
-            ratings = [fb.rating for fb in submitted_feedbacks if fb.rating is not None]
-            average_rating = round(sum(ratings) / len(ratings), 2) if ratings else 0.0
-            
-            # 5. Calculate response rate (for now, keep at 100% - can be enhanced later)
-            response_rate = 100
-            
-            # 6. Update tutor stats
-            tutor.stats.average_rating = average_rating
-            tutor.stats.total_feedbacks = total_feedbacks
-            tutor.stats.total_sessions = total_sessions
-            tutor.stats.total_students = total_students
-            tutor.stats.response_rate = response_rate
-            tutor.updated_at = datetime.now(timezone.utc)
-            
-            await tutor.save()
-            
-            print(f"Updated stats for tutor {tutor.id}: {total_sessions} sessions, {total_students} students, {total_feedbacks} feedbacks, {average_rating} avg rating")
+        # 1. Completed sessions per tutor
+        report("Aggregating completed sessions...")
+        sessions_by_tutor = {
+            row["_id"].id: row["count"]
+            for row in await TutorSession.aggregate([
+                {"$match": {**scope, "status": SessionStatus.COMPLETED.value}},
+                {"$group": {"_id": "$tutor", "count": {"$sum": 1}}}
+            ]).to_list()
+        }
+        
+        # 2. Unique students per tutor across completed sessions
+        report("Aggregating unique students...")
+        students_by_tutor = {
+            row["_id"].id: row["count"]
+            for row in await TutorSession.aggregate([
+                {"$match": {**scope, "status": SessionStatus.COMPLETED.value}},
+                {"$unwind": "$students"},
+                {"$group": {"_id": {"tutor": "$tutor", "student": "$students"}}},
+                {"$group": {"_id": "$_id.tutor", "count": {"$sum": 1}}}
+            ]).to_list()
+        }
+        
+        # 3. Submitted feedbacks and rating totals per tutor
+        report("Aggregating submitted ratings...")
+        ratings_by_tutor = {
+            row["_id"].id: row
+            for row in await SessionFeedback.aggregate([
+                {"$match": {**scope, "status": FeedbackStatus.SUBMITTED.value}},
+                {"$group": {
+                    "_id": "$tutor",
+                    "total_feedbacks": {"$sum": 1},
+                    "rated": {"$sum": {"$cond": [{"$ne": ["$rating", None]}, 1, 0]}},
+                    "rating_sum": {"$sum": "$rating"}
+                }}
+            ]).to_list()
+        }
+        
+        # 4. Diff against stored stats (projection: stats only)
+        updates = []  # (tutor_id, {"stats.<field>": value})
+        changes = []
+        tutor_count = 0
+        async for doc in TutorProfile.get_motor_collection().find(profile_filter, {"stats": 1}):
+            tutor_count += 1
+            tutor_id = doc["_id"]
+            ratings = ratings_by_tutor.get(tutor_id, {})
+            rated = ratings.get("rated", 0)
+            rating_sum = float(ratings.get("rating_sum", 0))
+            new_stats = {
+                "total_sessions": sessions_by_tutor.get(tutor_id, 0),
+                "total_students": students_by_tutor.get(tutor_id, 0),
+                "total_feedbacks": ratings.get("total_feedbacks", 0),
+                "average_rating": round(rating_sum / rated, 2) if rated else 0.0,
+                "rating_sum": rating_sum
+            }
+            old_stats = doc.get("stats") or {}
+            diff = {
+                field: [old_stats.get(field), value]
+                for field, value in new_stats.items()
+                if old_stats.get(field) != value
+            }
+            if not diff:
+                continue
+            changes.append({"tutor_id": str(tutor_id), "changes": diff})
+            updates.append((tutor_id, {f"stats.{field}": value for field, value in new_stats.items()}))
+        report(f"{len(changes)} of {tutor_count} tutor(s) have outdated stats")
+        
+        # 5. Batched writes (profiles + search read model share _id and stats layout)
+        if not dry_run:
+            now = datetime.now(timezone.utc)
+            for i in range(0, len(updates), STATS_WRITE_BATCH_SIZE):
+                batch = updates[i:i + STATS_WRITE_BATCH_SIZE]
+                await TutorProfile.get_motor_collection().bulk_write([
+                    UpdateOne({"_id": tutor_id}, {"$set": {**fields, "updated_at": now}})
+                    for tutor_id, fields in batch
+                ], ordered=False)
+                await TutorSearchView.get_motor_collection().bulk_write([
+                    UpdateOne({"_id": tutor_id}, {"$set": fields})
+                    for tutor_id, fields in batch
+                ], ordered=False)
+                report(f"Wrote {i + len(batch)}/{len(updates)} tutor(s)")
         
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+        verb = "Would update" if dry_run else "Successfully recalculated"
         return {
-            "updated_count": len(tutors),
-            "message": f"Successfully recalculated stats for {len(tutors)} tutor(s)"
+            "dry_run": dry_run,
+            "tutor_count": tutor_count,
+            "updated_count": len(changes),
+            "changes": changes,
+            "elapsed_ms": elapsed_ms,
+            "message": f"{verb} stats for {len(changes)} of {tutor_count} tutor(s) in {elapsed_ms} ms"
         }
\ No newline at end of file
@@ -0,0 +1,218 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from beanie import PydanticObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+# Models
+from app.models.internal.session import TutorSession, SessionStatus
+from app.models.internal.workload_rollup import WorkloadRollup
+from app.models.enums.location import LocationMode
+
+# Events
+from app.core.events import EventBus, EventType, SessionEvent
+
+# Services
+from app.services.master_data_cache import MasterDataCache
+
+
+# Session statuses that count as teaching workload
+COUNTED_STATUSES = [SessionStatus.CONFIRMED, SessionStatus.COMPLETED]
+
+# Max rollup rows inserted per insert_many by the rebuild
+REBUILD_BATCH_SIZE = 1000
+
+_DUPLICATE_KEY = 11000
+
+
+def utc_day(value: datetime) -> datetime:
+    """00:00 UTC (naive, as MongoDB returns it) of the day containing `value`."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return datetime(value.year, value.month, value.day)
+
+
+class WorkloadRollupService:
+    """
+    Maintains the WorkloadRollup collection and answers workload queries from it.
+
+    Sessions are added to their (tutor, course, day) row when they are CONFIRMED
+    or COMPLETED and removed again when CANCELLED. Each row lists the sessions it
+    counts, so repeated or out-of-order events never count a session twice.
+    rebuild_all() (scripts/rebuild_workload_rollups.py) recomputes everything
+    from tutor_sessions.
+    """
+
+    # ==========================================
+    # LIFECYCLE
+    # ==========================================
+    @staticmethod
+    def register():
+        """Subscribes the rollup maintenance to the event bus (called once in lifespan)."""
+        EventBus.subscribe(EventType.SESSION_CONFIRMED, WorkloadRollupService.on_sessions_counted)
+        EventBus.subscribe(EventType.SESSION_COMPLETED, WorkloadRollupService.on_sessions_counted)
+        EventBus.subscribe(EventType.SESSION_CANCELLED, WorkloadRollupService.on_sessions_cancelled)
+
+    @staticmethod
+    async def ensure_built():
+        """Builds the rollups on first start (empty collection), otherwise does nothing."""
+        if await WorkloadRollup.find_one() is None:
+            result = await WorkloadRollupService.rebuild_all()
+            print(f"✅ {result['message']}")
+
+    @staticmethod
+    async def rebuild_all() -> dict:
+        """
+        Recomputes every rollup row from the counted sessions (one aggregation).
+        Run after bulk imports/seeds; rows are replaced wholesale, so run it while
+        no sessions are being confirmed or cancelled.
+        """
+        group = {
+            "_id": {
+                "tutor": "$tutor",
+                "course": "$course",
+                "day": {"$dateFromParts": {
+                    "year": {"$year": "$start_time"},
+                    "month": {"$month": "$start_time"},
+                    "day": {"$dayOfMonth": "$start_time"}
+                }}
+            },
+            "hours": {"$sum": {"$divide": [{"$subtract": ["$end_time", "$start_time"]}, 3600000]}},
+            "sessions": {"$sum": 1},
+            "session_ids": {"$push": "$_id"}
+        }
+        for mode in LocationMode:
+            group[mode.value] = {"$sum": {"$cond": [{"$eq": ["$mode", mode.value]}, 1, 0]}}
+
+        rows = await TutorSession.aggregate([
+            {"$match": {"status": {"$in": [s.value for s in COUNTED_STATUSES]}}},
+            {"$group": group}
+        ]).to_list()
+
+        documents = []
+        for row in rows:
+            course_id = row["_id"]["course"].id
+            course = await MasterDataCache.get_course(course_id)
+            documents.append({
+                "tutor_id": row["_id"]["tutor"].id,
+                "course_id": course_id,
+                "faculty_id": course.department_id if course else None,
+                "day": row["_id"]["day"],
+                "hours": row["hours"],
+                "sessions": row["sessions"],
+                "mode_sessions": {mode.value: row[mode.value] for mode in LocationMode if row[mode.value]},
+                "session_ids": row["session_ids"]
+            })
+
+        collection = WorkloadRollup.get_motor_collection()
+        await collection.delete_many({})
+        for i in range(0, len(documents), REBUILD_BATCH_SIZE):
+            await collection.insert_many(documents[i:i + REBUILD_BATCH_SIZE], ordered=False)
+
+        return {
+            "row_count": len(documents),
+            "message": f"Rebuilt {len(documents)} workload rollup row(s)"
+        }
+
+    # ==========================================
+    # EVENT HANDLERS
+    # ==========================================
+    @staticmethod
+    async def on_sessions_counted(events: List[SessionEvent]):
+        """Adds confirmed/completed sessions to their rows (no-op for sessions already counted)."""
+        operations = []
+        for event in events:
+            course = await MasterDataCache.get_course(event.course_id)
+            operations.append(UpdateOne(
+                {
+                    "tutor_id": event.tutor_id,
+                    "course_id": event.course_id,
+                    "day": utc_day(event.start_time),
+                    "session_ids": {"$ne": event.session_id}
+                },
+                {
+                    "$inc": {
+                        "hours": event.duration_hours,
+                        "sessions": 1,
+                        f"mode_sessions.{event.mode.value}": 1
+                    },
+                    "$push": {"session_ids": event.session_id},
+                    "$setOnInsert": {"faculty_id": course.department_id if course else None}
+                },
+                upsert=True
+            ))
+        if not operations:
+            return
+
+        try:
+            await WorkloadRollup.get_motor_collection().bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            # The row exists and already lists the session: the upsert collides
+            # with the unique (tutor, course, day) key, which means "already counted"
+            if any(error["code"] != _DUPLICATE_KEY for error in e.details.get("writeErrors", [])):
+                raise
+
+    @staticmethod
+    async def on_sessions_cancelled(events: List[SessionEvent]):
+        """Removes cancelled sessions from the row that counts them (no-op if none does)."""
+        operations = [
+            UpdateOne(
+                {"session_ids": event.session_id},
+                {
+                    "$inc": {
+                        "hours": -event.duration_hours,
+                        "sessions": -1,
+                        f"mode_sessions.{event.mode.value}": -1
+                    },
+                    "$pull": {"session_ids": event.session_id}
+                }
+            )
+            for event in events
+        ]
+        if operations:
+            await WorkloadRollup.get_motor_collection().bulk_write(operations, ordered=False)
+
+    # ==========================================
+    # QUERIES
+    # ==========================================
+    @staticmethod
+    async def summarize(
+        start_date: datetime,
+        end_date: datetime,
+        tutor_id: Optional[PydanticObjectId] = None,
+        faculty_id: Optional[PydanticObjectId] = None
+    ) -> List[dict]:
+        """
+        Sums the rollups per (tutor, faculty) over the UTC days from start_date to
+        end_date (both inclusive), optionally for one tutor or one faculty.
+
+        Returns:
+            Rows of {tutor_id, faculty_id, hours, sessions, mode_sessions}
+        """
+        match: Dict[str, object] = {"day": {"$gte": utc_day(start_date), "$lte": utc_day(end_date)}}
+        if tutor_id is not None:
+            match["tutor_id"] = tutor_id
+        if faculty_id is not None:
+            match["faculty_id"] = faculty_id
+
+        group = {
+            "_id": {"tutor_id": "$tutor_id", "faculty_id": "$faculty_id"},
+            "hours": {"$sum": "$hours"},
+            "sessions": {"$sum": "$sessions"}
+        }
+        for mode in LocationMode:
+            group[mode.value] = {"$sum": {"$ifNull": [f"$mode_sessions.{mode.value}", 0]}}
+
+        rows = await WorkloadRollup.aggregate([{"$match": match}, {"$group": group}]).to_list()
+        return [
+            {
+                "tutor_id": row["_id"]["tutor_id"],
+                "faculty_id": row["_id"].get("faculty_id"),
+                "hours": row["hours"],
+                "sessions": row["sessions"],
+                "mode_sessions": {mode.value: row[mode.value] for mode in LocationMode if row[mode.value]}
+            }
+            for row in rows
+            if row["sessions"] > 0
+        ]
@@ -0,0 +1,27 @@
+"""
+Utility script to rebuild the denormalized tutor search view (TutorSearchView).
+Run this after bulk imports/seeds or when search results look stale.
+"""
+import asyncio
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.mongodb import init_db
+from app.services.tutor_search_view_service import TutorSearchViewService
+
+
+async def main():
+    """Initialize DB and rebuild the tutor search view from scratch"""
+    print("🔧 Initializing database connection...")
+    await init_db()
+    
+    print("🔎 Rebuilding tutor search view...")
+    result = await TutorSearchViewService.rebuild_all()
+    
+    print(f"✅ {result['message']} ({result['removed_count']} orphaned row(s) removed)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
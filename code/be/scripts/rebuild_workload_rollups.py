@@ -0,0 +1,27 @@
+"""
+Utility script to rebuild the daily workload rollups (WorkloadRollup).
+Run this after bulk imports/seeds or when workload reports look wrong.
+"""
+import asyncio
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.mongodb import init_db
+from app.services.workload_rollup_service import WorkloadRollupService
+
+
+async def main():
+    """Initialize DB and rebuild the workload rollups from scratch"""
+    print("🔧 Initializing database connection...")
+    await init_db()
+    
+    print("📊 Rebuilding workload rollups...")
+    result = await WorkloadRollupService.rebuild_all()
+    
+    print(f"✅ {result['message']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
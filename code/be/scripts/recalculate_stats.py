@@ -10,18 +10,29 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.db.mongodb import init_db
 from app.services.tutor_service import TutorService
+from app.services.stats_projector import StatsProjector
 
 
-async def main():
+async def main(dry_run: bool = False):
     """Initialize DB and recalculate all tutor stats"""
     print("🔧 Initializing database connection...")
     await init_db()
     
-    print("📊 Recalculating tutor stats from actual data...")
-    result = await TutorService.recalculate_tutor_stats()
+    print("📊 Recalculating tutor stats from actual data..." + (" (dry run)" if dry_run else ""))
+    result = await TutorService.recalculate_tutor_stats(dry_run=dry_run, progress=print)
+    
+    if dry_run:
+        for change in result["changes"]:
+            print(f"   {change['tutor_id']}: {change['changes']}")
     
     print(f"✅ {result['message']}")
+    
+    if not dry_run:
+        # Pairs met outside the event bus must not count as new on their next session
+        pair_count = await StatsProjector.backfill_pairs()
+        print(f"✅ Tutor-student pair ledger holds {pair_count} completed pair(s)")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # Usage: python scripts/recalculate_stats.py [--dry-run]
+    asyncio.run(main(dry_run="--dry-run" in sys.argv))
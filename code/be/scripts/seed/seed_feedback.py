@@ -198,7 +198,7 @@ async def seed_feedback():
     # Recalculate tutor stats after creating feedbacks
     print("\n📊 Recalculating tutor stats...")
     from app.services.tutor_service import TutorService
-    result = await TutorService.recalculate_tutor_stats()
+    result = await TutorService.recalculate_tutor_stats(progress=print)
     print(f"✅ {result['message']}")
     
     # Recalculate student stats after creating feedbacks
@@ -0,0 +1,110 @@
+"""
+Test setup: every `async def` test runs in its own event loop against a fresh
+in-memory MongoDB (mongomock-motor) initialised with all Beanie models.
+
+mongomock lacks a few server features the services rely on; the shims below
+fill them for tests only (DBRef "$id" paths, $round, Link fetching).
+"""
+import asyncio
+import inspect
+import os
+
+import pytest
+
+for _name in ("SECRET_KEY", "MONGODB_URL", "DATABASE_NAME"):
+    os.environ.setdefault(_name, "test")
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+import beanie.odm.fields as beanie_fields
+import mongomock.aggregate as mongomock_aggregate
+import mongomock.filtering as mongomock_filtering
+from beanie import init_beanie
+from bson.dbref import DBRef
+
+
+# ==========================================
+# MONGOMOCK SHIMS
+# ==========================================
+def _dbref_as_dict(value):
+    if isinstance(value, DBRef):
+        return {"$ref": value.collection, "$id": value.id}
+    if isinstance(value, list):
+        return [_dbref_as_dict(item) for item in value]
+    return value
+
+
+# "field.$id" filters descend into DBRefs on a real server
+_iter_key_candidates = mongomock_filtering.iter_key_candidates
+_iter_key_candidates_sublist = mongomock_filtering._iter_key_candidates_sublist
+mongomock_filtering.iter_key_candidates = lambda key, doc: _iter_key_candidates(key, _dbref_as_dict(doc))
+mongomock_filtering._iter_key_candidates_sublist = lambda key, doc: _iter_key_candidates_sublist(key, _dbref_as_dict(doc))
+
+# $round (used by the stats pipelines)
+if "$round" not in mongomock_aggregate.binary_arithmetic_operators:
+    mongomock_aggregate.binary_arithmetic_operators.add("$round")
+    mongomock_aggregate.arithmetic_operators.add("$round")
+    _handle_arithmetic_operator = mongomock_aggregate._Parser._handle_arithmetic_operator
+
+    def _round_operator(self, operator, values):
+        if operator == "$round":
+            number = self.parse(values[0])
+            places = self.parse(values[1]) if len(values) > 1 else 0
+            return None if number is None else round(number, places)
+        return _handle_arithmetic_operator(self, operator, values)
+
+    mongomock_aggregate._Parser._handle_arithmetic_operator = _round_operator
+
+# Nested link fetching goes through $lookup pipelines, which mongomock lacks
+_fetch = beanie_fields.Link.fetch
+_fetch_list = beanie_fields.Link.fetch_list.__func__
+
+
+async def _fetch_shallow(self, fetch_links=False):
+    return await _fetch(self, fetch_links=False)
+
+
+async def _fetch_list_shallow(cls, links, fetch_links=False):
+    return await _fetch_list(cls, links, fetch_links=False)
+
+
+beanie_fields.Link.fetch = _fetch_shallow
+beanie_fields.Link.fetch_list = classmethod(_fetch_list_shallow)
+
+
+# ==========================================
+# ASYNC TESTS
+# ==========================================
+def _document_models():
+    import app.db.mongodb as mongodb
+    return [
+        value for value in vars(mongodb).values()
+        if isinstance(value, type) and hasattr(value, "get_motor_collection") and hasattr(value, "Settings")
+    ]
+
+
+def _reset_process_state():
+    """Clears the in-process indexes and registries between tests."""
+    from app.core.events import EventBus
+    from app.services.interval_index import TutorIntervalIndex
+    EventBus.clear()
+    TutorIntervalIndex.invalidate()
+
+
+async def _run_with_database(test, kwargs):
+    client = mongomock_motor.AsyncMongoMockClient()
+    await init_beanie(database=client["test"], document_models=_document_models())
+    _reset_process_state()
+    try:
+        await test(**kwargs)
+    finally:
+        _reset_process_state()
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem):
+    if not inspect.iscoroutinefunction(pyfuncitem.obj):
+        return None
+    kwargs = {name: pyfuncitem.funcargs[name] for name in pyfuncitem._fixtureinfo.argnames}
+    asyncio.run(_run_with_database(pyfuncitem.obj, kwargs))
+    return True
@@ -0,0 +1,81 @@
+"""Minimal documents for service tests (inserted into the per-test database)."""
+import itertools
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from app.models.enums.gender import Gender
+from app.models.enums.location import LocationMode
+from app.models.enums.role import UserRole
+from app.models.enums.university_identities import UniversityIdentity
+from app.models.external.course import Course
+from app.models.external.faculty import Faculty
+from app.models.external.hcmut_sso import HCMUT_SSO, AcademicStatus, ContactInfo
+from app.models.external.major import Major
+from app.models.internal.session import TutorSession, SessionStatus
+from app.models.internal.student_profile import StudentProfile
+from app.models.internal.tutor_profile import TutorProfile, TeachingSubject
+from app.models.internal.user import User
+
+_sequence = itertools.count(1)
+
+
+async def _faculty() -> Faculty:
+    faculty = await Faculty.find_one(Faculty.code == "CSE")
+    if faculty is None:
+        faculty = await Faculty(name="Computer Science and Engineering", code="CSE").insert()
+    return faculty
+
+
+async def make_course(code: str = "CO3005") -> Course:
+    return await Course(name=f"Course {code}", code=code, credits=3, department=await _faculty()).insert()
+
+
+async def make_user(identity_type: UniversityIdentity, roles: List[UserRole]) -> User:
+    n = next(_sequence)
+    username = f"user{n}"
+    major = await Major.find_one(Major.code == "CS")
+    if major is None:
+        major = await Major(name="Computer Science", code="CS", faculty=await _faculty()).insert()
+    sso = await HCMUT_SSO(
+        username=username,
+        password_hash="x",
+        identity_id=f"ID{n}",
+        identity_type=identity_type,
+        full_name=f"User {n}",
+        gender=list(Gender)[0],
+        contact=ContactInfo(email_edu=f"{username}@hcmut.edu.vn"),
+        academic=AcademicStatus(major_link=major, major="Computer Science", class_code="CC01", current_year=2)
+    ).insert()
+    return await User(sso_info=sso, full_name=f"User {n}", email_edu=f"{username}@hcmut.edu.vn", roles=roles).insert()
+
+
+async def make_tutor(course: Optional[Course] = None) -> TutorProfile:
+    user = await make_user(UniversityIdentity.LECTURER, [UserRole.TUTOR])
+    subjects = [TeachingSubject(course_ref=course)] if course else []
+    return await TutorProfile(user=user, display_name=user.full_name, teaching_subjects=subjects).insert()
+
+
+async def make_student() -> StudentProfile:
+    user = await make_user(UniversityIdentity.STUDENT, [UserRole.STUDENT])
+    return await StudentProfile(user=user).insert()
+
+
+async def make_session(
+    tutor: TutorProfile,
+    students: List[StudentProfile],
+    course: Course,
+    start_time: Optional[datetime] = None,
+    hours: float = 2,
+    status: SessionStatus = SessionStatus.CONFIRMED
+) -> TutorSession:
+    start_time = start_time or datetime.now(timezone.utc) - timedelta(days=1)
+    return await TutorSession(
+        tutor=tutor,
+        students=students,
+        course=course,
+        start_time=start_time,
+        end_time=start_time + timedelta(hours=hours),
+        mode=LocationMode.ONLINE,
+        status=status,
+        max_capacity=max(len(students), 1)
+    ).insert()
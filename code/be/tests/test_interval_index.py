@@ -0,0 +1,162 @@
+import asyncio
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from beanie import PydanticObjectId
+
+from app.models.internal.availability import AvailabilitySlot
+from app.models.internal.session import TutorSession, SessionStatus
+from app.services.interval_index import ACTIVE_SESSION_STATUSES, TutorIntervalIndex, _IntervalSet
+
+from tests.factories import make_course, make_session, make_student, make_tutor
+
+BASE = datetime(2026, 1, 5, 8, 0)
+
+
+def hours(h: float) -> datetime:
+    return BASE + timedelta(hours=h)
+
+
+def interval_set(*intervals):
+    ids = [PydanticObjectId() for _ in intervals]
+    intervals_set = _IntervalSet()
+    for item_id, (start, end) in zip(ids, intervals):
+        intervals_set.put(item_id, hours(start), hours(end))
+    return intervals_set, ids
+
+
+# ==========================================
+# _IntervalSet
+# ==========================================
+def test_adjacent_intervals_do_not_overlap():
+    intervals, _ = interval_set((0, 2), (4, 6))
+    assert intervals.overlapping(hours(2), hours(4)) == []
+
+
+def test_contained_and_containing_intervals_overlap():
+    intervals, (outer, inner) = interval_set((0, 10), (3, 4))
+    assert set(intervals.overlapping(hours(3.5), hours(3.75))) == {outer, inner}
+    assert set(intervals.overlapping(hours(-1), hours(11))) == {outer, inner}
+
+
+def test_straddling_intervals_overlap():
+    intervals, (early, late) = interval_set((0, 2), (5, 7))
+    assert intervals.overlapping(hours(1), hours(3)) == [early]
+    assert intervals.overlapping(hours(6), hours(8)) == [late]
+
+
+def test_long_early_interval_found_past_later_starts():
+    # The running maximum end of the subtree, not the neighbour, must be consulted
+    intervals, (long_one, *_) = interval_set((0, 100), (1, 2), (3, 4), (5, 6), (7, 8))
+    assert intervals.overlapping(hours(50), hours(51)) == [long_one]
+
+
+def test_exclude_id_and_discard():
+    intervals, (first, second) = interval_set((0, 2), (1, 3))
+    assert intervals.overlapping(hours(1), hours(2), exclude_id=first) == [second]
+    intervals.discard(second)
+    assert intervals.overlapping(hours(1), hours(2)) == [first]
+    intervals.put(second, hours(10), hours(11))
+    assert intervals.overlapping(hours(1), hours(2)) == [first]
+
+
+def test_matches_brute_force():
+    rng = random.Random(7)
+    intervals = _IntervalSet()
+    items = {}
+    for _ in range(300):
+        item_id = PydanticObjectId()
+        start = rng.uniform(0, 200)
+        items[item_id] = (start, start + rng.uniform(0.25, 12))
+        intervals.put(item_id, hours(items[item_id][0]), hours(items[item_id][1]))
+    for _ in range(300):
+        if rng.random() < 0.2:
+            removed = rng.choice(list(items))
+            intervals.discard(removed)
+            del items[removed]
+        start = rng.uniform(-5, 210)
+        end = start + rng.uniform(0.1, 8)
+        expected = {i for i, (s, e) in items.items() if s < end and e > start}
+        assert set(intervals.overlapping(hours(start), hours(end))) == expected
+
+
+# ==========================================
+# TutorIntervalIndex
+# ==========================================
+async def test_session_overlaps_match_database_check():
+    course = await make_course()
+    tutor = await make_tutor(course)
+    student = await make_student()
+    rng = random.Random(3)
+    for _ in range(40):
+        await make_session(
+            tutor, [student], course,
+            start_time=hours(rng.uniform(0, 100)),
+            hours=rng.uniform(0.5, 4),
+            status=rng.choice(list(SessionStatus))
+        )
+
+    for _ in range(60):
+        start = hours(rng.uniform(-2, 102))
+        end = start + timedelta(hours=rng.uniform(0.25, 3))
+        from_index = await TutorIntervalIndex.find_overlapping_sessions(tutor.id, start, end)
+        from_database = await TutorSession.find(
+            {"tutor.$id": tutor.id, "status": {"$in": [s.value for s in ACTIVE_SESSION_STATUSES]}},
+            TutorSession.start_time < end,
+            TutorSession.end_time > start
+        ).to_list()
+        assert set(from_index) == {session.id for session in from_database}
+
+
+class _BlockedQuery:
+    """Stands in for a find() whose to_list waits for the test (and optionally fails)."""
+
+    def __init__(self, gate: asyncio.Event, result=None, error: Exception = None):
+        self.gate, self.result, self.error = gate, result, error
+
+    async def to_list(self, *args, **kwargs):
+        await self.gate.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+async def test_removal_during_load_is_not_resurrected(monkeypatch):
+    course = await make_course()
+    tutor = await make_tutor(course)
+    session = await make_session(tutor, [await make_student()], course, start_time=hours(0))
+    slot = await AvailabilitySlot(tutor=tutor, start_time=hours(10), end_time=hours(12)).insert()
+
+    gate = asyncio.Event()
+    monkeypatch.setattr(AvailabilitySlot, "find", lambda *args, **kwargs: _BlockedQuery(gate, [slot]))
+    loading = asyncio.create_task(TutorIntervalIndex.find_overlapping_sessions(tutor.id, hours(0), hours(1)))
+    await asyncio.sleep(0)
+
+    # Both were deleted / deactivated while the snapshot was being read
+    TutorIntervalIndex.remove_slot(tutor.id, slot.id)
+    TutorIntervalIndex.remove_session(tutor.id, session.id)
+    gate.set()
+
+    assert await loading == []
+    assert await TutorIntervalIndex.find_overlapping_slots(tutor.id, hours(10), hours(11)) == []
+
+
+async def test_load_failure_reaches_every_waiter(monkeypatch):
+    tutor = await make_tutor()
+    gate = asyncio.Event()
+    failure = RuntimeError("database unavailable")
+    monkeypatch.setattr(AvailabilitySlot, "find", lambda *args, **kwargs: _BlockedQuery(gate, error=failure))
+
+    waiters = [
+        asyncio.create_task(TutorIntervalIndex.find_overlapping_slots(tutor.id, hours(0), hours(1)))
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    gate.set()
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+    assert all(result is failure for result in results)
+
+    # The failed timeline is dropped: the next call loads again
+    monkeypatch.undo()
+    assert await TutorIntervalIndex.find_overlapping_slots(tutor.id, hours(0), hours(1)) == []
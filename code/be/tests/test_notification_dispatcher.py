@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta, timezone
+
+from app.models.enums.role import UserRole
+from app.models.enums.university_identities import UniversityIdentity
+from app.models.internal.notification import Notification, NotificationType
+from app.models.internal.notification_counter import NotificationCounter
+from app.models.internal.notification_outbox import NotificationIntent, OutboxStatus
+from app.services.notification_dispatcher import MAX_ATTEMPTS, RETRY_BASE_SECONDS, NotificationDispatcher
+from app.services.notification_service import NotificationService
+
+from tests.factories import make_user
+
+NOTIFICATION_TYPE = list(NotificationType)[0]
+
+
+async def _users(count):
+    return [await make_user(UniversityIdentity.STUDENT, [UserRole.STUDENT]) for _ in range(count)]
+
+
+async def _intent(users, **fields) -> NotificationIntent:
+    return await NotificationIntent(
+        type=NOTIFICATION_TYPE, title="Title", message="Message", user_ids=[u.id for u in users], **fields
+    ).insert()
+
+
+async def _unread(user) -> int:
+    counter = await NotificationCounter.find_one(NotificationCounter.user_id == user.id)
+    return counter.unread if counter else 0
+
+
+def _naive(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+async def test_expired_lease_is_reclaimed_and_live_lease_is_not():
+    now = datetime.now(timezone.utc)
+    users = await _users(2)
+    abandoned = await _intent(users[:1], claimed_by="crashed-worker", claimed_until=now - timedelta(seconds=1))
+    in_flight = await _intent(users[1:], claimed_by="other-worker", claimed_until=now + timedelta(seconds=30))
+
+    assert await NotificationDispatcher.dispatch_pending() == 1
+
+    abandoned = await NotificationIntent.get(abandoned.id)
+    assert abandoned.status == OutboxStatus.DISPATCHED
+    assert abandoned.claimed_by is None
+    assert (await NotificationIntent.get(in_flight.id)).status == OutboxStatus.PENDING
+    assert await Notification.count() == 1
+    assert (await _unread(users[0]), await _unread(users[1])) == (1, 0)
+
+
+async def test_rows_of_an_interrupted_round_are_not_counted_twice():
+    users = await _users(3)
+    intent = await _intent(users)
+    # An earlier round wrote (and counted) the first receiver's row, then died
+    await Notification.insert_many(NotificationService.build_notifications(
+        [users[0].id], intent.type, intent.title, intent.message,
+        outbox_id=intent.id, is_delivered=True, created_at=intent.created_at
+    ))
+    await NotificationService.bump_counters({users[0].id: 1})
+
+    assert await NotificationDispatcher.dispatch_pending() == 1
+
+    assert await Notification.find({"outbox_id": intent.id}).count() == 3
+    assert [await _unread(user) for user in users] == [1, 1, 1]
+    assert (await NotificationIntent.get(intent.id)).status == OutboxStatus.DISPATCHED
+
+
+async def test_failed_round_backs_off_then_gives_up(monkeypatch):
+    async def failing_deliver(intents):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(NotificationDispatcher, "_deliver", staticmethod(failing_deliver))
+    intent = await _intent(await _users(1))
+
+    # BSON keeps milliseconds; truncate so the stored times compare exactly
+    before = datetime.now(timezone.utc)
+    before = before.replace(microsecond=before.microsecond // 1000 * 1000)
+    assert await NotificationDispatcher.dispatch_pending() == 1
+    retried = await NotificationIntent.get(intent.id)
+    assert retried.status == OutboxStatus.PENDING
+    assert retried.attempts == 1
+    assert retried.last_error == "database unavailable"
+    assert retried.claimed_by is None
+    assert _naive(retried.next_attempt_at) >= _naive(before + timedelta(seconds=RETRY_BASE_SECONDS))
+    # Not due yet: the next round finds nothing
+    assert await NotificationDispatcher.dispatch_pending() == 0
+
+    await NotificationIntent.get_motor_collection().update_one(
+        {"_id": intent.id},
+        {"$set": {"attempts": MAX_ATTEMPTS - 1, "next_attempt_at": before}}
+    )
+    assert await NotificationDispatcher.dispatch_pending() == 1
+    failed = await NotificationIntent.get(intent.id)
+    assert (failed.status, failed.attempts) == (OutboxStatus.FAILED, MAX_ATTEMPTS)
+    assert await NotificationDispatcher.dispatch_pending() == 0
@@ -0,0 +1,124 @@
+import pytest
+from fastapi import HTTPException
+
+from app.core.events import EventBus, SessionCompleted, SessionCancelled, FeedbacksFinalized, AttendanceMarked
+from app.models.internal.applied_event import AppliedEvent
+from app.models.internal.attendance import AttendanceLog
+from app.models.internal.session import SessionStatus
+from app.models.internal.student_profile import StudentProfile
+from app.models.internal.tutor_profile import TutorProfile
+from app.models.internal.tutor_student_pair import TutorStudentPair
+from app.services.schedule_service import ScheduleService
+from app.services.stats_projector import StatsProjector
+
+from tests.factories import make_course, make_session, make_student, make_tutor
+
+
+async def _tutor_stats(tutor):
+    return (await TutorProfile.get(tutor.id)).stats
+
+
+async def _student_stats(student):
+    return (await StudentProfile.get(student.id)).stats
+
+
+async def _completed_session(tutor, students, course, hours=2):
+    return await make_session(tutor, students, course, hours=hours, status=SessionStatus.COMPLETED)
+
+
+async def test_replayed_session_completed_counts_once():
+    StatsProjector.register()
+    course = await make_course()
+    tutor = await make_tutor(course)
+    students = [await make_student(), await make_student()]
+    session = await _completed_session(tutor, students, course, hours=1.5)
+    event = SessionCompleted.from_session(session)
+
+    await EventBus.publish(event)
+    await EventBus.publish(event)
+    await EventBus.publish(event, SessionCompleted.from_session(session))  # Same event twice in one batch
+
+    tutor_stats = await _tutor_stats(tutor)
+    assert (tutor_stats.total_sessions, tutor_stats.total_students) == (1, 2)
+    for student in students:
+        student_stats = await _student_stats(student)
+        assert student_stats.total_sessions == 1
+        assert student_stats.total_learning_hours == 1.5
+        assert student_stats.total_tutors_met == 1
+    assert await AppliedEvent.count() == 3
+    assert await TutorStudentPair.count() == 2
+
+
+async def test_second_session_of_same_pair_is_not_a_new_student():
+    StatsProjector.register()
+    course = await make_course()
+    tutor = await make_tutor(course)
+    student = await make_student()
+    first = await _completed_session(tutor, [student], course)
+    second = await _completed_session(tutor, [student], course)
+
+    await EventBus.publish(SessionCompleted.from_session(first))
+    await EventBus.publish(SessionCompleted.from_session(second))
+    await EventBus.publish(SessionCompleted.from_session(first))
+
+    tutor_stats = await _tutor_stats(tutor)
+    assert (tutor_stats.total_sessions, tutor_stats.total_students) == (2, 1)
+    student_stats = await _student_stats(student)
+    assert (student_stats.total_sessions, student_stats.total_tutors_met) == (2, 1)
+
+
+async def test_replayed_feedbacks_finalized_counts_once():
+    StatsProjector.register()
+    tutor = await make_tutor()
+    event = FeedbacksFinalized(event_id="feedbacks.finalized:run-1", tutor_id=tutor.id, count=2, rating_sum=9.0)
+
+    await EventBus.publish(event)
+    await EventBus.publish(event)
+    await EventBus.publish(FeedbacksFinalized(
+        event_id="feedbacks.finalized:run-2", tutor_id=tutor.id, count=1, rating_sum=3.0
+    ))
+
+    stats = await _tutor_stats(tutor)
+    assert stats.total_feedbacks == 3
+    assert stats.rating_sum == 12.0
+    assert stats.average_rating == 4.0
+
+
+async def test_replayed_late_attendance_counts_once():
+    StatsProjector.register()
+    course = await make_course()
+    tutor = await make_tutor(course)
+    student = await make_student()
+    session = await _completed_session(tutor, [student], course)
+    await EventBus.publish(SessionCompleted.from_session(session))
+
+    log = await AttendanceLog(session_ref=session, student_ref=student, tutor_ref=tutor).insert()
+    event = AttendanceMarked.from_log(log, session)
+    await EventBus.publish(event)
+    await EventBus.publish(event)
+
+    stats = await _student_stats(student)
+    assert (stats.attended_sessions, stats.attendance_rate) == (1, 100)
+
+
+async def test_cancel_after_completion_leaves_stats_unchanged():
+    StatsProjector.register()
+    course = await make_course()
+    tutor = await make_tutor(course)
+    student = await make_student()
+    session = await _completed_session(tutor, [student], course)
+    await EventBus.publish(SessionCompleted.from_session(session))
+
+    # The action is refused for completed sessions...
+    tutor_user = tutor.user
+    with pytest.raises(HTTPException) as error:
+        await ScheduleService.handle_session_action(str(session.id), tutor_user, "cancel")
+    assert error.value.status_code == 400
+
+    # ...and a stray cancellation event for it is not projected
+    await EventBus.publish(SessionCancelled.from_session(session))
+
+    tutor_stats = await _tutor_stats(tutor)
+    assert (tutor_stats.total_sessions, tutor_stats.total_students) == (1, 1)
+    student_stats = await _student_stats(student)
+    assert (student_stats.total_sessions, student_stats.total_tutors_met) == (1, 1)
@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta, timezone
+
+from app.core.events import EventBus, SessionConfirmed, SessionCompleted, SessionCancelled
+from app.models.internal.session import SessionStatus
+from app.models.internal.workload_rollup import WorkloadRollup
+from app.services.workload_rollup_service import WorkloadRollupService, utc_day
+
+from tests.factories import make_course, make_session, make_student, make_tutor
+
+JAN_5 = datetime(2026, 1, 5)
+
+
+async def _setup():
+    WorkloadRollupService.register()
+    course = await make_course()
+    return course, await make_tutor(course), await make_student()
+
+
+async def _totals(tutor, start, end):
+    rows = await WorkloadRollupService.summarize(start, end, tutor_id=tutor.id)
+    return (rows[0]["sessions"], rows[0]["hours"]) if rows else (0, 0)
+
+
+async def test_session_confirmed_then_completed_counts_once():
+    course, tutor, student = await _setup()
+    session = await make_session(tutor, [student], course, start_time=JAN_5 + timedelta(hours=9), hours=2)
+
+    await EventBus.publish(SessionConfirmed.from_session(session))
+    session.status = SessionStatus.COMPLETED
+    await EventBus.publish(SessionCompleted.from_session(session))
+    await EventBus.publish(SessionCompleted.from_session(session))
+
+    assert await _totals(tutor, JAN_5, JAN_5) == (1, 2)
+    row = await WorkloadRollup.find_one(WorkloadRollup.tutor_id == tutor.id)
+    assert row.session_ids == [session.id]
+    assert row.mode_sessions == {session.mode.value: 1}
+
+
+async def test_cancel_removes_the_session_once():
+    course, tutor, student = await _setup()
+    kept = await make_session(tutor, [student], course, start_time=JAN_5 + timedelta(hours=9), hours=1)
+    cancelled = await make_session(tutor, [student], course, start_time=JAN_5 + timedelta(hours=14), hours=2)
+    await EventBus.publish(SessionConfirmed.from_session(kept), SessionConfirmed.from_session(cancelled))
+    assert await _totals(tutor, JAN_5, JAN_5) == (2, 3)
+
+    cancelled.status = SessionStatus.CANCELLED
+    await EventBus.publish(SessionCancelled.from_session(cancelled))
+    await EventBus.publish(SessionCancelled.from_session(cancelled))
+
+    assert await _totals(tutor, JAN_5, JAN_5) == (1, 1)
+    row = await WorkloadRollup.find_one(WorkloadRollup.tutor_id == tutor.id)
+    assert row.session_ids == [kept.id]
+
+
+async def test_cancelled_only_day_is_left_out():
+    course, tutor, student = await _setup()
+    session = await make_session(tutor, [student], course, start_time=JAN_5 + timedelta(hours=9))
+    await EventBus.publish(SessionConfirmed.from_session(session))
+    await EventBus.publish(SessionCancelled.from_session(session))
+
+    assert await WorkloadRollupService.summarize(JAN_5, JAN_5, tutor_id=tutor.id) == []
+
+
+async def test_sessions_count_on_the_utc_day_of_their_start():
+    course, tutor, student = await _setup()
+    late_evening = await make_session(tutor, [student], course, start_time=JAN_5 + timedelta(hours=23, minutes=30), hours=1)
+    after_midnight = await make_session(tutor, [student], course, start_time=JAN_5 + timedelta(days=1, minutes=30), hours=2)
+    await EventBus.publish(SessionConfirmed.from_session(late_evening), SessionConfirmed.from_session(after_midnight))
+
+    # Whole UTC days: the time of day of start_date/end_date is ignored
+    assert await _totals(tutor, JAN_5, JAN_5) == (1, 1)
+    assert await _totals(tutor, JAN_5 + timedelta(hours=23, minutes=59), JAN_5 + timedelta(hours=1)) == (1, 1)
+    assert await _totals(tutor, JAN_5 + timedelta(days=1, hours=12), JAN_5 + timedelta(days=1)) == (1, 2)
+    assert await _totals(tutor, JAN_5, JAN_5 + timedelta(days=1)) == (2, 3)
+
+    # Aware bounds are converted to UTC first (06:00 in UTC+7 is 23:00 UTC the day before)
+    ict = timezone(timedelta(hours=7))
+    assert await _totals(tutor, datetime(2026, 1, 6, 6, 0, tzinfo=ict), datetime(2026, 1, 6, 6, 0, tzinfo=ict)) == (1, 1)
+
+
+def test_utc_day():
+    assert utc_day(datetime(2026, 1, 5, 23, 59)) == JAN_5
+    assert utc_day(datetime(2026, 1, 6, 1, 0, tzinfo=timezone(timedelta(hours=7)))) == JAN_5